@@ -1,3 +1,4 @@
+import redis
 import psutil
 import subprocess
 from urllib.request import urlopen
@@ -14,6 +15,21 @@ from .celery import app
 
 logger = get_task_logger(__name__)
 
+# Queue depth bookkeeping, exposed by `LoadView`
+QUEUE_NAME = 'celery'
+RUNNING_KEY = 'abacus_server_running'
+redis_client = redis.StrictRedis.from_url(settings.REDIS_URI)
+
+
+def get_load():
+    """
+    Returns the number of queued and running tasks.
+    """
+    return dict(
+        queued=redis_client.llen(QUEUE_NAME),
+        running=max(int(redis_client.get(RUNNING_KEY) or 0), 0)
+    )
+
 
 def add_params(url, **params):
     """
@@ -35,6 +51,16 @@ def add_params(url, **params):
     )
 
 
+def notify(callback):
+    """
+    Invokes `callback` to report the progress of a task.
+    """
+    try:
+        urlopen(callback, timeout=5)
+    except (urllib.error.HTTPError, urllib.error.URLError) as e:
+        logger.error('Fail to fetch %s.\nReason: %s' % (callback, e))
+
+
 @app.task(bind=True, base=AbortableTask)
 def run_abacus(self, input_file, callback, output_file, output_file_url):
 
@@ -56,6 +82,8 @@ def run_abacus(self, input_file, callback, output_file, output_file_url):
     task_id = self.request.id
     logger.info('Task %s started.' % task_id)
     success = True
+    redis_client.incr(RUNNING_KEY)
+    notify(add_params(callback, task_id=task_id, status='STARTED'))
 
     # Execute ABACUS
     try:
@@ -88,12 +116,11 @@ def run_abacus(self, input_file, callback, output_file, output_file_url):
             callback = add_params(callback, task_id=task_id, output=output_file_url)
     finally:
         default_storage.delete(input_file)
+        redis_client.decr(RUNNING_KEY)
 
     # Invoke callback
     try:
-        urlopen(callback, timeout=5)
-    except (urllib.error.HTTPError, urllib.error.URLError) as e:
-        logger.error('Fail to fetch %s.\nReason: %s' % (callback, e))
+        notify(callback)
     finally:
         logger.info('Task %s finished.' % task_id)
 
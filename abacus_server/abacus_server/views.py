@@ -10,7 +10,7 @@ from django.core.files.storage import default_storage
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 
-from abacus_server.tasks import run_abacus
+from abacus_server.tasks import run_abacus, get_load
 
 
 class MainView(View):
@@ -85,3 +85,12 @@ class QueryView(View):
             response['output'] = result_object.result
 
         return JsonResponse(response)
+
+
+class LoadView(View):
+    """
+    Reports the queue depth of the server, used by clients for load balancing.
+    """
+
+    def get(self, request):
+        return JsonResponse(get_load())
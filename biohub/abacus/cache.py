@@ -0,0 +1,273 @@
+"""
+Deduplication of ABACUS jobs.
+
+Designing a protein takes minutes of CPU, while users often submit the same
+.pdb file again and again. An upload is fingerprinted by its content together
+with the ABACUS environment, so that:
+
+ + if an identical job finished before, its output is returned immediately;
+ + if an identical job is running, the new request attaches to it.
+
+Outputs of finished jobs are kept in a store bounded by both the number of
+entries and the total size of output files. The least recently used entries
+are evicted first, with their output files deleted. Entries whose local
+output files are gone (e.g. removed by `clean_unused`) are dropped on read.
+"""
+
+import os
+import time
+import hashlib
+
+from django.conf import settings as django_settings
+from django.core.files.storage import default_storage
+
+from biohub.utils.redis import Storage
+from biohub.core.tasks import TaskStatus
+from .conf import settings
+
+__all__ = ['ResultCache', 'result_cache']
+
+
+class ResultCache(object):
+    """
+    A size-bounded LRU store of ABACUS outputs, keyed by fingerprints of
+    uploaded files.
+    """
+
+    # Seconds a claim is kept for a job being started, before it has a status
+    claim_grace = 60
+
+    def __init__(self, max_entries=None, max_size=None):
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._storage = Storage('__biohub_abacus_cache__')
+
+    @property
+    def max_entries(self):
+        if self._max_entries is None:
+            return settings.ABACUS_CACHE_MAX_ENTRIES
+
+        return self._max_entries
+
+    @property
+    def max_size(self):
+        if self._max_size is None:
+            return settings.ABACUS_CACHE_MAX_SIZE
+
+        return self._max_size
+
+    def _key(self, kind, digest):
+        return '{}:{}'.format(kind, digest)
+
+    def environment(self):
+        """
+        Returns a string identifying the ABACUS version and parameters in use.
+        """
+        parts = [settings.ident, settings.ABACUS_DATABASE_PATH]
+
+        jar_path = settings.ABACUS_JAR_PATH
+        if os.path.isfile(jar_path):
+            stat = os.stat(jar_path)
+            parts.extend([jar_path, str(stat.st_size), str(stat.st_mtime)])
+
+        parts.extend(settings.ABACUS_JVM_OPTIONS)
+
+        return '\n'.join(parts)
+
+    def fingerprint(self, upload):
+        """
+        Hashes the content of `upload` together with the ABACUS environment.
+        """
+        digest = hashlib.sha256(self.environment().encode())
+
+        upload.seek(0)
+        for chunk in upload.chunks():
+            digest.update(chunk)
+        upload.seek(0)
+
+        return digest.hexdigest()
+
+    def get(self, digest):
+        """
+        Returns the output of a finished job with the given fingerprint, or
+        None if not found.
+        """
+        key = self._key('result', digest)
+        entry = self._storage.get(key)
+
+        if entry is None:
+            return None
+
+        name = self._local_name(entry['output'])
+        if name is not None and not default_storage.exists(name):
+            self._drop(digest, entry)
+            return None
+
+        self._storage.zadd('lru', time.time(), digest)
+        return entry['output']
+
+    def store(self, digest, output):
+        """
+        Stores the output of a finished job, and evicts old entries if the
+        store grows out of bounds.
+        """
+        key = self._key('result', digest)
+        old = self._storage.get(key)
+        size = self._output_size(output)
+
+        self._storage.set(key, dict(output=output, size=size), timeout=None)
+        self._storage.zadd('lru', time.time(), digest)
+        self._storage.incrby('size', size - (old['size'] if old else 0))
+
+        if old is not None and old['output'] != output:
+            self._delete_output(old['output'])
+
+        self.evict()
+
+    def size(self):
+        return self._storage.get('size') or 0
+
+    def __len__(self):
+        return self._storage.zcard('lru')
+
+    def evict(self):
+        """
+        Evicts the least recently used entries until the store fits in its
+        bounds. Returns the number of entries evicted.
+        """
+        counter = 0
+
+        while len(self) > self.max_entries or (len(self) and self.size() > self.max_size):
+            digest = self._storage.zrange('lru', 0, 0)[0].decode()
+            self._storage.zremrangebyrank('lru', 0, 0)
+
+            entry = self._storage.get(self._key('result', digest))
+            if entry is not None:
+                self._drop(digest, entry)
+                self._delete_output(entry['output'])
+
+            counter += 1
+
+        return counter
+
+    def _drop(self, digest, entry):
+        """
+        Removes the entry of `digest` without touching its output file.
+        """
+        with self._storage.pipeline() as pipe:
+            pipe.delete(self._storage.make_key(self._key('result', digest)))
+            pipe.zrem(self._storage.make_key('lru'), digest)
+            pipe.incrby(self._storage.make_key('size'), -entry['size'])
+            pipe.execute()
+
+    def _local_name(self, output):
+        """
+        Returns the name of the output file if `output` is a local one, i.e.
+        under MEDIA_URL, otherwise None (e.g. outputs of remote servers).
+        """
+        prefix = django_settings.MEDIA_URL
+
+        if output and prefix and output.startswith(prefix):
+            return output[len(prefix):]
+
+        return None
+
+    def _output_size(self, output):
+        name = self._local_name(output)
+
+        if name is None or not default_storage.exists(name):
+            return 0
+
+        return default_storage.size(name)
+
+    def _delete_output(self, output):
+        name = self._local_name(output)
+
+        if name is not None:
+            default_storage.delete(name)
+
+    def _get_claim(self, digest):
+        """
+        Returns the valid claim of `digest` as a dict of `task_id` (None while
+        the job is being started) and `claimed` (timestamp), or None. Stale
+        claims, i.e. of finished jobs, are released.
+        """
+        from .result import AbacusAsyncResult
+
+        claim = self._storage.get(self._key('running', digest))
+
+        if claim is None:
+            return None
+
+        task_id = claim['task_id']
+        status = AbacusAsyncResult(task_id).status if task_id is not None else TaskStatus.GONE
+
+        # A job being started has no status yet
+        if status == TaskStatus.GONE and time.time() - claim['claimed'] < self.claim_grace:
+            return claim
+
+        if status == TaskStatus.GONE or status.is_ready:
+            self.release(digest, task_id)
+            return None
+
+        return claim
+
+    def running(self, digest):
+        """
+        Returns the id of an unfinished job with the given fingerprint, or None
+        if not found.
+        """
+        claim = self._get_claim(digest)
+
+        return claim and claim['task_id']
+
+    def claim(self, digest, task_id=None, wait=10, interval=.1):
+        """
+        Atomically claims `digest` for a new job, whose id is `task_id`, or
+        to be set by `mark_running` once known.
+
+        Returns a tuple (claimed, holder). If the claim is taken by another
+        job, `holder` is its id, for which it waits up to `wait` seconds if
+        the job is being started. Both are False / None if the wait times out.
+        """
+        key = self._key('running', digest)
+        deadline = time.time() + wait
+
+        while True:
+            if self._storage.set(
+                    key, dict(task_id=task_id, claimed=time.time()),
+                    timeout=None, nx=True):
+                return True, None
+
+            claim = self._get_claim(digest)
+
+            if claim is not None and claim['task_id'] is not None:
+                return False, claim['task_id']
+
+            if claim is not None:
+                if time.time() > deadline:
+                    return False, None
+
+                time.sleep(interval)
+
+    def mark_running(self, digest, task_id):
+        self._storage.set(
+            self._key('running', digest),
+            dict(task_id=task_id, claimed=time.time()),
+            timeout=None)
+
+    def release(self, digest, task_id):
+        """
+        Removes the claim of `digest`, if it was made by `task_id`.
+        """
+        key = self._key('running', digest)
+        claim = self._storage.get(key)
+
+        if claim is not None and claim['task_id'] == task_id:
+            self._storage.delete(key)
+
+    def clear(self):
+        self._storage.delete_pattern('*')
+
+
+result_cache = ResultCache()
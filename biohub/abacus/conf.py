@@ -1,5 +1,6 @@
 import json
 import os.path as path
+import multiprocessing
 
 from django.utils.functional import SimpleLazyObject, empty
 from django.core.validators import ValidationError, URLValidator
@@ -9,6 +10,15 @@ from . import consts
 dirname = path.dirname(path.abspath(__file__))
 config_location = path.join(dirname, 'config.json')
 
+# Optional config items and their default values
+defaults = {
+    'ABACUS_MAX_WORKERS': lambda: multiprocessing.cpu_count(),
+    'ABACUS_JVM_OPTIONS': list,
+    'ABACUS_MAX_MEMORY': lambda: None,
+    'ABACUS_CACHE_MAX_ENTRIES': lambda: 1000,
+    'ABACUS_CACHE_MAX_SIZE': lambda: 512 * 1024 * 1024,
+}
+
 
 class Settings(SimpleLazyObject):
     """
@@ -52,6 +62,10 @@ class Settings(SimpleLazyObject):
         with open(config_location, 'r') as fp:
             result = json.load(fp)
 
+        for name, default in defaults.items():
+            if name not in result:
+                result[name] = default()
+
         if self._check_local_availability(result):
             result['ident'] = consts.LOCAL
         elif self._check_remote_availability(result):
@@ -68,11 +82,10 @@ class Settings(SimpleLazyObject):
         if self._wrapped is empty:
             self._setup()
 
-        result = self._wrapped.get(name, None)
-        if result is None:
-            result = getattr(self._wrapped, name)
-
-        return result
+        try:
+            return self._wrapped[name]
+        except KeyError:
+            return getattr(self._wrapped, name)
 
 
 settings = Settings()
@@ -0,0 +1,263 @@
+"""
+This module provides a local execution engine for ABACUS.
+
+ABACUS is shipped as a command line jar which designs exactly one protein per
+invocation, so a JVM cannot be fed with multiple jobs. What the engine does
+instead is to keep a bounded pool of long-lived supervisor threads, each of
+which takes jobs from a shared queue and drives one JVM at a time. The number
+of JVMs alive is therefore capped by `ABACUS_MAX_WORKERS` regardless of how
+many tasks are waiting, and extra JVM flags (e.g. class data sharing) can be
+applied through `ABACUS_JVM_OPTIONS` to cut down startup time.
+
+A job may be cancelled at any time, in which case only its own process will
+be killed. A process exceeding `ABACUS_MAX_MEMORY` (in bytes) will also be
+killed, so that a single runaway job cannot starve the whole machine.
+"""
+
+import queue
+import logging
+import threading
+import subprocess
+
+import psutil
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger('biohub.abacus.engine')
+
+
+class AbacusJob(object):
+    """
+    A handle of a job submitted to the engine.
+    """
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+
+        self.returncode = None
+        self.output = b''
+        self.error = b''
+        self.cancelled = False
+        self.killed_reason = None
+
+        self._process = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def succeeded(self):
+        """
+        ABACUS reports success by printing the final ENERGY.
+        """
+        if not self.done or self.cancelled or self.returncode != 0:
+            return False
+
+        return b'ENERGY' in self.output
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the job is finished or `timeout` seconds elapsed.
+
+        Returns a boolean indicating whether the job was finished.
+        """
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """
+        Cancels the job. If the job is running, its process will be killed.
+        """
+        with self._lock:
+            if self.done:
+                return
+
+            self.cancelled = True
+
+            if self._process is None:
+                # Not started yet, the worker will skip it.
+                self._finish(None, b'', b'')
+            else:
+                self._kill('cancelled')
+
+    def _attach(self, process):
+        """
+        Binds a running process with the job. Returns False if the job was
+        cancelled before it started.
+        """
+        with self._lock:
+            if self.cancelled:
+                return False
+
+            self._process = process
+            return True
+
+    def _kill(self, reason):
+        if self._process is not None and self._process.poll() is None:
+            self.killed_reason = reason
+            self._process.kill()
+
+    def _finish(self, returncode, output, error):
+        self.returncode = returncode
+        self.output = output or b''
+        self.error = error or b''
+        self._process = None
+        self._done.set()
+
+    def describe(self):
+        """
+        Returns a human readable summary, used for error reporting.
+        """
+        return (
+            'Exit Code: {code}\nKilled: {killed}\nStdout: {output}\nStderr: {error}'
+            .format(code=self.returncode, killed=self.killed_reason,
+                    output=self.output.decode(errors='replace'),
+                    error=self.error.decode(errors='replace'))
+        )
+
+
+class AbacusEngine(object):
+    """
+    A bounded pool of workers to run ABACUS jobs locally.
+    """
+
+    poll_interval = .5
+
+    def __init__(self, jar_path, database_path, max_workers=1,
+                 jvm_options=(), max_memory=None, niceness=10):
+        self.jar_path = jar_path
+        self.database_path = database_path
+        self.max_workers = max_workers
+        self.jvm_options = list(jvm_options)
+        self.max_memory = max_memory
+        self.niceness = niceness
+
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        from .conf import settings
+
+        return cls(
+            settings.ABACUS_JAR_PATH,
+            settings.ABACUS_DATABASE_PATH,
+            max_workers=settings.ABACUS_MAX_WORKERS,
+            jvm_options=settings.ABACUS_JVM_OPTIONS,
+            max_memory=settings.ABACUS_MAX_MEMORY
+        )
+
+    def get_arguments(self, job):
+        return ['java', *self.jvm_options,
+                '-jar', self.jar_path,
+                '-design',
+                '-dir', self.database_path,
+                '-in', job.input_path,
+                '-out', job.output_path]
+
+    @property
+    def pending(self):
+        """
+        The number of jobs waiting for a free worker.
+        """
+        return self._queue.qsize()
+
+    def submit(self, input_path, output_path):
+        """
+        Puts a job into the queue and returns its handle.
+        """
+        job = AbacusJob(input_path, output_path)
+        self._queue.put(job)
+        self._ensure_workers()
+
+        return job
+
+    def shutdown(self):
+        """
+        Stops all the workers after they finish their current jobs.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+
+            for _ in workers:
+                self._queue.put(None)
+
+        for worker in workers:
+            worker.join()
+
+    def _ensure_workers(self):
+        """
+        Lazily starts workers, up to `max_workers`.
+        """
+        with self._lock:
+            self._workers = [w for w in self._workers if w.is_alive()]
+
+            if len(self._workers) >= self.max_workers:
+                return
+
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+
+            if job is None:
+                return
+
+            try:
+                self._execute(job)
+            except Exception as exc:
+                logger.exception('Failed to run ABACUS job on %s.', job.input_path)
+                job._finish(None, b'', str(exc).encode())
+
+    def _execute(self, job):
+        if job.done:
+            return
+
+        process = subprocess.Popen(
+            self.get_arguments(job),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        if not job._attach(process):
+            process.kill()
+            process.communicate()
+            return
+
+        try:
+            psutil.Process(process.pid).nice(self.niceness)
+        except psutil.Error:
+            pass
+
+        while True:
+            try:
+                output, error = process.communicate(timeout=self.poll_interval)
+            except subprocess.TimeoutExpired:
+                self._check_memory(job, process)
+            else:
+                break
+
+        job._finish(process.returncode, output, error)
+
+    def _check_memory(self, job, process):
+        if self.max_memory is None:
+            return
+
+        try:
+            rss = psutil.Process(process.pid).memory_info().rss
+        except psutil.Error:
+            return
+
+        if rss > self.max_memory:
+            logger.warning('ABACUS job on %s killed due to memory usage %d.', job.input_path, rss)
+            with job._lock:
+                job._kill('memory limit exceeded')
+
+
+engine = SimpleLazyObject(AbacusEngine.from_settings)
@@ -1,7 +1,13 @@
+import os
+import tempfile
+
 from django.urls import reverse
+from django.core.files.move import file_move_safe
 from rest_framework.exceptions import ValidationError
 
+from biohub.core.tasks.broker import get_task_id
 from biohub.abacus.result import AbacusAsyncResult
+from biohub.abacus.cache import result_cache
 from . import consts, remote
 
 
@@ -14,14 +20,56 @@ class BaseHandler(object):
         self._request = request
 
     def start_task(self, user):
+        """
+        Starts a task for the uploaded file. If an identical file was
+        processed before, the task will be resolved with the cached output
+        immediately; if one is being processed, the user will be attached to
+        the running task instead.
+        """
         if 'file' not in self._request.FILES:
             raise ValidationError('Should upload a file.')
 
-        task_id = self._perform_start_task()
-        async_result = AbacusAsyncResult(task_id)
-        async_result._set_input_file_name(self._request.FILES['file'].name)
-        async_result._set_ident(self.ident)
-        async_result._set_user(user.pk)
+        upload = self._request.FILES['file']
+        digest = result_cache.fingerprint(upload)
+        fields = dict(input_file_name=upload.name, user=user.pk, digest=digest)
+
+        output = result_cache.get(digest)
+        if output is not None:
+            async_result = AbacusAsyncResult(get_task_id('abacus'))
+            async_result._set_ident(self.ident)
+            async_result._write(fields)
+            async_result.resolve(output)
+
+            return self._make_response(async_result.task_id)
+
+        # Claims the digest before dispatching, so that identical uploads
+        # arriving together start only one job
+        task_id = self._new_task_id()
+        claimed, holder = result_cache.claim(digest, task_id)
+
+        if holder is not None:
+            AbacusAsyncResult(holder).subscribe(user.pk)
+            return self._make_response(holder)
+
+        try:
+            task_id = self._perform_start_task(task_id, fields)
+        except Exception:
+            if claimed:
+                result_cache.release(digest, task_id)
+            raise
+
+        if claimed:
+            result_cache.mark_running(digest, task_id)
+
+        return self._make_response(task_id)
+
+    def _new_task_id(self):
+        """
+        Returns the id of a job to start, or None if it's assigned on start.
+        """
+        return None
+
+    def _make_response(self, task_id):
 
         return dict(
             id=task_id,
@@ -36,33 +84,67 @@ class LocalHandler(BaseHandler):
 
     ident = consts.LOCAL
 
-    def _run_task(self, input_file_name):
+    def _run_task(self, input_path, owner=None, task_id=None):
 
+        from biohub.core.tasks import apply_async
         from biohub.abacus.tasks import AbacusTask
 
-        return AbacusTask.apply_async(input_file_name)
+        return apply_async(AbacusTask, (input_path,), owner=owner, task_id=task_id)
 
     def _store_file(self):
+        """
+        Moves the uploaded file out of the temporary upload location, so that
+        it survives the request. Returns the new path, which will be handed to
+        the task directly.
+        """
+        upload = self._request.FILES['file']
+        fd, input_path = tempfile.mkstemp(
+            prefix='abacus_input_',
+            suffix=os.path.splitext(upload.name)[1])
+        os.close(fd)
+
+        if hasattr(upload, 'temporary_file_path'):
+            file_move_safe(upload.temporary_file_path(), input_path, allow_overwrite=True)
+        else:
+            with open(input_path, 'wb') as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+
+        return input_path
+
+    def _new_task_id(self):
+        return get_task_id('abacus')
+
+    def _perform_start_task(self, task_id, fields):
+        """
+        Writes `fields` before the task is dispatched, so that they are
+        available once it finishes.
+        """
+        async_result = AbacusAsyncResult(task_id)
+        async_result._set_ident(self.ident)
+        async_result._write(fields)
 
-        from biohub.core.files.utils import store_file
-
-        return store_file(self._request.FILES['file'])[0]
-
-    def _perform_start_task(self):
-
-        return self._run_task(self._store_file()).task_id
+        return self._run_task(
+            self._store_file(), self._request.user.pk, task_id=task_id).task_id
 
 
 class RemoteHandler(BaseHandler):
 
     ident = consts.REMOTE
 
-    def _perform_start_task(self):
+    def _perform_start_task(self, task_id, fields):
+        """
+        The id is assigned by the remote server, so `fields` are written as
+        soon as it's known, before the callback can be handled.
+        """
         task_id, server, signature = remote.start(self._request)
         result = AbacusAsyncResult(task_id)
+        result._set_ident(self.ident)
+        result._write(fields)
         result._set_server(server)
-        result._set_status('RUNNING')
+        result._set_status('PENDING')
         result._set_signature(signature)
+        result.track_remote()
         return task_id
 
 
@@ -0,0 +1,23 @@
+from django.core.management import BaseCommand
+
+from biohub.abacus.result import reconcile_remote_tasks
+
+
+class Command(BaseCommand):
+
+    help = 'Queries remote servers for ABACUS tasks whose callbacks were lost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--age', '-a',
+            type=int, default=10 * 60,
+            help='Only tasks started more than AGE seconds ago are queried.'
+        )
+
+    def handle(self, age, **options):
+        counter = reconcile_remote_tasks(age)
+
+        self.stdout.write(
+            '{} task(s) reconciled.'.format(counter),
+            self.style.SUCCESS
+        )
@@ -1,13 +1,21 @@
-from random import choice
+import random
 
 import requests
 from django.urls import reverse
 
+from biohub.utils.redis import Storage
 from biohub.utils.url import add_params
+from biohub.utils.http import MultipartFileStream
 from .conf import settings
 from . import security
 
-__all__ = ['start', 'query']
+__all__ = ['start', 'query', 'balancer']
+
+
+# A pooled session to keep connections to remote servers alive
+session = requests.Session()
+session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=20))
+session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=20))
 
 
 def _ensure_success(response):
@@ -18,34 +26,201 @@ def _ensure_success(response):
         "Remote call failed with status code {}\nContent: {}".format(response.status_code, response.text)
 
 
+class ServerBalancer(object):
+    """
+    Tracks the load of remote ABACUS servers and picks the most idled one.
+
+    For each server, the number of in-flight jobs, the moving average of job
+    latency and recent errors are kept in redis so that they are shared
+    between biohub processes. The queue depth reported by the server itself is
+    also taken into account, which is cached for `depth_timeout` seconds.
+
+    Servers are chosen by power-of-two-choices: two healthy servers are
+    sampled and the one with fewer outstanding jobs wins. A server failing
+    `max_errors` times in a row is ejected for `eject_timeout` seconds.
+
+    Counts of in-flight jobs never go below zero. Since they are decreased
+    by callbacks which may be lost, they are capped by the depth reported by
+    the server on each probe, and expire `inflight_timeout` seconds after the
+    last job dispatched.
+    """
+
+    max_errors = 3
+    eject_timeout = 30
+    depth_timeout = 5
+    probe_timeout = .5
+    latency_decay = .3
+    inflight_timeout = 60 * 60
+
+    # Adds ARGV[1] to the counter KEYS[1], clamped to [0, ARGV[3]] (no upper
+    # bound if empty), and sets its expiry to ARGV[2] milliseconds.
+    ADJUST_INFLIGHT_SCRIPT = """
+local value = math.max(tonumber(redis.call('GET', KEYS[1]) or 0) + tonumber(ARGV[1]), 0)
+if ARGV[3] ~= '' then
+    value = math.min(value, tonumber(ARGV[3]))
+end
+redis.call('SET', KEYS[1], string.format('%d', value), 'PX', ARGV[2])
+return value
+"""
+
+    def __init__(self, servers=None):
+        self._servers = servers
+        self._storage = Storage('__biohub_abacus_remote__')
+        self._adjust_inflight_script = None
+
+    @property
+    def servers(self):
+        if self._servers is None:
+            return settings.ABACUS_REMOTE_SERVERS
+
+        return self._servers
+
+    def _key(self, kind, server):
+        return '{}:{}'.format(kind, server)
+
+    def inflight(self, server):
+        return max(self._storage.get(self._key('inflight', server)) or 0, 0)
+
+    def _adjust_inflight(self, server, delta, cap=None):
+        if self._adjust_inflight_script is None:
+            from django_redis import get_redis_connection
+
+            self._adjust_inflight_script = get_redis_connection('default')\
+                .register_script(self.ADJUST_INFLIGHT_SCRIPT)
+
+        return self._adjust_inflight_script(
+            keys=[self._storage.make_key(self._key('inflight', server))],
+            args=[delta, int(self.inflight_timeout * 1000), '' if cap is None else cap]
+        )
+
+    def latency(self, server):
+        return self._storage.get(self._key('latency', server)) or 0.
+
+    def is_ejected(self, server):
+        return self._storage.get(self._key('ejected', server)) is not None
+
+    def depth(self, server):
+        """
+        Returns the queue depth reported by `server`, which will be fetched
+        if the cached one expired.
+        """
+        key = self._key('depth', server)
+        value = self._storage.get(key)
+
+        if value is None:
+            try:
+                response = session.get(server + 'load/', timeout=self.probe_timeout)
+                _ensure_success(response)
+            except (requests.RequestException, AssertionError):
+                self.record_error(server)
+                return None
+
+            data = response.json()
+            value = data['queued'] + data['running']
+            self._storage.set(key, value, timeout=self.depth_timeout)
+
+            # Jobs whose callbacks were lost are no longer counted
+            self._adjust_inflight(server, 0, value)
+
+        return value
+
+    def outstanding(self, server):
+        """
+        Returns the estimated number of jobs waiting on `server`.
+        """
+        depth = self.depth(server)
+
+        return max(self.inflight(server), depth or 0)
+
+    def choose(self):
+        servers = self.servers
+        candidates = [s for s in servers if not self.is_ejected(s)] or list(servers)
+
+        if len(candidates) > 2:
+            candidates = random.sample(candidates, 2)
+
+        return min(
+            candidates,
+            key=lambda s: (self.outstanding(s), self.latency(s))
+        )
+
+    def acquire(self, server):
+        """
+        Marks a job dispatched to `server`.
+        """
+        self._adjust_inflight(server, 1)
+
+    def release(self, server, latency=None):
+        """
+        Marks a job on `server` finished, with an optional latency in seconds.
+        """
+        self._adjust_inflight(server, -1)
+
+        if latency is not None:
+            key = self._key('latency', server)
+            old = self._storage.get(key)
+            if old is not None:
+                latency = old + self.latency_decay * (latency - old)
+
+            self._storage.set(key, latency, timeout=None)
+
+    def record_error(self, server):
+        """
+        Records a failure of `server`, which may cause it to be ejected.
+        """
+        key = self._key('errors', server)
+        errors = self._storage.incrby(key, 1)
+        self._storage.pexpire(key, self.eject_timeout * 1000)
+
+        if errors >= self.max_errors:
+            self._storage.set(self._key('ejected', server), 1, timeout=self.eject_timeout)
+            self._storage.delete(key)
+
+    def record_success(self, server):
+        self._storage.delete(self._key('errors', server))
+
+
+balancer = ServerBalancer()
+
+
 def choose_server():
     """
     Choose and return the most idled server.
     """
-    return choice(settings.ABACUS_REMOTE_SERVERS)
+    return balancer.choose()
 
 
 def start(request):
     """
-    Uploads the file to remote server.
+    Uploads the file to remote server. The file is streamed from the
+    temporary upload location, without being read into memory.
 
     Returns a tuple (task_id, server, signature).
     """
     server = choose_server()
     signature = security.signature()
-    response = requests.post(
-        server,
-        params={
-            'callback': add_params(
-                request.build_absolute_uri(reverse('api:abacus:remote-callback')),
-                s=signature
-            ),
-        },
-        files={
-            'file': request.FILES['file']
-        }
-    )
-    _ensure_success(response)
+    upload = request.FILES['file']
+    body = MultipartFileStream('file', upload, upload.name)
+
+    try:
+        response = session.post(
+            server,
+            params={
+                'callback': add_params(
+                    request.build_absolute_uri(reverse('api:abacus:remote-callback')),
+                    s=signature
+                ),
+            },
+            data=body,
+            headers={'Content-Type': body.content_type}
+        )
+        _ensure_success(response)
+    except (requests.RequestException, AssertionError):
+        balancer.record_error(server)
+        raise
+
+    balancer.record_success(server)
+    balancer.acquire(server)
     return response.json()['task_id'], server, signature
 
 
@@ -55,7 +230,7 @@ def query(task_id):
     """
     from .result import AbacusAsyncResult
 
-    response = requests.get(
+    response = session.get(
         '{}{}/'.format(AbacusAsyncResult(task_id).server, task_id)
     )
     _ensure_success(response)
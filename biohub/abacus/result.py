@@ -1,6 +1,8 @@
+import time
 import logging
 
 from biohub.core.tasks import AsyncResult, TaskStatus
+from biohub.core.tasks.storage import storage
 from biohub.notices.tool import Dispatcher
 from biohub.abacus import remote, consts, conf
 
@@ -15,6 +17,9 @@ remote_status_mapping = dict(
 
 logger = logging.getLogger('biohub.abacus')
 
+# A redis set holding ids of unfinished remote tasks, used for reconciliation
+REMOTE_TASKS_KEY = 'abacus_remote_tasks'
+
 dispatcher = Dispatcher('Abacus')
 templates = {
     TaskStatus.ERROR: 'ABACUS failed to process {{ input }}.',
@@ -26,29 +31,94 @@ templates = {
 
 class AbacusAsyncResult(AsyncResult):
 
-    properties = ['ident', 'user', 'signature', 'server', 'input_file_name']
+    properties = ['ident', 'user', 'signature', 'server', 'started', 'input_file_name', 'digest']
 
-    def _after_ready(self, status, result):
+    @property
+    def _subscribers_key(self):
+        return self.task_id + '_subscribers'
+
+    def subscribe(self, user):
+        """
+        Attaches another user to the task, who submitted an identical file and
+        will be notified as well when the task finishes.
+        """
+        storage.sadd(self._subscribers_key, user)
+
+    @property
+    def audience(self):
         """
-        Broadcasts a message when ready.
+        Returns ids of users interested in the task, with the owner first.
+        """
+        users = [self.user] if self.user else []
+        users.extend(
+            user for user in storage.smembers(self._subscribers_key)
+            if user not in users)
+
+        return users
+
+    def _broadcast(self, status, result=None):
+        """
+        Pushes the current status to the owner and subscribers. Returns False
+        if the owner is unknown.
         """
         from biohub.core.websocket.tool import broadcast_user
-        from biohub.accounts.models import User
 
         if not self.user:
-            logger.error('Failed to broadcast ready state due to null user %r.' % self.user)
-            return
+            logger.error('Failed to broadcast state due to null user %r.' % self.user)
+            return False
 
         if not self.input_file_name:
+            return False
+
+        response = self.response(status, result)
+        for user in self.audience:
+            broadcast_user('abacus', user, response)
+
+        return True
+
+    def track_remote(self):
+        """
+        Marks the task as an unfinished remote one, which will be watched by
+        `reconcile_remote_tasks` in case the callback gets lost.
+        """
+        self._set_started(time.time())
+        storage.sadd(REMOTE_TASKS_KEY, self.task_id)
+
+    def run(self):
+        super(AbacusAsyncResult, self).run()
+        self._broadcast(TaskStatus.RUNNING)
+
+    def _after_ready(self, status, result):
+        """
+        Caches the output and broadcasts a message when ready.
+        """
+        from biohub.accounts.models import User
+        from biohub.abacus.cache import result_cache
+
+        if self.ident == consts.REMOTE:
+            storage.srem(REMOTE_TASKS_KEY, self.task_id)
+
+            if self.server:
+                remote.balancer.release(self.server, time.time() - (self.started or time.time()))
+
+        if self.digest:
+            if status == TaskStatus.SUCCESS:
+                result_cache.store(self.digest, result)
+            result_cache.release(self.digest, self.task_id)
+
+        if not self._broadcast(status, result):
             return
 
-        broadcast_user('abacus', self.user, self.response(status, result))
-        dispatcher.send(
-            User(pk=self.user),
-            templates[self.status],
-            input=self.input_file_name,
-            router=self
-        )
+        audience = self.audience
+        storage.delete(self._subscribers_key)
+
+        for user in audience:
+            dispatcher.send(
+                User(pk=user),
+                templates[self.status],
+                input=self.input_file_name,
+                router=self
+            )
 
     def get_router_arguments(self):
 
@@ -77,6 +147,9 @@ class AbacusAsyncResult(AsyncResult):
         status = remote_status_mapping[response['status']]
         result = response.get('output', None)
 
+        if status == self.status:
+            return status
+
         if status == TaskStatus.SUCCESS:
             self.resolve(result)
         elif status == TaskStatus.ERROR:
@@ -88,24 +161,6 @@ class AbacusAsyncResult(AsyncResult):
 
         return status
 
-    def _get_status(self):
-
-        if self.ident == consts.REMOTE and not self.exists():
-            return TaskStatus.GONE
-
-        super_get = super(AbacusAsyncResult, self)._get_status
-
-        if self.ident == consts.LOCAL or hasattr(self, '_status'):
-            return super_get()
-
-        status = super_get()
-
-        if status.is_ready:
-            self._status = status
-            return status
-
-        return self.resolve_remote_response(remote.query(self.task_id))
-
     def response(self, status=None, result=None):
         """
         Returns a unified status response.
@@ -116,5 +171,39 @@ class AbacusAsyncResult(AsyncResult):
         ret = dict(status=status.value, id=self.task_id)
         if status == TaskStatus.SUCCESS:
             ret['output'] = result if result is not None else self.result
+        elif status == TaskStatus.RUNNING:
+            progress = self.progress
+            if progress is not None:
+                ret['progress'] = progress['fraction']
 
         return ret
+
+
+def reconcile_remote_tasks(min_age=10 * 60):
+    """
+    Queries remote servers for unfinished tasks older than `min_age` seconds,
+    in case their callbacks were lost.
+
+    Returns the number of tasks reconciled.
+    """
+    counter = 0
+
+    for task_id in list(storage.smembers(REMOTE_TASKS_KEY)):
+        result = AbacusAsyncResult(task_id)
+        status = result.status
+
+        if status == TaskStatus.GONE or status.is_ready:
+            storage.srem(REMOTE_TASKS_KEY, task_id)
+            continue
+
+        if time.time() - (result.started or 0) < min_age:
+            continue
+
+        try:
+            result.resolve_remote_response(remote.query(task_id))
+        except Exception as e:
+            logger.warning('Failed to reconcile remote task %s: %s' % (task_id, e))
+        else:
+            counter += 1
+
+    return counter
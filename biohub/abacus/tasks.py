@@ -1,13 +1,12 @@
 import io
-import psutil
-import subprocess
+import os
 import logging
 
 from django.core.files.storage import default_storage
 
-from biohub.core.tasks import Task
-from biohub.abacus.conf import settings
-from biohub.abacus.result import AbacusAsyncResult
+from biohub.core.tasks import Task, Interval
+from biohub.abacus.engine import engine
+from biohub.abacus.result import AbacusAsyncResult, reconcile_remote_tasks
 
 logger = logging.getLogger('biohub.abacus.tasks')
 
@@ -16,54 +15,60 @@ class AbacusTask(Task):
 
     async_result_class = AbacusAsyncResult
 
+    # ABACUS jobs take minutes, which should not block quick tasks
+    priority = -1
+
     def before_interrupt(self):
 
-        if self.abacus_process is not None:
-            self.abacus_process.terminate()
-            self.abacus_process.wait()
+        if self.abacus_job is not None:
+            self.abacus_job.cancel()
+            self.abacus_job.wait()
 
-    def run(self, input_file_name):
+    def run(self, input_path):
+        """
+        `input_path` is an absolute path of the input file, which will be
+        removed once the task finished.
+        """
 
-        self.abacus_process = None
+        self.abacus_job = None
 
         with io.StringIO('') as empty_file:
             output_file_name = default_storage.save(
-                'abacus_output_' + input_file_name,
+                'abacus_output_' + os.path.basename(input_path),
                 empty_file
             )
 
         try:
-            arguments = ['java',
-                         '-jar', settings.ABACUS_JAR_PATH,
-                         '-design',
-                         '-dir', settings.ABACUS_DATABASE_PATH,
-                         '-in', default_storage.path(input_file_name),
-                         '-out', default_storage.path(output_file_name)
-                         ]
-            p = self.abacus_process = subprocess.Popen(arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            psutil.Process(p.pid).nice(10)
-
-            while 1:
+            job = self.abacus_job = engine.submit(
+                input_path,
+                default_storage.path(output_file_name)
+            )
+
+            while not job.wait(1):
                 self.check_interrupt()
-                try:
-                    output, error = p.communicate(timeout=1)
-                except subprocess.TimeoutExpired:
-                    continue
-                else:
-                    break
-
-            if p.returncode != 0 or b'ENERGY' not in output:
+
+            if not job.succeeded:
                 default_storage.delete(output_file_name)
-                error_msg = (
-                    'ABACUS failed.\nExit Code: {code}\nStdout: {output}\nStderr: {error}'
-                    .format(code=p.returncode, output=output.decode(), error=error.decode())
-                )
+                error_msg = 'ABACUS failed.\n' + job.describe()
                 logger.error('Task {} failed.\n{}'.format(self.task_id, error_msg))
                 raise RuntimeError(error_msg)
-            else:
-                # Success
-                pass
         finally:
-            default_storage.delete(input_file_name)
+            try:
+                os.remove(input_path)
+            except OSError:
+                pass
 
         return default_storage.url(output_file_name)
+
+
+class ReconcileRemoteTask(Task):
+    """
+    Queries remote servers for tasks whose callbacks were lost, which could
+    only be done by running `reconcileabacus` manually.
+    """
+
+    schedule = Interval(minutes=10)
+    priority = -1
+
+    def run(self):
+        return reconcile_remote_tasks()
@@ -1,8 +1,9 @@
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from rest_framework import views, permissions, parsers
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from .handlers import get_handler, query
-from .result import AbacusAsyncResult
+from .result import AbacusAsyncResult, remote_status_mapping
 from .security import validate_signature
 
 
@@ -11,6 +12,15 @@ class StartView(views.APIView):
     permission_classes = (permissions.IsAuthenticated,)
     parser_classes = (parsers.MultiPartParser, parsers.FormParser,)
 
+    def initialize_request(self, request, *args, **kwargs):
+        """
+        Uploaded files are always streamed to temporary files, which will then
+        be moved or streamed to ABACUS instead of being copied in memory.
+        """
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+
+        return super(StartView, self).initialize_request(request, *args, **kwargs)
+
     def post(self, request):
         handler = get_handler(request)
         return Response(handler.start_task(request.user))
@@ -38,10 +48,17 @@ class CallbackView(views.APIView):
         if async_result._get_field('status') is None:
             self.fail('Task not exists.')
 
+        if async_result.status.is_ready:
+            return Response('')
+
         if 'error' in request.GET:
             async_result.error(None)
         elif 'output' in request.GET:
             async_result.resolve(request.GET['output'])
+        elif 'status' in request.GET:
+            if request.GET['status'] not in remote_status_mapping:
+                self.fail('Bad status.')
+            async_result.resolve_remote_response(dict(status=request.GET['status']))
         else:
-            self.fail('Should specify either error or output.')
+            self.fail('Should specify either error, output or status.')
         return Response('')
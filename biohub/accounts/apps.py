@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     name = 'biohub.accounts'
     label = 'accounts'
+
+    def ready(self):
+        from biohub.accounts import signals  # noqa
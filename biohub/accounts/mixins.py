@@ -4,17 +4,22 @@ from rest_framework.response import Response
 from rest_framework import viewsets
 from rest_framework.exceptions import NotFound
 
+from biohub.utils.rest import pagination
+
 from .serializers import UserSerializer
 from .models import User
 
 
 class UserPaginationMixin(object):
 
+    user_pagination_class = pagination.factory('KeysetPagination', ordering=('id',))
+
     def paginate_user_queryset(self, queryset):
-        page = self.paginate_queryset(queryset.order_by('id'))
+        paginator = self.user_pagination_class()
+        page = paginator.paginate_queryset(queryset.order_by('id'), self.request, view=self)
         if page is not None:
             serializer = UserSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            return paginator.get_paginated_response(serializer.data)
 
         serializer = UserSerializer(page, many=True)
         return Response(serializer.data)
@@ -1,6 +1,7 @@
 import hashlib
+from collections import defaultdict
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.utils.functional import cached_property
 from django.core.validators import MaxLengthValidator
 
@@ -118,17 +119,34 @@ class User(AbstractBaseUser):
         To follow a specific user.
         """
 
-        if (target_user.id == self.id or
-                target_user.followers.filter(pk=self.id).exists()):
+        if target_user.id == self.id:
             return
 
-        target_user.followers.add(self)
+        with transaction.atomic():
+            # Locks the followed user, so that concurrent follows are
+            # serialized and counted only once
+            User.objects.select_for_update().filter(pk=target_user.id).exists()
+
+            if target_user.followers.filter(pk=self.id).exists():
+                return
+
+            target_user.followers.add(self)
+            UserCounter.objects.adjust(target_user.id, followers=1)
+            UserCounter.objects.adjust(self.id, following=1)
 
     def unfollow(self, target_user):
         """
         To unfollow a specific user.
         """
-        target_user.followers.remove(self)
+        with transaction.atomic():
+            # Locks the relation, so that it's uncounted only once
+            if not User.followers.through.objects.select_for_update().filter(
+                    from_user_id=target_user.id, to_user_id=self.id).exists():
+                return
+
+            target_user.followers.remove(self)
+            UserCounter.objects.adjust(target_user.id, followers=-1)
+            UserCounter.objects.adjust(self.id, following=-1)
 
     def update_avatar(self, url):
         old_name = url_to_filename(self.avatar_url)
@@ -141,3 +159,110 @@ class User(AbstractBaseUser):
 
     def get_router_arguments(self):
         return 'user', self.username
+
+
+class UserCounterQuerySet(models.QuerySet):
+
+    counter_fields = ('followers', 'following', 'stars', 'experiences')
+
+    def adjust(self, user_id, **deltas):
+        """
+        Increases counters of user `user_id` by `deltas`, e.g.
+        `adjust(1, stars=-1)`. Should be called in the same transaction as
+        the changes counted.
+        """
+        changes = {
+            name: models.F(name) + delta
+            for name, delta in deltas.items()
+        }
+        counters = self.filter(user_id=user_id)
+
+        if counters.update(**changes):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, **deltas)
+        except IntegrityError:
+            # Created concurrently
+            counters.update(**changes)
+
+    def stats(self, user):
+        """
+        Returns a dict of counters of `user`, with one query.
+        """
+        values = self.filter(user=user).values(*self.counter_fields).first()
+
+        return values or dict.fromkeys(self.counter_fields, 0)
+
+    def actual(self):
+        """
+        Returns a dict mapping ids of users to their actual counts, computed
+        from the relations.
+        """
+        from biohub.forum.models import Experience
+        from biohub.biobrick.models import StarredUser
+
+        through = User.followers.through
+        result = defaultdict(lambda: dict.fromkeys(self.counter_fields, 0))
+        sources = (
+            ('followers', through.objects.all(), 'from_user_id'),
+            ('following', through.objects.all(), 'to_user_id'),
+            ('stars', StarredUser.objects.all(), 'user_id'),
+            ('experiences', Experience.objects.filter(author__isnull=False), 'author_id')
+        )
+
+        for name, queryset, field in sources:
+            rows = queryset.order_by().values(field)\
+                .annotate(count=models.Count('*')).values_list(field, 'count')
+
+            for user_id, count in rows:
+                result[user_id][name] = count
+
+        return result
+
+    def recount(self):
+        """
+        Recounts the counters from the relations, to repair drift. Returns the
+        number of users whose counters were fixed.
+        """
+        counter = 0
+
+        with transaction.atomic():
+            actual = self.actual()
+
+            for item in self.select_for_update():
+                values = actual.pop(item.user_id, dict.fromkeys(self.counter_fields, 0))
+
+                if all(getattr(item, name) == values[name] for name in self.counter_fields):
+                    continue
+
+                counter += 1
+                self.filter(pk=item.pk).update(**values)
+
+            self.bulk_create(
+                UserCounter(user_id=user_id, **values)
+                for user_id, values in actual.items()
+            )
+
+        return counter + len(actual)
+
+
+class UserCounter(models.Model):
+    """
+    Denormalized numbers of followers, followed users, starred bricks and
+    experiences of each user, which are maintained along with the changes,
+    and can be repaired by the `recount` command.
+    """
+
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='counter',
+        on_delete=models.CASCADE)
+    followers = models.IntegerField(default=0)
+    following = models.IntegerField(default=0)
+    stars = models.IntegerField(default=0)
+    experiences = models.IntegerField(default=0)
+
+    objects = UserCounterQuerySet.as_manager()
@@ -0,0 +1,24 @@
+from django.db import models
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from biohub.accounts.models import User, UserCounter
+
+
+@receiver(pre_delete, sender=User)
+def uncount_follows_of_user(instance, **kwargs):
+    """
+    Decreases counters of users on the other side of the follows of
+    `instance`, which are removed by the cascade without being uncounted.
+    """
+    follows = User.followers.through.objects
+
+    followed = follows.filter(to_user_id=instance.id)\
+        .exclude(from_user_id=instance.id).values('from_user_id')
+    UserCounter.objects.filter(user__in=models.Subquery(followed))\
+        .update(followers=models.F('followers') - 1)
+
+    followers = follows.filter(from_user_id=instance.id)\
+        .exclude(to_user_id=instance.id).values('to_user_id')
+    UserCounter.objects.filter(user__in=models.Subquery(followers))\
+        .update(following=models.F('following') - 1)
@@ -9,13 +9,11 @@ from django.core.files.storage import default_storage
 from django.db import models
 
 from biohub.utils.rest import pagination, permissions as p
-from biohub.forum.models import Experience
-from biohub.biobrick.models import StarredUser
 from biohub.core.files.utils import store_file
 
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer,\
     ChangePasswordSerializer, PasswordResetRequestSerializer, PasswordResetPerformSerializer
-from .models import User
+from .models import User, UserCounter
 from .mixins import BaseUserViewSetMixin, re_user_lookup_value
 
 
@@ -151,16 +149,14 @@ class UserViewSet(
     @decorators.detail_route(['GET'])
     def stat(self, request, *args, **kwargs):
 
-        user = self.get_object()
+        stats = UserCounter.objects.stats(self.get_object())
 
-        result = {
-            'follower_count': user.followers.count(),
-            'following_count': User.followers.through.objects.filter(to_user_id=user.id).count(),
-            'star_count': StarredUser.objects.filter(user=user).count(),
-            'experience_count': Experience.objects.filter(author=user).count()
-        }
-
-        return Response(result)
+        return Response({
+            'follower_count': stats['followers'],
+            'following_count': stats['following'],
+            'star_count': stats['stars'],
+            'experience_count': stats['experiences']
+        })
 
 
 class UserRelationViewSet(mixins.ListModelMixin, BaseUserViewSetMixin):
@@ -5,7 +5,7 @@ from django.core.cache import cache
 from django.utils import timezone
 from django.db import models, transaction
 
-from biohub.accounts.models import User
+from biohub.accounts.models import User, UserCounter
 from biohub.utils.db import PackedField
 from biohub.forum.user_defined_signals import rating_brick_signal, \
     watching_brick_signal, unwatching_brick_signal
@@ -303,6 +303,7 @@ class Biobrick(MetaBase, WeightBase):
             StarredUser.objects.create(brick=meta, user=user)
             meta.stars += 1
             meta.save()
+            UserCounter.objects.adjust(user.pk, stars=1)
 
         return True
 
@@ -314,6 +315,7 @@ class Biobrick(MetaBase, WeightBase):
             if num:
                 BiobrickMeta.objects.filter(part_name=self.part_name)\
                     .update(stars=models.F('stars') - 1)
+                UserCounter.objects.adjust(user.pk, stars=-1)
                 return True
             else:
                 return False
@@ -0,0 +1,22 @@
+import io
+
+from django.core.management import call_command
+
+from biohub.core.tasks import Task, Crontab
+
+
+class RefreshWeightTask(Task):
+    """
+    Recalculates weights of new bricks and updates their indexes, which was
+    a crontab job installed by `installjob`.
+    """
+
+    schedule = Crontab('*/30 * * * *')
+    priority = -1
+    max_timeout = 30 * 60
+
+    def run(self):
+        output = io.StringIO()
+        call_command('refreshweight', update_index=True, stdout=output)
+
+        return output.getvalue()
@@ -0,0 +1,21 @@
+import io
+
+from django.core.management import call_command
+
+from biohub.core.tasks import Task, Crontab
+
+
+class RebuildGraphTask(Task):
+    """
+    Rebuilds the graph of bricks, daily.
+    """
+
+    schedule = Crontab('30 4 * * *')
+    priority = -1
+    max_timeout = 2 * 60 * 60
+
+    def run(self):
+        output = io.StringIO()
+        call_command('installgraph', stdout=output)
+
+        return output.getvalue()
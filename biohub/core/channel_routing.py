@@ -2,8 +2,10 @@ from channels.routing import route
 
 from biohub.core.websocket.consumers import MainConsumer
 from biohub.core.tasks.consumers import task_consumer
+from biohub.notices.consumers import flush_stats_consumer
 
 channels_routing = [
     MainConsumer.as_route(path=r'^/ws/'),
-    route('task', task_consumer)
+    route('task', task_consumer),
+    route('notices.flush', flush_stats_consumer)
 ]
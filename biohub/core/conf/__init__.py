@@ -30,6 +30,11 @@ mapping = {
     'SECRET_KEY': ('SECRET_KEY', ''),
     'BIOHUB_MAX_TASKS': ('MAX_TASKS', lambda: multiprocessing.cpu_count() * 5),
     'BIOHUB_TASK_MAX_TIMEOUT': ('TASK_MAX_TIMEOUT', 180),
+    'BIOHUB_TASK_RESULT': ('TASK_RESULT', lambda: {
+        'serializer': 'msgpack',
+        'compress_threshold': 4096,
+        'spill_threshold': 1024 * 1024
+    }),
     'EMAIL': ('EMAIL', dict),
     'CORS': ('CORS', list),
     'ES_URL': ('ES_URL', 'http://127.0.0.1:9200/'),
@@ -169,6 +174,19 @@ class Settings(object):
 
         return value
 
+    def validate_biohub_task_result(self, value, default):
+
+        if not isinstance(value, dict):
+            raise TypeError("'TASK_RESULT' should be a dict, got type %r." % type(type(value)))
+
+        default_value = default()
+        default_value.update(value)
+
+        assert default_value['serializer'] in ('msgpack', 'pickle'), \
+            "'TASK_RESULT.serializer' should be either 'msgpack' or 'pickle'."
+
+        return default_value
+
     def validate_upload_dir(self, value, default):
 
         if value.startswith(tempfile.gettempdir()):
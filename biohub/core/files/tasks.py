@@ -0,0 +1,15 @@
+from biohub.core.tasks import Task, Crontab
+from biohub.core.files.clean_unused import clean_unused
+
+
+class CleanUnusedTask(Task):
+    """
+    Removes media files no longer referenced, daily.
+    """
+
+    schedule = Crontab('0 4 * * *')
+    priority = -1
+    max_timeout = 30 * 60
+
+    def run(self):
+        clean_unused()
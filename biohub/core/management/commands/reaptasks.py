@@ -0,0 +1,11 @@
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+
+    help = 'Retries or fails running tasks whose workers have died.'
+
+    def handle(self, **options):
+        from biohub.core.tasks.broker import broker
+
+        self.stdout.write('{} task(s) recovered.'.format(broker.reap()))
@@ -0,0 +1,46 @@
+import json
+
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+
+    help = 'Prints the queue depth, running count, wait time histogram and memory usage of the task broker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--json', action='store_true', default=False,
+            help='Prints metrics in JSON format.'
+        )
+        parser.add_argument(
+            '--task', '-t', action='append', default=[],
+            help='Prints memory usage of the task with given id instead.'
+        )
+
+    def handle(self, **options):
+        from biohub.core.tasks.broker import broker
+        from biohub.core.tasks import AsyncResult
+
+        if options['task']:
+            for task_id in options['task']:
+                usage, spilled = AsyncResult(task_id).memory_usage()
+                self.stdout.write(
+                    '{}: {} bytes in redis, {} bytes spilled'.format(task_id, usage, spilled))
+            return
+
+        metrics = broker.metrics()
+
+        if options['json']:
+            self.stdout.write(json.dumps(metrics))
+            return
+
+        self.stdout.write('queued: {queued}'.format(**metrics))
+        self.stdout.write('running: {running}/{max_tasks}'.format(**metrics))
+        self.stdout.write(
+            'memory of running tasks: {redis} bytes in redis, {spilled} bytes spilled'.format(
+                **metrics['memory']))
+
+        wait_time = metrics['wait_time']
+        self.stdout.write('wait time (count {count}, sum {sum:.3f}s):'.format(**wait_time))
+        for bound, count in wait_time['buckets']:
+            self.stdout.write('  <= {}s: {}'.format(bound, count))
@@ -1,8 +1,11 @@
 from .registry import tasks  # noqa
 from .base import Task  # noqa
-from .broker import apply_async  # noqa
+from .broker import apply_async, apply_many, group  # noqa
 from .status import TaskStatus  # noqa
 from .result import AsyncResult  # noqa
+from .group import GroupResult  # noqa
+from .schedule import Interval, Crontab  # noqa
+from . import periodic  # noqa
 
 GONE = TaskStatus.GONE
 SUCCESS = TaskStatus.SUCCESS
@@ -0,0 +1,206 @@
+"""
+This module contains the result backend, which serializes payloads and results
+of tasks before they are stored in redis.
+
+Each serialized value starts with a tag byte:
+
+ + b'm': msgpack, used for plain data (dicts, lists, strings, numbers, etc.);
+ + b'p': pickle, used for anything else (tuples, exceptions, etc.);
+ + b'M' / b'P': the same as above, but compressed by zlib;
+ + b'f': a reference to a file under UPLOAD_DIR, which holds the serialized
+   value spilled out of redis since it's too large.
+
+The behavior is configured by `BIOHUB_TASK_RESULT`.
+"""
+
+import os
+import time
+import zlib
+import pickle
+import logging
+import tempfile
+
+from biohub.core.conf import settings as biohub_settings
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+logger = logging.getLogger('biohub.core.tasks')
+
+PICKLE = b'p'
+MSGPACK = b'm'
+FILE = b'f'
+
+_msgpack_types = (type(None), bool, int, float, str, bytes)
+
+
+def is_msgpack_native(value):
+    """
+    Checks if `value` can be restored by msgpack without losing its type.
+    """
+    if isinstance(value, _msgpack_types):
+        return not isinstance(value, int) or -2 ** 63 <= value < 2 ** 64
+    elif type(value) is list:
+        return all(is_msgpack_native(item) for item in value)
+    elif type(value) is dict:
+        return all(
+            isinstance(k, str) and is_msgpack_native(v)
+            for k, v in value.items()
+        )
+
+    return False
+
+
+class PickleSerializer(object):
+
+    def dumps(self, value):
+        return PICKLE + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+class MsgpackSerializer(PickleSerializer):
+    """
+    Serializes plain data with msgpack, which is more compact and faster than
+    pickle, and falls back to pickle for other types.
+    """
+
+    def dumps(self, value):
+        if is_msgpack_native(value):
+            return MSGPACK + msgpack.packb(value, use_bin_type=True)
+
+        return super(MsgpackSerializer, self).dumps(value)
+
+
+def _loads(data):
+    tag, body = data[:1], data[1:]
+
+    if tag.isupper():
+        tag, body = tag.lower(), zlib.decompress(body)
+
+    if tag == MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    elif tag == PICKLE:
+        return pickle.loads(body)
+
+    raise ValueError('Unknown tag %r.' % tag)
+
+
+class ResultBackend(object):
+
+    def __init__(self, options=None):
+        self._options = options
+
+    @property
+    def options(self):
+        if self._options is None:
+            return biohub_settings.BIOHUB_TASK_RESULT
+
+        return self._options
+
+    @property
+    def serializer(self):
+        if self.options['serializer'] == 'msgpack' and msgpack is not None:
+            return MsgpackSerializer()
+
+        return PickleSerializer()
+
+    @property
+    def spill_directory(self):
+        return os.path.join(biohub_settings.UPLOAD_DIR, 'task_results')
+
+    def dumps(self, value, task_id=None):
+        """
+        Serializes `value`. Large data will be compressed, and larger data
+        will be spilled to a file, named after `task_id` if given.
+        """
+        data = self.serializer.dumps(value)
+
+        if len(data) > self.options['compress_threshold']:
+            compressed = zlib.compress(data[1:])
+            if len(compressed) < len(data) - 1:
+                data = data[:1].upper() + compressed
+
+        if len(data) > self.options['spill_threshold']:
+            data = FILE + self._spill(data, task_id).encode()
+
+        return data
+
+    def loads(self, data):
+        """
+        Restores a value serialized by `dumps`. Returns None if the spilled file
+        is gone.
+        """
+        if data[:1] == FILE:
+            try:
+                with open(data[1:].decode(), 'rb') as fp:
+                    data = fp.read()
+            except FileNotFoundError:
+                return None
+
+        return _loads(data)
+
+    def is_serialized(self, data):
+        return data[:1].lower() in (MSGPACK, PICKLE, FILE)
+
+    def _spill(self, data, task_id=None):
+        os.makedirs(self.spill_directory, exist_ok=True)
+
+        prefix = ''
+        if task_id is not None and os.path.basename(task_id) == task_id:
+            prefix = task_id + '.'
+
+        fd, path = tempfile.mkstemp(prefix=prefix, dir=self.spill_directory)
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+
+        return path
+
+    def clean(self, max_age=None):
+        """
+        Removes spilled files older than `max_age` seconds, default to the
+        expiry of task results. Files of tasks still existing (e.g. queued or
+        running ones) are kept regardless of their age. Returns the number of
+        files removed.
+        """
+        from biohub.core.tasks.result import AsyncResult, get_result_timeout
+
+        if max_age is None:
+            max_age = get_result_timeout()
+
+        counter = 0
+        deadline = time.time() - max_age
+
+        try:
+            entries = list(os.scandir(self.spill_directory))
+        except FileNotFoundError:
+            return 0
+
+        for entry in entries:
+            task_id = entry.name.rpartition('.')[0]
+            if task_id and AsyncResult(task_id).exists():
+                continue
+
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.remove(entry.path)
+                    counter += 1
+            except OSError as e:
+                logger.warning('Failed to remove spilled result %s: %s' % (entry.path, e))
+
+        return counter
+
+    def spilled_size(self, data):
+        """
+        Returns the size of the file `data` refers to, or 0 if not spilled.
+        """
+        if data[:1] != FILE:
+            return 0
+
+        try:
+            return os.path.getsize(data[1:].decode())
+        except OSError:
+            return 0
+
+
+backend = ResultBackend()
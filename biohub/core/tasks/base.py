@@ -1,8 +1,13 @@
+import time
+
+from django.utils.functional import cached_property
+
 from biohub.core.tasks.registry import tasks
 from biohub.core.tasks.exceptions import TaskInterruption
 from biohub.core.tasks.executors import get_executor
 from biohub.core.tasks.payload import TaskPayload
 from biohub.core.tasks.result import AsyncResult
+from biohub.core.tasks.progress import EventStream, PROGRESS, PARTIAL
 
 
 class TaskBase(type):
@@ -32,6 +37,32 @@ class Task(object, metaclass=TaskBase):
 
     async_result_class = AsyncResult
 
+    # Either 'thread' or 'process'. Tasks of 'process' type run in separate
+    # processes, which is suitable for CPU-bound tasks and can be terminated
+    # on timeout without calling `check_interrupt`.
+    executor_type = 'thread'
+
+    # Tasks of higher priority run first, which can be overridden by the
+    # `priority` option of `apply_async`. Should be between -9 and 9.
+    priority = 0
+
+    # How many times the task will be retried if lost due to crashes of
+    # workers, see `Broker.reap`. Tasks not idempotent should keep it 0.
+    max_retries = 0
+
+    # The maximum timeout in seconds, default to `BIOHUB_TASK_MAX_TIMEOUT`.
+    # Can be raised for tasks known to run long, such as maintenance jobs.
+    max_timeout = None
+
+    # Set to an `Interval` or a `Crontab` (see `biohub.core.tasks.schedule`)
+    # to make the task recurring. Recurring tasks are applied without
+    # arguments.
+    schedule = None
+
+    # The minimum interval in seconds between two progress reports, reports
+    # in between will be dropped.
+    progress_interval = .5
+
     def __init__(self, arg):
         """
         `arg` should be a string or a `TaskPayload` instance. If it's a string,
@@ -47,6 +78,7 @@ class Task(object, metaclass=TaskBase):
             self.task_id = arg.task_id
             self.payload = arg
             self._interrupted = False
+            self._last_reported = None
         else:
             raise TypeError(
                 "'arg' should be either a str or a TaskPayload, got '%r'."
@@ -62,6 +94,49 @@ class Task(object, metaclass=TaskBase):
         """
         raise NotImplementedError
 
+    @cached_property
+    def events(self):
+        return EventStream(self.task_id, self.payload.options.get('timeout'))
+
+    def _publish(self, type, **data):
+        """
+        Appends an event to the stream of the task, and pushes it to the owner
+        via websocket.
+        """
+        from biohub.core.websocket.tool import broadcast_user
+
+        event = self.events.append(type, **data)
+        owner = self.payload.options.get('owner')
+
+        if owner is not None:
+            broadcast_user('tasks', owner, dict(event, task_id=self.task_id))
+
+        return event
+
+    def report_progress(self, fraction, message=''):
+        """
+        Reports the progress of the task, where `fraction` is between 0 and 1.
+
+        Reports are throttled by `progress_interval`, except the first one
+        and the one reporting completion. Returns the event published, or None
+        if dropped.
+        """
+        now = time.time()
+        fraction = max(0., min(1., float(fraction)))
+
+        if self._last_reported is not None and fraction < 1 and \
+                now - self._last_reported < self.progress_interval:
+            return None
+
+        self._last_reported = now
+        return self._publish(PROGRESS, fraction=fraction, message=message)
+
+    def emit(self, partial):
+        """
+        Publishes a partial result, which should be serializable.
+        """
+        return self._publish(PARTIAL, data=partial)
+
     def interrupt(self):
         """
         Marks this task interrupted.
@@ -101,6 +176,15 @@ class Task(object, metaclass=TaskBase):
         instance = cls(payload)
         get_executor(instance).execute()
 
+    @classmethod
+    def execute_async(cls, payload):
+        """
+        The same as `execute`, but returns a coroutine to be run in the loop
+        of the runtime.
+        """
+        instance = cls(payload)
+        return get_executor(instance).execute_async()
+
     @classmethod
     def apply_async(cls, *args, **kwargs):
         """
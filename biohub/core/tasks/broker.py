@@ -1,4 +1,7 @@
-import threading
+import os
+import time
+import asyncio
+import logging
 from uuid import uuid4
 
 from channels import Channel
@@ -6,8 +9,15 @@ from channels import Channel
 from biohub.core.conf import settings as biohub_settings
 from biohub.core.tasks.registry import tasks
 from biohub.core.tasks.payload import TaskPayload
-from biohub.core.tasks.data_structures import Queue, Set
+from biohub.core.tasks.data_structures import FairQueue, Set, Histogram, Leases
 from biohub.core.tasks.result import AsyncResult
+from biohub.core.tasks.group import GroupResult
+from biohub.core.tasks.status import TaskStatus
+from biohub.core.tasks.storage import storage
+from biohub.core.tasks.executors import runtime
+from biohub.core.tasks.exceptions import TaskLost, TaskInstanceNotExists
+
+logger = logging.getLogger('biohub.core.tasks')
 
 
 def get_task_id(task_name):
@@ -20,8 +30,18 @@ def get_task_id(task_name):
 class Broker(object):
     """
     A manager class to handle tasks queuing, starting.
+
+    Each running task holds a lease, which is renewed every `lease_interval`
+    seconds by the worker supervising it. If the worker dies, the lease will
+    expire after `lease_timeout` seconds, and the task will be retried or
+    failed by the reaper, which runs every `reap_interval` seconds in each
+    worker.
     """
 
+    lease_timeout = 30
+    lease_interval = 10
+    reap_interval = 15
+
     def __init__(self, name, max_tasks=None, timeout=None):
         """
         name: namespace for keys of redis objects.
@@ -38,35 +58,61 @@ class Broker(object):
                            else biohub_settings.BIOHUB_MAX_TASKS)
         self._timeout = (timeout if timeout is not None
                          else biohub_settings.BIOHUB_TASK_MAX_TIMEOUT)
-        self._pending_queue = Queue('%s_pending_queue' % name, redis_client)
+        self._pending_queue = FairQueue('%s_pending_queue' % name, redis_client)
         self._running_set = Set('%s_running_set' % name, redis_client)
+        self._enqueued_times = '%s_enqueued_times' % name
+        self._wait_histogram = Histogram('%s_wait_histogram' % name, redis_client)
+        self._leases = Leases('%s_leases' % name, redis_client)
+        self._reaper_pid = None
 
-    def _enqueue_task(self, task_id):
+    def _enqueue_task(self, task_id, priority=0, owner=None):
         """
-        Puts a task into the task queue, after which checks if there're tasks
-        available to run.
+        Puts a task into the sub-queue of its owner, after which checks if
+        there're tasks available to run.
         """
-        self._pending_queue.enqueue(task_id)
+        storage.hset(self._enqueued_times, task_id, time.time())
         AsyncResult(task_id).pend()
+        self._pending_queue.enqueue(task_id, priority, owner)
         self._dequeue_task()
 
+    def _admit_tasks(self):
+        """
+        Moves tasks from the pending queue into the running set as long as
+        the number of running tasks is under the limit. Tasks of higher
+        priority go first, and owners of the same priority take turns.
+        Returns ids of the admitted tasks.
+
+        The check and the move are done in a single redis script, so that
+        concurrent brokers will never exceed the limit together.
+        """
+        admitted = self._pending_queue.admit(self._running_set, self._max_tasks)
+
+        if not admitted:
+            return admitted
+
+        now = time.time()
+        enqueued_times = list(storage.hmget(self._enqueued_times, admitted))
+        storage.hdel(self._enqueued_times, *admitted)
+
+        for enqueued_time in enqueued_times:
+            if enqueued_time is not None:
+                self._wait_histogram.observe(max(now - enqueued_time, 0))
+
+        return admitted
+
     def _dequeue_task(self):
         """
         Checks if there're tasks available to run, and starts them if yes.
         """
-        while len(self._pending_queue) < self._max_tasks:
-            popped_task_id = self._pending_queue.dequeue()
-            if popped_task_id is None:
-                return
-
-            self._dispatch_task(popped_task_id)
+        for task_id in self._admit_tasks():
+            self._dispatch_task(task_id)
 
     def _dispatch_task(self, task_id):
         """
-        To actually apply a task, by pushing the task id into the running
-        set and sending the id to a channel worker.
+        To actually apply a task, by sending the id of an admitted task to a
+        channel worker.
         """
-        self._running_set.add(task_id)
+        self._leases.renew(task_id, self.lease_timeout)
         AsyncResult(task_id).run()
 
         Channel('task').send({'task_id': task_id})
@@ -81,7 +127,9 @@ class Broker(object):
         task's finishing (timeout, success or error, etc.).
         """
         self._running_set.remove(task_id)
-        self._pending_queue.rdel(task_id)
+        self._pending_queue.remove(task_id)
+        self._leases.remove(task_id)
+        storage.hdel(self._enqueued_times, task_id)
 
     def _task_done(self, task_class, task_id):
         """
@@ -91,21 +139,41 @@ class Broker(object):
         This function is called by `run_task`.
         """
         self._invalidate_task(task_id)
+        self._member_done(task_id)
 
         self._dequeue_task()
 
-    def _validate_options(self, options):
+    def _validate_options(self, task_class, options):
         """
         To extract and validate running options from the argument `options`.
         """
         validated = {}
+        max_timeout = task_class.max_timeout or self._timeout
         validated['timeout'] = min(
-            options.get('timeout', self._timeout),
-            self._timeout
+            options.get('timeout', max_timeout),
+            max_timeout
+        )
+        validated['priority'] = self._pending_queue.clamp_priority(
+            options.get('priority', task_class.priority)
         )
+        validated['owner'] = options.get('owner', None)
 
         return validated
 
+    def _get_task_class(self, task):
+        from biohub.core.tasks import Task
+
+        # Type checks.
+        if isinstance(task, str):
+            return tasks[task]
+        elif isinstance(task, type) and issubclass(task, Task):
+            return task
+        else:
+            raise TypeError(
+                "`task` should either be a str or a subclass of Task,"
+                " got '%s'."
+                % type(task))
+
     def apply_async(self, task, args=(), kwargs=None, **options):
         """
         Given arguments and running options, creates and pends a task instance.
@@ -118,52 +186,252 @@ class Broker(object):
             pickleable.
         options: running options:
             - timeout: timeout setting of the task, which should not exceed
-                the default timeout of the broker.
+                `max_timeout` of the task, or the default timeout of the
+                broker.
+            - priority: an integer between -9 and 9, default to `priority` of
+                the task class. Tasks of higher priority run first.
+            - owner: who the task runs for, usually the id of a user. Pending
+                tasks of different owners are scheduled in turn.
+            - task_id: id of the instance, generated if not given. Useful to
+                store extra fields of the instance before it's dispatched.
         """
-        from biohub.core.tasks import Task
+        task_class = self._get_task_class(task)
+        task_id = options.pop('task_id', None)
+        options = self._validate_options(task_class, options)
 
-        # Type checks.
-        if isinstance(task, str):
-            task_class = tasks[task]
-        elif issubclass(task, Task):
-            task_class = task
-        else:
-            raise TypeError(
-                "`task` should either be a str or a subclass of Task,"
-                " got '%s'."
-                % type(task))
+        return self._apply_many(task_class, [args], kwargs, options, task_ids=[task_id])[0]
+
+    def apply_many(self, task, arg_list, kwargs=None, **options):
+        """
+        Creates and pends a task instance for each item of `arg_list`, which
+        are positional arguments of the instances. `kwargs` and `options` are
+        shared by all the instances, see `apply_async`.
+
+        All the instances are stored and queued in a single round trip.
+        Returns a list of AsyncResult.
+        """
+        task_class = self._get_task_class(task)
+        options = self._validate_options(task_class, options)
+
+        return self._apply_many(task_class, arg_list, kwargs, options)
+
+    def group(self, task, arg_list, kwargs=None, callback=None,
+              callback_kwargs=None, callback_options=None, **options):
+        """
+        Applies tasks like `apply_many`, and tracks them as a group. Returns a
+        GroupResult.
+
+        If `callback` (a string or a subclass of Task) given, it will be
+        applied once all the members finished, with a list of their results
+        as the only positional argument (see `GroupResult.get`), along with
+        `callback_kwargs` and `callback_options`.
+        """
+        task_class = self._get_task_class(task)
+        options = self._validate_options(task_class, options)
+
+        if callback is not None:
+            callback = (
+                self._get_task_class(callback).task_name,
+                callback_kwargs,
+                callback_options or {}
+            )
+
+        group_result = GroupResult(get_task_id('group'))
+        self._apply_many(task_class, arg_list, kwargs, options, group_result, callback)
+
+        # No member to wait for
+        if not group_result.total:
+            group_result._finish(self)
+
+        return group_result
 
+    def _apply_many(self, task_class, arg_list, kwargs, options,
+                    group_result=None, callback=None, task_ids=None):
+        """
+        Stores payloads, statuses and queue entries of new task instances in
+        a single pipeline, and then checks if there're tasks available to
+        run. Ids of the instances are taken from `task_ids` if given (None
+        items generated).
+        """
         task_name = task_class.task_name
-        options = self._validate_options(options)
-        task_id = get_task_id(task_name)
-        TaskPayload(task_name, task_id, args, kwargs, options).store()
+        enqueued_time = storage.encode(time.time())
+        enqueued_times = storage.make_key(self._enqueued_times)
+        fields = {'status': TaskStatus.PENDING}
+        results = []
+
+        if group_result is not None:
+            fields['group'] = group_result.group_id
+
+        with storage.pipeline() as pipe:
+            for args, task_id in zip(arg_list, task_ids or [None] * len(arg_list)):
+                task_id = task_id or get_task_id(task_name)
+                payload = TaskPayload(task_name, task_id, args, kwargs, options)
+                async_result = task_class.async_result(task_id)
+
+                async_result._write(dict(fields, payload=payload.packed_data), pipe=pipe)
+                pipe.hset(enqueued_times, storage.make_key(task_id), enqueued_time)
+                self._pending_queue.enqueue(
+                    task_id, options['priority'], options['owner'], client=pipe)
+
+                results.append(async_result)
+
+            if group_result is not None:
+                group_result._create(
+                    task_name, [result.task_id for result in results], callback, pipe)
+
+            pipe.execute()
+
+        self._dequeue_task()
+
+        return results
 
-        self._enqueue_task(task_id)
+    def _member_done(self, task_id):
+        """
+        Notifies the group of a finished task, if it belongs to one.
+        """
+        group_id = storage.hget(AsyncResult(task_id)._storage_key, 'group')
+
+        if group_id is not None:
+            GroupResult(group_id)._member_done(self)
 
-        return task_class.async_result(task_id)
+    async def _heartbeat(self, task_id):
+        """
+        Renews the lease of a task periodically until cancelled.
+        """
+        while True:
+            self._leases.renew(task_id, self.lease_timeout)
+            await asyncio.sleep(self.lease_interval)
 
-    def _run_task(self, task_id):
+    async def _run_task(self, task_id):
         """
-        To actually run a task.
+        To actually run a task, which is supervised by the loop of the
+        runtime. Blocking operations are done in the shared pool.
 
         This function is called by channel handlers and not suggested to be
         called manually.
         """
-        payload = TaskPayload.from_task_id(task_id)
+        loop = runtime.loop
+        heartbeat = loop.create_task(self._heartbeat(task_id))
+        task_class = None
 
         try:
+            payload = await loop.run_in_executor(None, TaskPayload.from_task_id, task_id)
             task_class = tasks[payload.task_name]
-            task_class.execute(payload)
+            await task_class.execute_async(payload)
         finally:
-            self._task_done(task_class, task_id)
+            heartbeat.cancel()
+            await loop.run_in_executor(None, self._task_done, task_class, task_id)
 
     def run_task(self, task_id):
         """
-        Starts a supervisor thread to execute _run_task.
+        Submits _run_task to the runtime of current worker, without waiting
+        for it.
+        """
+        self._ensure_reaper()
+        runtime.submit(self._run_task(task_id))
+
+    def _ensure_reaper(self):
+        if self._reaper_pid == os.getpid():
+            return
+
+        self._reaper_pid = os.getpid()
+        runtime.submit(self._reap_forever())
+
+    async def _reap_forever(self):
+        loop = runtime.loop
+
+        while True:
+            await asyncio.sleep(self.reap_interval)
+
+            try:
+                await loop.run_in_executor(None, self.reap)
+            except Exception:
+                logger.exception('Failed to reap tasks.')
+
+    def reap(self):
+        """
+        Recovers running tasks whose leases expired, which are most likely
+        lost due to crashes of workers. A lost task will be re-queued if it
+        can be retried (see `Task.max_retries`), otherwise it fails with
+        TaskLost.
+
+        Tasks in the running set without leases (e.g. the broker crashed
+        before dispatching them) are given a lease, and will be recovered if
+        nobody renews it.
+
+        Returns the number of tasks recovered.
+        """
+        for task_id in self._running_set:
+            if task_id not in self._leases:
+                self._leases.renew(task_id, self.lease_timeout)
+
+        counter = 0
+
+        for task_id in self._leases.expired():
+            # Only one reaper can claim the task
+            if not self._leases.remove(task_id):
+                continue
+
+            if task_id in self._running_set:
+                self._recover_task(task_id)
+                counter += 1
+
+        if counter:
+            self._dequeue_task()
+
+        return counter
+
+    def _recover_task(self, task_id):
+        try:
+            payload = TaskPayload.from_task_id(task_id)
+            task_class = tasks[payload.task_name]
+        except (TaskInstanceNotExists, KeyError):
+            self._invalidate_task(task_id)
+            return
+
+        async_result = task_class.async_result(task_id)
+        attempts = (async_result.attempts or 0) + 1
+
+        self._running_set.remove(task_id)
+
+        if attempts <= task_class.max_retries:
+            logger.warning('Task %s was lost, retrying (%s).' % (task_id, attempts))
+            async_result._set_attempts(attempts)
+            storage.hset(self._enqueued_times, task_id, time.time())
+            async_result.pend()
+            self._pending_queue.enqueue(
+                task_id, payload.options.get('priority', 0), payload.options.get('owner'))
+        else:
+            logger.error('Task %s was lost.' % task_id)
+            async_result.error(TaskLost(task_id, attempts))
+            self._member_done(task_id)
+
+    def metrics(self):
+        """
+        Returns a dict describing the load of the broker, including:
+
+         + queued: the number of pending tasks;
+         + running: the number of running tasks;
+         + max_tasks: the limit of running tasks;
+         + wait_time: the histogram of seconds tasks spent in the queue;
+         + memory: bytes running tasks take in redis, and in spilled files.
         """
-        threading.Thread(target=self._run_task, args=(task_id,)).start()
+        usages = [AsyncResult(task_id).memory_usage() for task_id in self._running_set]
+
+        return dict(
+            queued=len(self._pending_queue),
+            running=len(self._running_set),
+            max_tasks=self._max_tasks,
+            wait_time=self._wait_histogram.snapshot(),
+            memory=dict(
+                redis=sum(usage for usage, _ in usages),
+                spilled=sum(spilled for _, spilled in usages)
+            )
+        )
 
 
 broker = Broker('default')
 
 apply_async = broker.apply_async
+apply_many = broker.apply_many
+group = broker.group
@@ -2,6 +2,7 @@
 This module contains multiple classes to wrap data structures of redis.
 """
 
+import time
 import functools
 
 from biohub.core.tasks.storage import storage
@@ -40,6 +41,13 @@ class DataStructureBase(object):
         self._name = name
         self._storage = RedisProxy(self._name)
 
+    @property
+    def key(self):
+        """
+        The full redis key of the structure, which is useful in scripts.
+        """
+        return storage.make_key(self._name)
+
 
 class Set(DataStructureBase):
     """
@@ -59,7 +67,7 @@ class Set(DataStructureBase):
         return bool(self._storage.sismember(value))
 
     def __iter__(self):
-        return self._storage.smembers()
+        return iter(self._storage.smembers())
 
 
 class Queue(DataStructureBase):
@@ -83,10 +91,281 @@ class Queue(DataStructureBase):
         self._storage.lrem(-1, obj)
 
     def __iter__(self):
-        return self._storage.lrange(0, -1)
+        return iter(self._storage.lrange(0, -1))
 
     def __len__(self):
         return self._storage.llen()
 
     def __contains__(self, key):
         return self._storage.lindex(key) is not None
+
+
+class Leases(DataStructureBase):
+    """
+    Leases of objects based on redis's ZSET, scored by expiry timestamps.
+    """
+
+    def renew(self, obj, timeout):
+        """
+        Extends the lease of `obj` to `timeout` seconds later.
+        """
+        self._storage.zadd(time.time() + timeout, storage.encode(obj))
+
+    def remove(self, obj):
+        """
+        Removes the lease of `obj`. Returns True if it was there, so that
+        concurrent callers can use it to claim `obj`.
+        """
+        return bool(self._storage.zrem(obj))
+
+    def expired(self):
+        """
+        Returns objects whose leases expired.
+        """
+        return [
+            storage.decode(obj)
+            for obj in self._storage.zrangebyscore('-inf', time.time())
+        ]
+
+    def __contains__(self, obj):
+        return self._storage.zscore(obj) is not None
+
+
+class Histogram(DataStructureBase):
+    """
+    A cumulative histogram based on redis's HASH. Each bucket counts
+    observations less than or equal to its upper bound.
+
+    Values are stored as integers, so the sum is kept in milliseconds.
+    """
+
+    buckets = (.1, .5, 1, 5, 10, 30, 60, 300, float('inf'))
+
+    def observe(self, value):
+        for bound in self.buckets:
+            if value <= bound:
+                self._storage.hincrby(str(bound), 1)
+
+        self._storage.hincrby('sum_ms', int(value * 1000))
+        self._storage.hincrby('count', 1)
+
+    def snapshot(self):
+        """
+        Returns a dict containing counts of buckets, the sum and count of
+        observations.
+        """
+        fields = [str(bound) for bound in self.buckets] + ['sum_ms', 'count']
+        values = [value or 0 for value in self._storage.hmget(fields)]
+
+        return dict(
+            buckets=list(zip(self.buckets, values)),
+            sum=values[-2] / 1000,
+            count=values[-1]
+        )
+
+
+# Scores of tasks in a sub-queue are `-priority * SCALE + seq`, and scores of
+# owners are `-priority * SCALE + turn`, where `priority` is of the head task of
+# the owner's sub-queue. So the smallest score always comes first.
+#
+# Tasks of each priority are also indexed by the number of admissions done
+# when they were enqueued, which tells how many times they have been skipped.
+_fair_queue_helpers = """
+local scale = tonumber(ARGV[2])
+
+local function split(score)
+    score = tonumber(score)
+    local high = math.floor(score / scale)
+    return -high, score - high * scale
+end
+
+local function age_key(priority)
+    return ARGV[3] .. string.format('%d', priority)
+end
+
+local function place_owner(owner, turn)
+    local queue = ARGV[1] .. owner
+    local head = redis.call('ZRANGE', queue, 0, 0, 'WITHSCORES')
+    if #head == 0 then
+        redis.call('ZREM', KEYS[1], owner)
+        return
+    end
+    local priority = split(head[2])
+    redis.call('ZADD', KEYS[1], string.format('%.0f', -priority * scale + turn), owner)
+end
+
+local function replace_owner(owner)
+    local score = redis.call('ZSCORE', KEYS[1], owner)
+    if score then
+        local _, turn = split(score)
+        place_owner(owner, turn)
+    end
+end
+
+local function take(owner, task)
+    local queue = ARGV[1] .. owner
+    local priority = split(redis.call('ZSCORE', queue, task))
+    redis.call('ZREM', queue, task)
+    redis.call('HDEL', KEYS[2], task)
+    redis.call('ZREM', age_key(priority), task)
+end
+"""
+
+
+class FairQueue(DataStructureBase):
+    """
+    A priority queue with fair scheduling among owners, based on redis's
+    sorted sets.
+
+    Each owner (e.g. a user) has its own sub-queue, ordered by priority and
+    then by arrival. Owners are ordered by the priority of their head tasks,
+    and then round-robin, so that a single owner with plenty of tasks cannot
+    starve others of the same priority.
+
+    To prevent tasks of low priority from starving under a steady stream of
+    higher ones, a task skipped by `max_skips` admissions is admitted ahead
+    of the head task if the latter is of higher priority.
+
+    All operations are done in redis scripts, and thus are atomic.
+    """
+
+    SCALE = 10 ** 12
+    MIN_PRIORITY = -9
+    MAX_PRIORITY = 9
+    MAX_SKIPS = 100
+
+    ENQUEUE_SCRIPT = _fair_queue_helpers + """
+local owner = ARGV[5]
+local priority = tonumber(ARGV[6])
+local seq = redis.call('INCR', KEYS[3])
+redis.call('ZADD', ARGV[1] .. owner, string.format('%.0f', -priority * scale + seq), ARGV[4])
+redis.call('HSET', KEYS[2], ARGV[4], owner)
+redis.call('ZADD', age_key(priority), tonumber(redis.call('GET', KEYS[4]) or 0), ARGV[4])
+
+local score = redis.call('ZSCORE', KEYS[1], owner)
+local turn = seq
+if score then
+    local _
+    _, turn = split(score)
+end
+place_owner(owner, turn)
+"""
+
+    REMOVE_SCRIPT = _fair_queue_helpers + """
+local owner = redis.call('HGET', KEYS[2], ARGV[4])
+if not owner then
+    return 0
+end
+take(owner, ARGV[4])
+replace_owner(owner)
+return 1
+"""
+
+    # Pops tasks and adds them to the set KEYS[5] until its size reaches
+    # ARGV[4].
+    ADMIT_SCRIPT = _fair_queue_helpers + """
+local admitted = {}
+while redis.call('SCARD', KEYS[5]) < tonumber(ARGV[4]) do
+    local head = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if #head == 0 then
+        break
+    end
+    local owner = head[1]
+    local head_priority = split(head[2])
+
+    -- Look for a starving task of lower priority first
+    local admits = tonumber(redis.call('GET', KEYS[4]) or 0)
+    local task, task_owner
+    for priority = tonumber(ARGV[6]), head_priority - 1 do
+        local oldest = redis.call('ZRANGE', age_key(priority), 0, 0, 'WITHSCORES')
+        if #oldest > 0 and admits - tonumber(oldest[2]) >= tonumber(ARGV[5]) then
+            task_owner = redis.call('HGET', KEYS[2], oldest[1])
+            if task_owner then
+                task = oldest[1]
+                break
+            end
+            -- Not pending any more
+            redis.call('ZREM', age_key(priority), oldest[1])
+        end
+    end
+
+    if not task then
+        task = redis.call('ZRANGE', ARGV[1] .. owner, 0, 0)[1]
+        task_owner = owner
+    end
+
+    if task then
+        take(task_owner, task)
+        redis.call('SADD', KEYS[5], task)
+        redis.call('INCR', KEYS[4])
+        table.insert(admitted, task)
+    end
+
+    if task_owner == owner then
+        place_owner(owner, redis.call('INCR', KEYS[3]))
+    else
+        -- The head owner keeps its turn
+        replace_owner(task_owner)
+    end
+end
+return admitted
+"""
+
+    def __init__(self, name, redis):
+        super(FairQueue, self).__init__(name, redis)
+
+        self._keys = [
+            storage.make_key(name + ':owners'),
+            storage.make_key(name + ':tasks'),
+            storage.make_key(name + ':seq'),
+            storage.make_key(name + ':admits'),
+        ]
+        self._queue_prefix = storage.make_key(name + ':queue:')
+        self._age_prefix = storage.make_key(name + ':age:')
+        self.max_skips = self.MAX_SKIPS
+        self._enqueue = redis.register_script(self.ENQUEUE_SCRIPT)
+        self._remove = redis.register_script(self.REMOVE_SCRIPT)
+        self._admit = redis.register_script(self.ADMIT_SCRIPT)
+
+    def _args(self, *args):
+        return [self._queue_prefix, self.SCALE, self._age_prefix] + list(args)
+
+    def clamp_priority(self, priority):
+        return max(self.MIN_PRIORITY, min(self.MAX_PRIORITY, int(priority)))
+
+    def enqueue(self, obj, priority=0, owner=None, client=None):
+        """
+        Puts `obj` into the sub-queue of `owner`. Objects of higher priority
+        are dequeued first.
+
+        `client` may be a pipeline, in which the script will be queued.
+        """
+        self._enqueue(
+            keys=self._keys,
+            args=self._args(
+                storage.encode(obj),
+                '' if owner is None else owner,
+                self.clamp_priority(priority)),
+            client=client
+        )
+
+    def remove(self, obj):
+        """
+        Removes `obj` from the queue. Returns True if it was pending.
+        """
+        return bool(self._remove(keys=self._keys, args=self._args(storage.encode(obj))))
+
+    def admit(self, running_set, limit):
+        """
+        Moves objects into `running_set` (a Set) in order, until its size
+        reaches `limit`. Returns the moved objects.
+        """
+        admitted = self._admit(
+            keys=self._keys + [running_set.key],
+            args=self._args(limit, self.max_skips, self.MIN_PRIORITY)
+        )
+
+        return [storage.decode(obj) for obj in admitted]
+
+    def __len__(self):
+        return storage.hlen(self._name + ':tasks')
@@ -18,3 +18,13 @@ class TaskInstanceNotExists(Exception):
 
     def __str__(self):
         return "Task instance with id '%s' doesn't exist." % self.task_id
+
+
+class TaskLost(Exception):
+
+    def __init__(self, task_id, attempts):
+        self.task_id = task_id
+        self.attempts = attempts
+
+    def __str__(self):
+        return "Task instance with id '%s' was lost after %s attempt(s)." % (self.task_id, self.attempts)
@@ -1,18 +1,81 @@
 """
 This module contains multiple implementation of task executors.
 
-Note that ProcessExecutor is currently not available, since channel workers are
-daemonatic processes, which are not allowed to have child processes. The
-problem remains to be solved.
+Tasks run in threads of the worker by default. A task class may set
+`executor_type` to 'process' to run in a separate process, which is forked by
+a sidecar (see `biohub.core.tasks.forkserver`), since channel workers are
+daemonic processes and not allowed to have child processes.
 """
 
-import functools
+import os
 import asyncio
+import threading
 import concurrent.futures
 
 from biohub.core.tasks.exceptions import TaskInterruption
 
 
+class Runtime(object):
+    """
+    The execution runtime of a worker process, which consists of:
+
+     + an event loop running forever in a background thread, supervising all
+       tasks of the worker concurrently;
+     + a thread pool shared by tasks, with `BIOHUB_MAX_TASKS` threads at most.
+
+    Both are created lazily, and re-created after the process forked.
+    """
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        max_workers = self._max_workers
+        if max_workers is None:
+            from biohub.core.conf import settings as biohub_settings
+
+            max_workers = biohub_settings.BIOHUB_MAX_TASKS
+
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.pool)
+
+        threading.Thread(
+            target=self.loop.run_forever,
+            name='biohub-tasks-runtime',
+            daemon=True
+        ).start()
+
+        self._pid = os.getpid()
+
+    def ensure_running(self):
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+
+    def submit(self, coroutine):
+        """
+        Schedules `coroutine` in the loop. Returns a concurrent future.
+        """
+        self.ensure_running()
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        """
+        Runs `coroutine` in the loop and blocks until it finishes.
+        """
+        return self.submit(coroutine).result()
+
+
+runtime = Runtime()
+
+
 class Executor(object):
 
     def __init__(self, task_instance):
@@ -23,75 +86,111 @@ class Executor(object):
 
     def execute(self):
         """
-        To execute the task concurrently.
+        To execute the task in the runtime, and blocks until it finishes.
         """
-        loop = asyncio.new_event_loop()
-        executor = self.executor_class(max_workers=1)
-        loop.set_default_executor(executor)
+        runtime.run(self.execute_async())
 
-        try:
-            loop.run_until_complete(self._perform_execute(loop, executor))
-        finally:
-            loop.close()
+    async def execute_async(self):
+        """
+        To execute the task in the shared pool, supervised by the loop of the
+        runtime.
 
-    async def _perform_execute(self, loop, executor):
+        The status of the task is updated in the pool as well, since it may
+        trigger blocking operations like broadcasting.
+        """
+        loop = runtime.loop
+        future = loop.run_in_executor(None, self.run)
 
-        future = loop.run_in_executor(
-            None,
-            functools.partial(self.task_instance.run, **self.payload.kwargs),
-            *self.payload.args
-        )
         try:
-            await asyncio.wait_for(future, timeout=self.timeout, loop=loop)
-        except concurrent.futures.TimeoutError:
-            self.shutdown(executor)
-            self.async_result.timeout()
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            await self.shutdown(future)
+            await loop.run_in_executor(None, self.async_result.timeout)
+        except TaskInterruption:
+            pass
         except Exception as exc:
-            if exc is not None and not isinstance(exc, TaskInterruption):
-                self.async_result.error(exc)
+            await loop.run_in_executor(None, self.async_result.error, exc)
         else:
-            self.async_result.resolve(future.result())
+            await loop.run_in_executor(None, self.async_result.resolve, result)
 
-    def shutdown(self, executor):
+    def run(self):
+        """
+        To run the task, which is called in the pool.
         """
-        To terminate the task instance.
+        return self.task_instance.run(*self.payload.args, **self.payload.kwargs)
+
+    async def shutdown(self, future):
+        """
+        To terminate the task instance, and waits until `future` (of the task
+        running in the pool) finishes.
 
         Terminating a task abruptly may cause unstability, which will not be
         performed by concurrent executors while shutting down. This function
         provides graceful approach to accomplish it.
         """
-        self._perform_shutdown(executor)
+        self._perform_shutdown()
+        await asyncio.wait([future])
+
+        # Retrieves the exception (most likely TaskInterruption) to keep the
+        # loop quiet
+        future.exception()
 
-    def _perform_shutdown(self, executor):
+    def _perform_shutdown(self):
         raise NotImplementedError
 
 
 class ThreadExecutor(Executor):
 
-    executor_class = concurrent.futures.ThreadPoolExecutor
-
-    def _perform_shutdown(self, executor):
+    def _perform_shutdown(self):
         """
         This function tries to raise an exception in the thread, in order to
         terminate it gracefully.
         """
         self.task_instance.interrupt()
-        executor.shutdown(wait=True)
 
 
 class ProcessExecutor(Executor):
+    """
+    Runs the task in a process forked by the sidecar, while a thread waits
+    for its result. On timeout the process is killed, so that the task needs
+    not to call `check_interrupt`. Note that `before_interrupt` will not be
+    called in this case.
+    """
+
+    def __init__(self, task_instance):
+        super(ProcessExecutor, self).__init__(task_instance)
+        self._handle = None
+        self._killed = False
+        self._lock = threading.Lock()
+
+    def run(self):
+        from biohub.core.tasks.forkserver import forkserver
+
+        handle = forkserver.start(self.task_instance)
+
+        with self._lock:
+            self._handle = handle
+            if self._killed:
+                handle.kill()
+
+        return handle.wait()
+
+    def _perform_shutdown(self):
+        with self._lock:
+            self._killed = True
+            if self._handle is not None:
+                self._handle.kill()
 
-    executor_class = concurrent.futures.ProcessPoolExecutor
 
-    def _perform_shutdown(self, executor):
-        # TODO: Too abrupt, to be improved
-        for pid, process in executor._processes.items():
-            process.terminate()
-        executor.shutdown(wait=True)
+executor_types = {
+    'thread': ThreadExecutor,
+    'process': ProcessExecutor,
+}
 
 
 def get_executor(task_instance):
     """
-    Selects and returns a proper executor for the task instance.
+    Selects and returns a proper executor for the task instance, according to
+    its `executor_type`.
     """
-    return ThreadExecutor(task_instance)
+    return executor_types[task_instance.executor_type](task_instance)
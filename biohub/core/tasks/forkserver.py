@@ -0,0 +1,215 @@
+"""
+This module provides a sidecar process to run tasks in separate processes.
+
+Channel workers may be daemonic processes, which are not allowed to have child
+processes by `multiprocessing`. Instead, the sidecar is started as a standalone
+program via `subprocess`, with Django set up once. For each task, it forks a
+fresh process, which can be terminated at any time without affecting the
+worker.
+
+Forking from the warmed up sidecar is cheap, so there is no pool of long
+lived processes: a task killed on timeout never leaves a pool worker in an
+unknown state.
+"""
+
+import os
+import sys
+import signal
+import shutil
+import tempfile
+import importlib
+import threading
+import subprocess
+from multiprocessing.connection import Listener, Client
+
+from biohub.core.tasks.exceptions import TaskInterruption
+
+__all__ = ['forkserver', 'serve']
+
+SERVER_SCRIPT = 'import django; django.setup(); ' \
+    'from biohub.core.tasks.forkserver import serve; serve()'
+
+
+class ProcessHandle(object):
+    """
+    A handle of a forked process running a task.
+    """
+
+    def __init__(self, connection, pid):
+        self._connection = connection
+        self.pid = pid
+
+    def wait(self):
+        """
+        Blocks until the process finishes, and returns the result of the task.
+
+        If the task raised an exception, it will be re-raised. If the process
+        was killed, TaskInterruption will be raised.
+        """
+        try:
+            succeeded, value = self._connection.recv()
+        except (EOFError, OSError):
+            raise TaskInterruption
+        finally:
+            self._connection.close()
+
+        if not succeeded:
+            raise value
+
+        return value
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+class ForkServer(object):
+    """
+    The client of the sidecar, which starts the sidecar lazily and restarts it
+    if it died.
+    """
+
+    def __init__(self):
+        self._process = None
+        self._directory = None
+        self._authkey = None
+        self._lock = threading.Lock()
+
+    @property
+    def address(self):
+        return os.path.join(self._directory, 'socket')
+
+    def ensure_running(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return
+
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+
+            self._directory = tempfile.mkdtemp(prefix='biohub_forkserver_')
+            self._authkey = os.urandom(32)
+
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+            # The sidecar reports readiness via a dedicated pipe. Its stdout,
+            # inherited by tasks, is the one of the worker, so that output of
+            # tasks never fills up a pipe nobody reads.
+            ready_read, ready_write = os.pipe()
+
+            try:
+                self._process = subprocess.Popen(
+                    [sys.executable, '-c', SERVER_SCRIPT, self.address,
+                     str(os.getpid()), str(ready_write)],
+                    stdin=subprocess.PIPE, pass_fds=(ready_write,), env=env
+                )
+            finally:
+                os.close(ready_write)
+
+            # The authkey is passed via stdin so that it won't be exposed in
+            # the process list
+            self._process.stdin.write(self._authkey.hex().encode() + b'\n')
+            self._process.stdin.close()
+
+            with os.fdopen(ready_read, 'rb') as ready:
+                if ready.readline().strip() != b'ready':
+                    raise RuntimeError('Failed to start the fork server.')
+
+    def start(self, task_instance):
+        """
+        Forks a process to run `task_instance`. Returns a ProcessHandle.
+        """
+        self.ensure_running()
+
+        connection = Client(self.address, family='AF_UNIX', authkey=self._authkey)
+        connection.send((type(task_instance).__module__, task_instance.payload.packed_data))
+
+        return ProcessHandle(connection, connection.recv())
+
+    def stop(self):
+        with self._lock:
+            if self._process is not None:
+                self._process.kill()
+                self._process.wait()
+                self._process = None
+
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+
+
+forkserver = ForkServer()
+
+
+def _run_child(connection):
+    """
+    Runs a task in a forked process and sends back the result.
+    """
+    from biohub.core.tasks.registry import tasks
+    from biohub.core.tasks.payload import TaskPayload
+
+    connection.send(os.getpid())
+    module, packed_data = connection.recv()
+
+    try:
+        # The task may come from a plugin installed after the server started
+        importlib.import_module(module)
+        payload = TaskPayload(*packed_data)
+        instance = tasks[payload.task_name](payload)
+        result = True, instance.run(*payload.args, **payload.kwargs)
+    except Exception as e:
+        result = False, e
+
+    try:
+        connection.send(result)
+    except Exception:
+        connection.send((False, RuntimeError('Unpicklable result %r.' % (result[1],))))
+
+
+def _watch_parent(parent_pid):
+    """
+    Exits the server once the worker starting it is gone.
+    """
+    import time
+
+    while os.getppid() == parent_pid:
+        time.sleep(1)
+
+    os._exit(0)
+
+
+def serve():
+    """
+    The main loop of the sidecar.
+
+    Arguments are read from the command line: the address to listen, the pid
+    of the worker and the file descriptor to report readiness.
+    """
+    address, parent_pid, ready_fd = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+
+    # Forked processes are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+
+    os.write(ready_fd, b'ready\n')
+    os.close(ready_fd)
+
+    while True:
+        try:
+            connection = listener.accept()
+        except Exception:
+            continue
+
+        if os.fork() == 0:
+            listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            try:
+                _run_child(connection)
+            finally:
+                os._exit(0)
+
+        connection.close()
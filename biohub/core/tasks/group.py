@@ -0,0 +1,176 @@
+"""
+This module provides groups of tasks, which are applied together and tracked
+as a whole. A group may have a callback task, which is applied once all the
+members finished, with a list of their results.
+"""
+
+from biohub.core.tasks.storage import storage
+from biohub.core.tasks.status import TaskStatus
+
+__all__ = ['GroupResult']
+
+
+class GroupResult(object):
+    """
+    Tracks completion of tasks in a group.
+
+    Meta of a group is kept in a redis HASH, with fields:
+
+     + task_name: name of the member task class;
+     + task_ids: ids of the members, in the order of application;
+     + total: number of the members;
+     + completed: number of the finished members;
+     + callback: packed data of the callback task, or None;
+     + callback_id: id of the callback task once applied.
+    """
+
+    fields = ('task_name', 'task_ids', 'total', 'completed', 'callback', 'callback_id')
+
+    def __init__(self, group_id):
+        self._group_id = group_id
+        self._storage_key = group_id + '_group'
+        self._meta = None
+
+    @property
+    def group_id(self):
+        return self._group_id
+
+    @property
+    def meta(self):
+        """
+        A local copy of the meta, loaded on first access.
+        """
+        if self._meta is None:
+            self.refresh()
+
+        return self._meta
+
+    def refresh(self):
+        self._meta = dict(zip(
+            self.fields,
+            storage.hmget(self._storage_key, self.fields)
+        ))
+
+        return self._meta
+
+    def _create(self, task_name, task_ids, callback, pipe):
+        """
+        Queues commands to store the meta in `pipe`.
+        """
+        pipe.hmset(storage.make_key(self._storage_key), {
+            storage.make_key(name): storage.encode(value)
+            for name, value in dict(
+                task_name=task_name,
+                task_ids=task_ids,
+                total=len(task_ids),
+                completed=0,
+                callback=callback
+            ).items()
+        })
+
+    def exists(self):
+        return storage.exists(self._storage_key)
+
+    @property
+    def task_ids(self):
+        return self.meta['task_ids'] or []
+
+    @property
+    def total(self):
+        return self.meta['total'] or 0
+
+    @property
+    def completed(self):
+        """
+        Number of finished members, which is always reloaded from redis.
+        """
+        return self.refresh()['completed'] or 0
+
+    @property
+    def is_ready(self):
+        return self.exists() and self.completed >= self.total
+
+    @property
+    def members(self):
+        """
+        Returns AsyncResult of the members.
+        """
+        from biohub.core.tasks.registry import tasks
+
+        task_class = tasks[self.meta['task_name']]
+
+        return [task_class.async_result(task_id) for task_id in self.task_ids]
+
+    @property
+    def callback(self):
+        """
+        Returns AsyncResult of the callback task, or None if not applied.
+        """
+        from biohub.core.tasks.registry import tasks
+
+        callback, callback_id = self.meta['callback'], self.refresh()['callback_id']
+
+        if callback is None or callback_id is None:
+            return None
+
+        return tasks[callback[0]].async_result(callback_id)
+
+    def statuses(self):
+        """
+        Returns a list of statuses of the members, fetched in one round trip.
+        """
+        return [
+            TaskStatus(status) if status is not None else TaskStatus.GONE
+            for status in self._fetch_field('status')
+        ]
+
+    def get(self):
+        """
+        Returns a list of results of the members, fetched in one round trip.
+        Results of failed members are their exceptions, and those of timed
+        out or unfinished members are None.
+        """
+        return self._fetch_field('result')
+
+    def _fetch_field(self, name):
+        from biohub.core.tasks.result import AsyncResult
+
+        members = [AsyncResult(task_id) for task_id in self.task_ids]
+
+        with storage.pipeline() as pipe:
+            for member in members:
+                pipe.hget(
+                    storage.make_key(member._storage_key),
+                    storage.make_key(name))
+
+            values = pipe.execute()
+
+        return [
+            member._decode(name, value) if value is not None else None
+            for member, value in zip(members, values)
+        ]
+
+    def _member_done(self, broker):
+        """
+        Counts a finished member. Applies the callback once all the members
+        finished, and returns its AsyncResult.
+        """
+        completed = storage.hincrby(self._storage_key, 'completed', 1)
+
+        if completed == self.total:
+            return self._finish(broker)
+
+    def _finish(self, broker):
+        from biohub.core.tasks.result import get_result_timeout
+
+        callback_result = None
+        callback = self.meta['callback']
+
+        if callback is not None:
+            task_name, kwargs, options = callback
+            callback_result = broker.apply_async(task_name, (self.get(),), kwargs, **options)
+            storage.hset(self._storage_key, 'callback_id', callback_result.task_id)
+
+        storage.pexpire(self._storage_key, int(get_result_timeout() * 1000))
+
+        return callback_result
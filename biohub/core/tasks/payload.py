@@ -17,7 +17,9 @@ class TaskPayload(object):
         self.args = args
         self.kwargs = kwargs or {}
         self.options = options
-        self.packed_data = (task_name, task_id, args, kwargs, options)
+        # Lists instead of tuples, so that plain payloads are serialized with
+        # msgpack rather than pickle
+        self.packed_data = [task_name, task_id, list(args), kwargs, options]
         self._async_result = AsyncResult(task_id)
 
     def store(self):
@@ -29,7 +31,7 @@ class TaskPayload(object):
     @classmethod
     def from_packed_data(cls, packed_data):
         """
-        A factory function to create a payload from a tuple.
+        A factory function to create a payload from packed data.
         """
         return cls(*packed_data)
 
@@ -0,0 +1,21 @@
+"""
+Recurring maintenance tasks of the task subsystem itself.
+"""
+
+from biohub.core.tasks.base import Task
+from biohub.core.tasks.backend import backend
+from biohub.core.tasks.schedule import Interval
+
+
+class CleanResultsTask(Task):
+    """
+    Removes result files spilled by the result backend, which have outlived
+    their tasks.
+    """
+
+    task_name = 'biohub.core.tasks.clean_results'
+    schedule = Interval(hours=1)
+    priority = -1
+
+    def run(self):
+        return backend.clean()
@@ -0,0 +1,99 @@
+"""
+This module provides event streams of tasks, which carry progress reports and
+partial results while tasks are running.
+
+Events of a task are kept in a capped redis list, each of which has an
+increasing id, so that clients can fetch events after the last one they saw.
+The last progress report is also kept in a key of its own, so that it won't
+be trimmed by partial results.
+
+The stream expires once the task and its result could have expired, which is
+extended on each event.
+"""
+
+import time
+
+from biohub.core.tasks.storage import storage
+
+PROGRESS = 'progress'
+PARTIAL = 'partial'
+
+
+class EventStream(object):
+
+    # The maximum number of events kept
+    max_length = 100
+
+    def __init__(self, task_id, timeout=None):
+        """
+        timeout: seconds the task may run, default to BIOHUB_TASK_MAX_TIMEOUT.
+        """
+        self._task_id = task_id
+        self._task_timeout = timeout
+        self._key = task_id + '_events'
+        self._counter_key = task_id + '_events_counter'
+        self._progress_key = task_id + '_progress'
+
+    def _timeout(self):
+        from biohub.core.conf import settings as biohub_settings
+        from biohub.core.tasks.result import get_result_timeout
+
+        timeout = self._task_timeout
+        if timeout is None:
+            timeout = biohub_settings.BIOHUB_TASK_MAX_TIMEOUT
+
+        return timeout + get_result_timeout()
+
+    def append(self, type, **data):
+        """
+        Appends an event of `type` to the stream. Returns the event.
+        """
+        event = dict(
+            data,
+            id=storage.incrby(self._counter_key, 1),
+            type=type,
+            time=time.time()
+        )
+        key = storage.make_key(self._key)
+        timeout = int(self._timeout() * 1000)
+
+        with storage.pipeline() as pipe:
+            pipe.rpush(key, storage.encode(event))
+            pipe.ltrim(key, -self.max_length, -1)
+            pipe.pexpire(key, timeout)
+            pipe.pexpire(storage.make_key(self._counter_key), timeout)
+
+            if type == PROGRESS:
+                pipe.set(storage.make_key(self._progress_key), storage.encode(event), px=timeout)
+            else:
+                pipe.pexpire(storage.make_key(self._progress_key), timeout)
+
+            pipe.execute()
+
+        return event
+
+    def events(self, after=0):
+        """
+        Returns events whose ids are greater than `after`.
+        """
+        return [
+            event for event in storage.lrange(self._key, 0, -1)
+            if event['id'] > after
+        ]
+
+    def last(self, type=None):
+        """
+        Returns the last event (of `type` if given), or None if not found.
+        """
+        if type == PROGRESS:
+            return storage.get(self._progress_key)
+
+        events = self.events()
+
+        if type is not None:
+            events = [event for event in events if event['type'] == type]
+
+        return events[-1] if events else None
+
+    def clear(self):
+        storage.delete_many([self._key, self._counter_key, self._progress_key])
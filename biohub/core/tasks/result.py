@@ -2,6 +2,8 @@ from operator import or_
 from functools import reduce
 
 from biohub.core.tasks.storage import storage
+from biohub.core.tasks.backend import backend
+from biohub.core.tasks.progress import EventStream, PROGRESS
 from biohub.core.tasks.status import TaskStatus
 from django.utils.functional import cached_property
 
@@ -52,25 +54,114 @@ class AsyncResultMeta(type):
 
 class AsyncResult(object, metaclass=AsyncResultMeta):
 
-    properties = ['status', 'result', 'payload']
+    properties = ['status', 'result', 'payload', 'attempts', 'group']
+
+    # Fields going through the result backend instead of django-redis
+    serialized_fields = ('result', 'payload')
 
     def __init__(self, task_id):
         self._task_id = task_id
         self._storage = storage
+        self._snapshot = None
 
     @cached_property
     def _storage_key(self):
         return self._task_id + '_meta'
 
+    @property
+    def snapshot(self):
+        """
+        A local copy of all fields of the task, which is loaded with a single
+        HGETALL on first access.
+        """
+        if self._snapshot is None:
+            self.refresh()
+
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Reloads the snapshot from redis.
+        """
+        raw = self._storage.hgetall(self._storage_key)
+
+        self._snapshot = {}
+        for field, value in raw.items():
+            name = next(self._storage.strip(field.decode()))
+            self._snapshot[name] = self._decode(name, value)
+
+        return self._snapshot
+
+    def _encode(self, name, value):
+        if name in self.serialized_fields:
+            return backend.dumps(value, self._task_id)
+
+        return self._storage.encode(value)
+
+    def _decode(self, name, data):
+        if name in self.serialized_fields and backend.is_serialized(data):
+            return backend.loads(data)
+
+        return self._storage.decode(data)
+
+    def memory_usage(self):
+        """
+        Returns a tuple (redis, spilled), the number of bytes the task takes
+        in redis, and in spilled files respectively.
+        """
+        key = self._storage.make_key(self._storage_key)
+        raw = self._storage.hgetall(self._storage_key)
+
+        try:
+            usage = self._storage.execute_command('MEMORY', 'USAGE', key) or 0
+        except Exception:
+            # MEMORY USAGE is not available until redis 4.0
+            usage = sum(len(field) + len(value) for field, value in raw.items())
+
+        return usage, sum(backend.spilled_size(value) for value in raw.values())
+
     def _get_field(self, name):
-        return self._storage.hget(self._storage_key, name)
+        return self.snapshot.get(name)
 
     def _set_field(self, name, value):
-        return self._storage.hset(self._storage_key, name, value)
+        self._write({name: value})
 
     def _del_field(self, name):
+        if self._snapshot is not None:
+            self._snapshot.pop(name, None)
+
         return self._storage.hdel(self._storage_key, name)
 
+    def _write(self, fields, timeout=False, pipe=None):
+        """
+        Writes `fields` (a dict), and sets the expiry of the task if `timeout`
+        given (None for never expiring), in a single transaction.
+
+        If `pipe` given, the commands are queued in it instead, and the caller
+        is responsible for executing it.
+        """
+        if pipe is None:
+            with self._storage.pipeline() as pipe:
+                self._write(fields, timeout, pipe)
+                pipe.execute()
+
+            return
+
+        key = self._storage.make_key(self._storage_key)
+
+        pipe.hmset(key, {
+            self._storage.make_key(name): self._encode(name, value)
+            for name, value in fields.items()
+        })
+
+        if timeout is None:
+            pipe.persist(key)
+        elif timeout is not False:
+            pipe.pexpire(key, int(timeout * 1000))
+
+        if self._snapshot is not None:
+            self._snapshot.update(fields)
+
     def _expire(self, timeout):
         if timeout is None:
             return self._storage.persist(self._storage_key)
@@ -78,6 +169,20 @@ class AsyncResult(object, metaclass=AsyncResultMeta):
             timeout = int(timeout * 1000)
             return self._storage.pexpire(self._storage_key, timeout)
 
+    @property
+    def events(self):
+        """
+        The stream of progress reports and partial results of the task.
+        """
+        return EventStream(self.task_id)
+
+    @property
+    def progress(self):
+        """
+        The last progress report of the task, or None if not reported.
+        """
+        return self.events.last(PROGRESS)
+
     def exists(self):
         return self._storage.exists(self._storage_key)
 
@@ -86,12 +191,15 @@ class AsyncResult(object, metaclass=AsyncResultMeta):
         return self._task_id
 
     def _get_status(self):
+        """
+        Unready status is always reloaded from redis, along with other fields.
+        """
         from biohub.utils.detect import features
 
         if hasattr(self, '_status') and not features.testing:
             return self._status
 
-        status = self._get_field('status')
+        status = self.refresh().get('status')
 
         if status is None:
             return TaskStatus.GONE
@@ -107,18 +215,28 @@ class AsyncResult(object, metaclass=AsyncResultMeta):
             raise ValueError('State was ready.')
 
     def _set_status(self, status):
+        self._transit(status)
+
+    def _transit(self, status, **fields):
+        """
+        Sets the status along with other fields in a single transaction. The
+        task will expire if the status is ready.
+        """
         self._check_ready()
 
         status = TaskStatus(status)
 
         if status == TaskStatus.GONE:
             self._del_status()
-        else:
-            if status.is_ready:
-                self._status = status
-                self._expire(get_result_timeout())
+            return
 
-            self._set_field('status', status)
+        fields['status'] = status
+
+        if status.is_ready:
+            self._status = status
+            self._write(fields, get_result_timeout())
+        else:
+            self._write(fields)
 
     def _after_ready(self, state, result):
         pass
@@ -130,8 +248,7 @@ class AsyncResult(object, metaclass=AsyncResultMeta):
         self._set_status(TaskStatus.RUNNING)
 
     def resolve(self, result):
-        self._set_status(TaskStatus.SUCCESS)
-        self._set_result(result)
+        self._transit(TaskStatus.SUCCESS, result=result)
         self._after_ready(TaskStatus.SUCCESS, result)
 
     def timeout(self):
@@ -139,8 +256,7 @@ class AsyncResult(object, metaclass=AsyncResultMeta):
         self._after_ready(TaskStatus.TIMEOUT, None)
 
     def error(self, exception):
-        self._set_status(TaskStatus.ERROR)
-        self._set_result(exception)
+        self._transit(TaskStatus.ERROR, result=exception)
         self._after_ready(TaskStatus.ERROR, None)
 
     def wait(self, rounds, duration):
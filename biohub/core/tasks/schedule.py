@@ -0,0 +1,348 @@
+"""
+This module provides a scheduler to run recurring tasks inside channel
+workers, instead of spawning processes from crontab.
+
+A task class becomes recurring by setting its `schedule` attribute, e.g.:
+
+    class RefreshWeightTask(Task):
+        schedule = Crontab('*/30 * * * *')
+
+    class CleanResultsTask(Task):
+        schedule = Interval(hours=1)
+
+Every worker runs the scheduler loop, but only the elected leader fires the
+schedules. The leadership is a redis key with a short expiry, renewed by the
+leader on each tick, so that another worker takes over soon after the leader
+dies. Fired tasks are applied via the broker as usual, and thus run in any
+worker with warm connections and caches.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import datetime
+import threading
+from uuid import uuid4
+
+from django.dispatch import receiver
+from django.utils import timezone
+from channels.signals import worker_ready
+
+from biohub.core.tasks.registry import tasks
+from biohub.core.tasks.storage import storage
+from biohub.core.tasks.executors import runtime
+
+logger = logging.getLogger('biohub.core.tasks')
+
+__all__ = ['Interval', 'Crontab', 'Scheduler', 'scheduler']
+
+
+class Interval(object):
+    """
+    Runs every given period.
+    """
+
+    def __init__(self, seconds=0, minutes=0, hours=0, days=0):
+        self.seconds = seconds + minutes * 60 + hours * 3600 + days * 86400
+
+        if self.seconds <= 0:
+            raise ValueError('Interval should be positive.')
+
+    def next_run(self, after):
+        """
+        Returns the timestamp of the first run after timestamp `after`.
+        """
+        return after + self.seconds
+
+    def __repr__(self):
+        return '<Interval: %ss>' % self.seconds
+
+
+class Crontab(object):
+    """
+    Runs at times matching a crontab expression, i.e. five fields of minute,
+    hour, day of month, month and day of week, in the timezone of the site.
+    """
+
+    ranges = (
+        (0, 59),
+        (0, 23),
+        (1, 31),
+        (1, 12),
+        (0, 7)
+    )
+
+    def __init__(self, spec):
+        fields = spec.split()
+
+        if len(fields) != 5:
+            raise ValueError("Bad crontab expression '%s'." % spec)
+
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.ranges)
+        )
+        # Both 0 and 7 stand for Sunday
+        self.weekdays = {day % 7 for day in weekdays}
+
+        # Like cron, days are matched if either field matches when both are
+        # restricted.
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _parse_field(self, field, low, high):
+        values = set()
+
+        for part in field.split(','):
+            range_part, _, step = part.partition('/')
+
+            try:
+                step = int(step) if step else 1
+
+                if range_part == '*':
+                    start, end = low, high
+                elif '-' in range_part:
+                    start, end = map(int, range_part.split('-'))
+                else:
+                    start = int(range_part)
+                    end = high if step > 1 else start
+            except ValueError:
+                raise ValueError("Bad crontab field '%s'." % field)
+
+            if not low <= start <= end <= high or step <= 0:
+                raise ValueError("Bad crontab field '%s'." % field)
+
+            values.update(range(start, end + 1, step))
+
+        return values
+
+    def _match_day(self, dt):
+        day = dt.day in self.days
+        # isoweekday() gives 7 for Sunday
+        weekday = dt.isoweekday() % 7 in self.weekdays
+
+        if self._any_day or self._any_weekday:
+            return day and weekday
+
+        return day or weekday
+
+    def next_run(self, after):
+        """
+        Returns the timestamp of the first matching minute after timestamp
+        `after`.
+        """
+        tz = timezone.get_default_timezone()
+        dt = datetime.datetime.fromtimestamp(after, tz).replace(tzinfo=None)
+        dt = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = dt + datetime.timedelta(days=366 * 5)
+
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + datetime.timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0)
+            elif not self._match_day(dt):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + datetime.timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += datetime.timedelta(minutes=1)
+            else:
+                return timezone.make_aware(dt, tz, is_dst=False).timestamp()
+
+        raise ValueError("Crontab expression '%s' never matches." % self.spec)
+
+    def __repr__(self):
+        return '<Crontab: %s>' % self.spec
+
+
+class Scheduler(object):
+    """
+    Fires recurring tasks on their schedules. Should be started in each
+    worker via `start`, while only one of them is the leader at a time.
+    """
+
+    # Seconds between two ticks
+    interval = 1
+
+    # Seconds the leadership lasts without being renewed
+    leader_timeout = 10
+
+    ELECT_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+    RESIGN_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+    def __init__(self, name, broker=None):
+        """
+        name: namespace for keys of redis objects.
+        broker: the broker to apply tasks, default to the global one.
+        """
+        from django_redis import get_redis_connection
+
+        self._broker = broker
+        self._leader_key = '%s_leader' % name
+        self._next_runs = '%s_next_runs' % name
+        self._last_tasks = '%s_last_tasks' % name
+        redis = get_redis_connection('default')
+        self._elect = redis.register_script(self.ELECT_SCRIPT)
+        self._resign = redis.register_script(self.RESIGN_SCRIPT)
+        self._ident = None
+        self._pid = None
+        self._started_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def broker(self):
+        if self._broker is None:
+            from biohub.core.tasks.broker import broker
+
+            return broker
+
+        return self._broker
+
+    @property
+    def ident(self):
+        """
+        The identity of current process in the election.
+        """
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._ident = '%s:%s' % (self._pid, uuid4())
+
+        return self._ident
+
+    def schedules(self):
+        """
+        Returns a list of (task_class, schedule) for recurring tasks.
+        """
+        return [
+            (task_class, task_class.schedule)
+            for task_class in list(tasks.mapping.values())
+            if task_class.schedule is not None
+        ]
+
+    def elect(self):
+        """
+        Tries to become or remain the leader. Returns True on success.
+        """
+        return bool(self._elect(
+            keys=[storage.make_key(self._leader_key)],
+            args=[self.ident, int(self.leader_timeout * 1000)]
+        ))
+
+    def resign(self):
+        """
+        Gives up the leadership if current process holds it.
+        """
+        self._resign(keys=[storage.make_key(self._leader_key)], args=[self.ident])
+
+    def tick(self, now=None):
+        """
+        Fires due schedules if current process is the leader. A schedule is
+        skipped if the task it fired last time is still unfinished.
+
+        Returns a list of AsyncResult of the fired tasks.
+        """
+        from biohub.core.tasks import TaskStatus
+
+        if not self.elect():
+            return []
+
+        now = time.time() if now is None else now
+        fired = []
+
+        for task_class, schedule in self.schedules():
+            task_name = task_class.task_name
+            next_run = storage.hget(self._next_runs, task_name)
+
+            if next_run is not None and next_run > now:
+                continue
+
+            storage.hset(self._next_runs, task_name, schedule.next_run(now))
+
+            # The first tick only plans the schedule
+            if next_run is None:
+                continue
+
+            last_task = storage.hget(self._last_tasks, task_name)
+            if last_task is not None:
+                status = task_class.async_result(last_task).status
+                if status != TaskStatus.GONE and not status.is_ready:
+                    logger.warning('Skipped %s since last run is unfinished.' % task_name)
+                    continue
+
+            async_result = self.broker.apply_async(task_class)
+            storage.hset(self._last_tasks, task_name, async_result.task_id)
+            fired.append(async_result)
+
+        return fired
+
+    def next_runs(self):
+        """
+        Returns a dict mapping names of recurring tasks to timestamps of their
+        next runs (None if not planned yet).
+        """
+        return {
+            task_class.task_name: storage.hget(self._next_runs, task_class.task_name)
+            for task_class, _ in self.schedules()
+        }
+
+    def clear(self):
+        storage.delete_many([self._leader_key, self._next_runs, self._last_tasks])
+
+    async def _tick_forever(self):
+        loop = runtime.loop
+
+        while True:
+            try:
+                await loop.run_in_executor(None, self.tick)
+            except Exception:
+                logger.exception('Failed to fire scheduled tasks.')
+
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Starts the scheduler loop in the runtime of current process, if not
+        started yet.
+        """
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+
+            self._started_pid = os.getpid()
+
+        # Make sure recurring tasks from all apps are registered
+        tasks.populate_submodules()
+        runtime.submit(self._tick_forever())
+
+
+scheduler = Scheduler('scheduler')
+
+
+@receiver(worker_ready)
+def start_worker_loops(**kwargs):
+    """
+    Starts the scheduler and the reaper once a worker is ready, instead of
+    waiting for its first task.
+    """
+    from biohub.core.tasks.broker import broker
+
+    scheduler.start()
+    broker._ensure_reaper()
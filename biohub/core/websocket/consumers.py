@@ -1,6 +1,7 @@
 from channels.generic.websockets import JsonWebsocketConsumer
 
 from .registry import websocket_handlers
+from .presence import presence
 
 
 class MainConsumer(JsonWebsocketConsumer):
@@ -34,11 +35,19 @@ class MainConsumer(JsonWebsocketConsumer):
         })
 
         if accept:
+            presence.connect(self.message.user, self.message.reply_channel.name)
             websocket_handlers.dispatch(self, {
                 'handler': '__connect__',
                 'data': ''
             })
 
+    def disconnect(self, message, **kwargs):
+        """
+        Unregisters the connection from the presence registry.
+        """
+        if self.message.user.is_authenticated():
+            presence.disconnect(self.message.user, self.message.reply_channel.name)
+
     def receive(self, content, **kwargs):
         """
         Dispatches incoming content to corresponding handlers.
@@ -5,9 +5,22 @@ class WebsocketDataDecodeError(Exception):
     pass
 
 
-def encode(handler_name, data):
+_immutable_types = (str, bytes, int, float, bool, type(None))
+
+
+def _is_immutable(data):
+    if isinstance(data, _immutable_types):
+        return True
+
+    return type(data) in (tuple, frozenset) and all(_is_immutable(item) for item in data)
+
+
+def encode(handler_name, data, copy=True):
     """
     Combines `handler_name` and `data` to be a dict.
+
+    `data` is deep copied unless `copy` is False or it's immutable, to
+    prevent it from being changed before sent.
     """
 
     assert isinstance(handler_name, str), \
@@ -16,7 +29,7 @@ def encode(handler_name, data):
 
     return {
         'handler': handler_name,
-        'data': deepcopy(data)
+        'data': deepcopy(data) if copy and not _is_immutable(data) else data
     }
 
 
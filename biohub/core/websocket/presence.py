@@ -0,0 +1,133 @@
+"""
+A registry of websocket connections of users, so that messages to users
+without live connections can be dropped before touching the channel layer.
+
+Connections of a user are kept in a redis ZSET, scored by their expiry
+timestamps. A connection expires after `group_expiry` of the channel layer,
+when it falls out of the user's group anyway, so that connections whose
+disconnection was never received won't keep the user online forever.
+
+Presence is only tracked with a redis cache backend, otherwise all users are
+considered online.
+"""
+
+import time
+
+from biohub.utils.detect import features
+
+__all__ = ['Presence', 'presence']
+
+
+def _get_user_id(user):
+    if isinstance(user, (int, str)):
+        return str(user)
+
+    return str(user.id)
+
+
+class Presence(object):
+
+    def __init__(self, timeout=None):
+        self._timeout = timeout
+        self._storage = None
+
+    @property
+    def enabled(self):
+        return features.redis
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from biohub.utils.redis import Storage
+
+            self._storage = Storage('__biohub_presence__')
+
+        return self._storage
+
+    @property
+    def timeout(self):
+        """
+        Seconds a connection lasts, default to `group_expiry` of the channel
+        layer.
+        """
+        if self._timeout is None:
+            from channels import DEFAULT_CHANNEL_LAYER, channel_layers
+
+            layer = channel_layers[DEFAULT_CHANNEL_LAYER]
+            return getattr(layer, 'group_expiry', 86400)
+
+        return self._timeout
+
+    def _key(self, user):
+        return self.storage.make_key('user_' + _get_user_id(user))
+
+    def connect(self, user, channel):
+        """
+        Registers a connection of `user` via reply channel `channel`.
+        """
+        if not self.enabled:
+            return
+
+        key = self._key(user)
+        now = time.time()
+
+        with self.storage.pipeline() as pipe:
+            pipe.zremrangebyscore(key, '-inf', now)
+            pipe.zadd(key, now + self.timeout, channel)
+            pipe.expire(key, int(self.timeout))
+            pipe.execute()
+
+    def disconnect(self, user, channel):
+        """
+        Removes a connection of `user`.
+        """
+        if not self.enabled:
+            return
+
+        self.storage.pipeline().zrem(self._key(user), channel).execute()
+
+    def count(self, user):
+        """
+        Returns the number of live connections of `user`.
+        """
+        return self.counts([user])[0]
+
+    def counts(self, users):
+        """
+        Returns numbers of live connections of `users`, in one round trip.
+        """
+        now = time.time()
+
+        with self.storage.pipeline(transaction=False) as pipe:
+            for user in users:
+                pipe.zcount(self._key(user), now, '+inf')
+
+            return pipe.execute()
+
+    def is_online(self, user):
+        if not self.enabled:
+            return True
+
+        return self.count(user) > 0
+
+    def online(self, users):
+        """
+        Filters `users` (user instances or ids) to those having live
+        connections, in one round trip.
+        """
+        users = list(users)
+
+        if not self.enabled or not users:
+            return users
+
+        return [
+            user for user, count in zip(users, self.counts(users))
+            if count
+        ]
+
+    def clear(self):
+        if self.enabled:
+            self.storage.delete_pattern('*')
+
+
+presence = Presence()
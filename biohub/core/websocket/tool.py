@@ -1,9 +1,15 @@
 import json
+import time
+import uuid
+import itertools
 from functools import wraps
+from collections import defaultdict
 
-from channels import Group
+from channels import Group, DEFAULT_CHANNEL_LAYER, channel_layers
 
+from biohub.utils.collections import unique
 from . import parsers
+from .presence import presence
 
 
 def get_group(name):
@@ -13,13 +19,26 @@ def get_group(name):
     return Group(name)
 
 
+def _make_message(handler_name, data):
+    # The data is serialized right away, so no need to copy it
+    return {
+        'text': json.dumps(parsers.encode(handler_name, data, copy=False))
+    }
+
+
 def group_send(handler_name, group_name, data):
     """
     To send message to a specific group.
     """
-    return get_group(group_name).send({
-        'text': json.dumps(parsers.encode(handler_name, data))
-    })
+    return get_group(group_name).send(_make_message(handler_name, data))
+
+
+def group_send_many(handler_name, group_names, data):
+    """
+    To send the same message to multiple groups. The message is encoded only
+    once, and sent in as few round trips as possible.
+    """
+    _send_groups(group_names, _make_message(handler_name, data))
 
 
 def broadcast(handler_name, data):
@@ -37,21 +56,116 @@ def broadcast_user(handler_name, user, data):
         id = str(user)
     else:
         id = user.id
+
+    # Offline users will fetch their data via REST APIs
+    if not presence.is_online(id):
+        return
+
     return group_send(handler_name, 'user_%s' % id, data)
 
 
 def broadcast_users(handler_name, users, data):
     """
-    To broadcast to specified users.
+    To broadcast to specified users, see `group_send_many`. Users without
+    live connections are skipped.
+    """
+    return group_send_many(
+        handler_name,
+        ('user_%s' % id for id in presence.online(map(_user_id, users))),
+        data
+    )
+
+
+def _user_id(user):
+    if isinstance(user, (int, str)):
+        return user
+
+    return user.id
+
+
+# Internals of `asgi_redis.RedisChannelLayer` (1.4) used by `_send_groups`
+REDIS_LAYER_INTERNALS = (
+    'chansend', 'connection', 'consistent_hash', 'group_expiry', '_group_key',
+    'serialize', 'non_local_name', '_send_index_generator', 'prefix', 'expiry',
+    'get_capacity', '_incr_statistics_counter', 'STAT_MESSAGES_COUNT'
+)
+
+
+def _supports_pipelined_send(layer):
+    return all(hasattr(layer, name) for name in REDIS_LAYER_INTERNALS)
+
+
+def _send_groups(group_names, message):
+    """
+    Sends `message` to each group in `group_names`.
+
+    For redis channel layers, members of all the groups are fetched with one
+    pipeline per shard, and the message is then pushed to all the channels
+    with another, instead of two round trips per channel. Other layers, or
+    redis layers without the internals relied on, fall back to `Group.send`.
     """
-    return [
-        broadcast_user(handler_name, user, data)
-        for user in users
-    ]
+    layer = channel_layers[DEFAULT_CHANNEL_LAYER].channel_layer
+    group_names = unique(group_names)
+
+    if not _supports_pipelined_send(layer):
+        for group_name in group_names:
+            get_group(group_name).send(message)
+        return
+
+    # Fetch members of the groups
+    shards = defaultdict(list)
+    for group_name in group_names:
+        shards[layer.consistent_hash(group_name)].append(group_name)
+
+    channels = []
+    for index, names in shards.items():
+        with layer.connection(index).pipeline(transaction=False) as pipe:
+            for name in names:
+                key = layer._group_key(name)
+                pipe.zremrangebyscore(key, 0, int(time.time()) - layer.group_expiry)
+                pipe.zrange(key, 0, -1)
+
+            channels.extend(itertools.chain.from_iterable(pipe.execute()[1::2]))
+
+    # Push the message, which is serialized once unless the channel is
+    # process-local
+    serialized = layer.serialize(message)
+    pipes = {}
+
+    for channel in unique(channel.decode('utf8') for channel in channels):
+        content = serialized
+
+        if '!' in channel:
+            content = layer.serialize(dict(message, __asgi_channel__=channel))
+            channel = layer.non_local_name(channel)
+
+        if '!' in channel or '?' in channel:
+            index = layer.consistent_hash(channel)
+        else:
+            index = next(layer._send_index_generator)
+
+        if index not in pipes:
+            pipes[index] = layer.connection(index).pipeline(transaction=False)
+
+        layer.chansend(
+            keys=[layer.prefix + uuid.uuid4().hex, layer.prefix + channel],
+            args=[content, layer.expiry, layer.get_capacity(channel)],
+            client=pipes[index]
+        )
+        layer._incr_statistics_counter(
+            stat_name=layer.STAT_MESSAGES_COUNT,
+            channel=channel,
+            connection=pipes[index]
+        )
+
+    for pipe in pipes.values():
+        # Like `send_group`, full channels are skipped silently
+        pipe.execute(raise_on_error=False)
 
 
 BROADCAST_FUNCTION_NAMES = (
-    'group_send', 'broadcast', 'broadcast_user', 'broadcast_users'
+    'group_send', 'group_send_many', 'broadcast', 'broadcast_user',
+    'broadcast_users'
 )
 
 
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+
+    help = 'Recounts posts of experiences and stats of users to repair drift.'
+
+    def handle(self, **options):
+        from biohub.accounts.models import UserCounter
+        from biohub.forum.models import Experience
+
+        experiences = Experience.objects.recount_posts()
+        users = UserCounter.objects.recount()
+
+        self.stdout.write(
+            '{} experience(s) and {} user(s) fixed.'.format(experiences, users),
+            self.style.SUCCESS
+        )
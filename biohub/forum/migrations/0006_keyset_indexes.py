@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0005_auto_20171001_2105'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activity',
+            name='acttime',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='experience',
+            name='pub_time',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='publish time'),
+        ),
+    ]
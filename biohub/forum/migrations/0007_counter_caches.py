@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def count(queryset, field):
+    return queryset.order_by().values(field)\
+        .annotate(count=models.Count('*')).values_list(field, 'count')
+
+
+def count_posts(apps, schema_editor):
+    Experience = apps.get_model('forum', 'Experience')
+    Post = apps.get_model('forum', 'Post')
+
+    for experience_id, posts_num in count(Post.objects.all(), 'experience'):
+        Experience.objects.filter(pk=experience_id).update(posts_num=posts_num)
+
+
+def count_users(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserCounter = apps.get_model('accounts', 'UserCounter')
+    StarredUser = apps.get_model('biobrick', 'StarredUser')
+    Experience = apps.get_model('forum', 'Experience')
+
+    through = User.followers.through
+    counters = defaultdict(dict)
+    sources = (
+        ('followers', through.objects.all(), 'from_user'),
+        ('following', through.objects.all(), 'to_user'),
+        ('stars', StarredUser.objects.all(), 'user'),
+        ('experiences', Experience.objects.filter(author__isnull=False), 'author')
+    )
+
+    for name, queryset, field in sources:
+        for user_id, number in count(queryset, field):
+            counters[user_id][name] = number
+
+    UserCounter.objects.bulk_create(
+        UserCounter(user_id=user_id, **values)
+        for user_id, values in counters.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_usercounter'),
+        ('biobrick', '0002_auto_20170918_2041'),
+        ('forum', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='posts_num',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+        migrations.RunPython(count_users, migrations.RunPython.noop),
+    ]
@@ -8,12 +8,40 @@ from biohub.utils.db import PackedField
 class ActivityManager(models.Manager):
 
     def create_activity(self, **kwargs):
+        from biohub.forum.timeline import timeline
+
         kwargs['params'].update({
             'user': kwargs['user'].username,
             'type': kwargs['type']
         })
 
-        return self.create(**kwargs)
+        activity = self.create(**kwargs)
+        timeline.push(activity)
+
+        return activity
+
+    def timeline_of(self, user):
+        """
+        Returns activities in the timeline of `user`, i.e. those of users
+        followed by `user`, and those of bricks watched by `user`.
+        """
+        return self.filter(
+            models.Q(
+                user__in=models.Subquery(
+                    user.following.through.objects.filter(
+                        to_user_id=user.id
+                    ).values('from_user_id')
+                )
+            ) | (
+                models.Q(
+                    brick_name__in=models.Subquery(
+                        user.bricks_watching.through.objects.filter(
+                            user=user.id
+                        ).values('brick')
+                    )
+                ) & ~models.Q(user=user.id)
+            )
+        )
 
 
 class Activity(models.Model):
@@ -29,7 +57,7 @@ class Activity(models.Model):
                              on_delete=models.CASCADE, related_name='activities')
     brick_name = models.CharField(max_length=20)
     params = PackedField()
-    acttime = models.DateTimeField(auto_now_add=True)
+    acttime = models.DateTimeField(auto_now_add=True, db_index=True)
 
     target_type = models.ForeignKey('contenttypes.ContentType', null=True)
     target_id = models.PositiveSmallIntegerField(default=0, null=True)
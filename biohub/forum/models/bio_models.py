@@ -48,10 +48,30 @@ class Article(models.Model):
 
 class ExperienceQuerySet(models.QuerySet):
 
-    def with_posts_num(self):
-        return self.annotate(
-            posts_num=models.Count('posts')
-        )
+    def recount_posts(self):
+        """
+        Recounts `posts_num` of experiences, to repair drift. Returns the
+        number of experiences fixed.
+        """
+        from .forum_models import Post
+
+        counter = 0
+
+        with transaction.atomic():
+            actual = dict(
+                Post.objects.order_by().values('experience')
+                .annotate(count=models.Count('*'))
+                .values_list('experience', 'count')
+            )
+
+            for id, posts_num in self.select_for_update().values_list('id', 'posts_num'):
+                count = actual.get(id, 0)
+
+                if count != posts_num:
+                    counter += 1
+                    self.filter(pk=id).update(posts_num=count)
+
+        return counter
 
     def with_voted_flag(self, user):
         return self.annotate(
@@ -85,11 +105,13 @@ class Experience(models.Model):
     last_fetched = models.DateTimeField('last updated', null=True, default=None)
     # Automatically set the pub_time to now when the object is first created.
     # Also the pub_time can be set manually.
-    pub_time = models.DateTimeField('publish time', auto_now_add=True)
+    pub_time = models.DateTimeField('publish time', auto_now_add=True, db_index=True)
     brick = models.ForeignKey(
         'biobrick.BiobrickMeta', on_delete=models.CASCADE, null=True, default=None,
         related_name='experiences')
     votes = models.IntegerField(default=0)
+    # Denormalized number of posts, maintained by signal handlers
+    posts_num = models.IntegerField(default=0)
     # add records for users mark down who has already voted for the post
     voted_users = models.ManyToManyField(
         settings.AUTH_USER_MODEL, related_name='experiences_voted'
@@ -139,6 +161,20 @@ class Experience(models.Model):
     class Meta:
         ordering = ('-pub_time', 'id')
 
+    def save(self, *args, **kwargs):
+        """
+        `posts_num` is only written on creation, or if listed explicitly in
+        `update_fields`, so that a stale value won't overwrite increments
+        done by signal handlers.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'posts_num'
+            ]
+
+        super(Experience, self).save(*args, **kwargs)
+
     def get_router_arguments(self):
         return 'experience', self.pk
 
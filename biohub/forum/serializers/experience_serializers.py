@@ -21,6 +21,8 @@ class ExperienceSerializer(ModelSerializer):
 
     title = serializers.CharField(required=True)
 
+    select_related_fields = ('author',)
+
     class Meta:
         model = Experience
         exclude = ('voted_users',)
@@ -74,7 +76,13 @@ class ShortExperienceSerializer(ExperienceSerializer):
 
     content = ArticleSerializer(fields=('digest', 'files'), read_only=True)
 
+    select_related_fields = ('author', 'content', 'brick')
+    prefetch_related_fields = ('content__files',)
+
 
 class DetailExperienceSerializer(ExperienceSerializer):
 
     content = ArticleSerializer(fields=('text', 'files'), read_only=True)
+
+    select_related_fields = ('author', 'content', 'brick')
+    prefetch_related_fields = ('content__files',)
@@ -16,6 +16,8 @@ class PostSerializer(ModelSerializer):
     )
     experience = ExperienceSerializer(read_only=True)
 
+    select_related_fields = ('author', 'experience__author')
+
     class Meta:
         model = Post
         fields = ('id', 'experience_id', 'experience',
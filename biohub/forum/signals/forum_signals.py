@@ -1,5 +1,6 @@
-from django.db.models import Q, Subquery
-from django.db.models.signals import pre_delete, post_save
+from django.db import transaction
+from django.db.models import F, Q, Subquery
+from django.db.models.signals import pre_delete, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
 from biohub.notices.tool import Dispatcher
@@ -7,6 +8,8 @@ from biohub.notices.models import Notice
 
 from biohub.forum.models import Post, Experience
 from biohub.forum.models import Activity
+from biohub.forum.timeline import timeline
+from biohub.accounts.models import User, UserCounter
 from biohub.forum.user_defined_signals import voted_experience_signal, \
     rating_brick_signal, watching_brick_signal, unwatching_brick_signal,\
     unvoted_experience_signal
@@ -129,6 +132,44 @@ def remove_watching_brick_activity(instance, user, **kwargs):
     ).delete()
 
 
+def drop_timelines(*users):
+    timeline.drop(*users)
+    # Once more after the changes committed, in case a build read the
+    # relations in between
+    transaction.on_commit(lambda: timeline.drop(*users))
+
+
+@receiver(watching_brick_signal, sender=Biobrick)
+@receiver(unwatching_brick_signal, sender=Biobrick)
+def drop_timeline_on_watching_changed(instance, user, **kwargs):
+    drop_timelines(user)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def drop_timeline_on_following_changed(instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        # Followers to be cleared are unknown afterwards
+        instance._timeline_followers = list(instance.followers.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # `instance.following` changed
+        drop_timelines(instance)
+    elif action == 'post_clear':
+        drop_timelines(*instance.__dict__.pop('_timeline_followers', []))
+    elif pk_set:
+        # `instance.followers` changed
+        drop_timelines(*pk_set)
+
+
+@receiver(post_delete, sender=Activity)
+def remove_activity_from_timelines(instance, **kwargs):
+    timeline.remove(instance)
+
+
 @receiver(voted_experience_signal, sender=Experience)
 def send_notice_to_experience_author_on_voting(
         instance, user_voted,
@@ -177,3 +218,29 @@ def remove_voted_experience_activity(instance, user_unvoted, **kwargs):
         experience=instance, target_slug='vote_experience',
         actor=user_unvoted
     ).delete()
+
+
+@receiver(post_save, sender=Post)
+def count_post_on_creating(instance, created, **kwargs):
+    if created and instance.experience_id is not None:
+        Experience.objects.filter(pk=instance.experience_id)\
+            .update(posts_num=F('posts_num') + 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post_on_deleting(instance, **kwargs):
+    if instance.experience_id is not None:
+        Experience.objects.filter(pk=instance.experience_id)\
+            .update(posts_num=F('posts_num') - 1)
+
+
+@receiver(post_save, sender=Experience)
+def count_experience_on_creating(instance, created, **kwargs):
+    if created and instance.author_id is not None:
+        UserCounter.objects.adjust(instance.author_id, experiences=1)
+
+
+@receiver(post_delete, sender=Experience)
+def uncount_experience_on_deleting(instance, **kwargs):
+    if instance.author_id is not None:
+        UserCounter.objects.adjust(instance.author_id, experiences=-1)
@@ -0,0 +1,269 @@
+"""
+A materialised timeline of activities for each user, written on fan-out.
+
+Timelines used to be computed on read, with an OR of two subqueries (users
+followed and bricks watched) over the whole activity table. Instead, once an
+activity is created, its id is pushed to the timelines of its audience, i.e.
+followers of its user and watchers of its brick. Reading a page is then a
+range query on a redis ZSET and an `IN` query for hydration.
+
+Timelines are built lazily from the database on first read, and dropped
+once the user follows / unfollows someone or watches / unwatches a brick, so
+that they are rebuilt with the new relations. Each drop bumps a generation
+of the timeline, and a build is discarded if the generation changed while
+it was reading the database. Each timeline keeps at most
+`max_length` latest activities, and reads beyond a full timeline fall back
+to the database.
+
+Timelines are only materialised with a redis cache backend, otherwise the
+database query is used.
+"""
+
+from redis.exceptions import WatchError
+
+from biohub.utils.detect import features
+
+__all__ = ['Timeline', 'TimelineQuery', 'timeline']
+
+
+def _get_user_id(user):
+    return getattr(user, 'pk', user)
+
+
+class Timeline(object):
+
+    def __init__(self, max_length=1000):
+        self.max_length = max_length
+        self._storage = None
+
+    @property
+    def enabled(self):
+        return features.redis
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from biohub.utils.redis import Storage
+
+            self._storage = Storage('__biohub_timeline__')
+
+        return self._storage
+
+    def _key(self, user):
+        return self.storage.make_key('user_%s' % _get_user_id(user))
+
+    def _built_key(self, user):
+        return self.storage.make_key('built_%s' % _get_user_id(user))
+
+    def _generation_key(self, user):
+        return self.storage.make_key('generation_%s' % _get_user_id(user))
+
+    def _score(self, activity):
+        return activity.acttime.timestamp()
+
+    def audience(self, activity):
+        """
+        Returns a set of ids of users whose timelines contain `activity`.
+        """
+        from biohub.accounts.models import User
+        from biohub.biobrick.models import WatchingUser
+
+        followers = User.followers.through.objects\
+            .filter(from_user_id=activity.user_id)\
+            .values_list('to_user_id', flat=True)
+        watchers = WatchingUser.objects\
+            .filter(brick=activity.brick_name)\
+            .exclude(user=activity.user_id)\
+            .values_list('user_id', flat=True)
+
+        return set(followers) | set(watchers)
+
+    def push(self, activity):
+        """
+        Pushes `activity` to the timelines of its audience.
+        """
+        if not self.enabled:
+            return
+
+        users = self.audience(activity)
+        if not users:
+            return
+
+        score = self._score(activity)
+
+        with self.storage.pipeline(transaction=False) as pipe:
+            for user in users:
+                key = self._key(user)
+                pipe.zadd(key, score, activity.pk)
+                pipe.zremrangebyrank(key, 0, -self.max_length - 1)
+
+            pipe.execute()
+
+    def remove(self, activity):
+        """
+        Removes `activity` from the timelines of its audience.
+        """
+        if not self.enabled:
+            return
+
+        users = self.audience(activity)
+        if not users:
+            return
+
+        with self.storage.pipeline(transaction=False) as pipe:
+            for user in users:
+                pipe.zrem(self._key(user), activity.pk)
+
+            pipe.execute()
+
+    def drop(self, *users):
+        """
+        Drops the timelines of `users`, which will be rebuilt on next read.
+        """
+        if not self.enabled or not users:
+            return
+
+        with self.storage.pipeline() as pipe:
+            for user in users:
+                pipe.delete(self._key(user), self._built_key(user))
+                pipe.incr(self._generation_key(user))
+
+            pipe.execute()
+
+    def build(self, user, retries=3):
+        """
+        Fills the timeline of `user` from the database. The build is retried
+        up to `retries` times if the timeline is dropped meanwhile. Returns
+        True if the timeline was built.
+        """
+        from biohub.forum.models import Activity
+
+        key = self._key(user)
+
+        for _ in range(retries):
+            with self.storage.pipeline() as pipe:
+                try:
+                    pipe.watch(self._generation_key(user))
+
+                    rows = Activity.objects.timeline_of(user)\
+                        .order_by('-acttime').values_list('id', 'acttime')[:self.max_length]
+
+                    pipe.multi()
+                    for id, acttime in rows:
+                        pipe.zadd(key, acttime.timestamp(), id)
+
+                    pipe.zremrangebyrank(key, 0, -self.max_length - 1)
+                    pipe.set(self._built_key(user), 1)
+                    pipe.execute()
+                except WatchError:
+                    # Relations changed while reading
+                    continue
+
+            return True
+
+        return False
+
+    def _ensure_built(self, user):
+        if not self.storage.exists('built_%s' % _get_user_id(user)):
+            self.build(user)
+
+    def count(self, user):
+        self._ensure_built(user)
+
+        return self.storage.zcard('user_%s' % _get_user_id(user))
+
+    def ids(self, user, start, stop):
+        """
+        Returns ids of activities in the timeline of `user` in range [start,
+        stop), latest first.
+        """
+        self._ensure_built(user)
+
+        if stop <= start:
+            return []
+
+        return [
+            int(id) for id in
+            self.storage.zrevrange('user_%s' % _get_user_id(user), start, stop - 1)
+        ]
+
+    def query(self, user, queryset):
+        """
+        Returns a sliceable sequence of activities in the timeline of `user`,
+        hydrated by `queryset`.
+        """
+        return TimelineQuery(self, user, queryset)
+
+    def clear(self):
+        if self.enabled:
+            self.storage.delete_pattern('*')
+
+
+class TimelineQuery(object):
+    """
+    A lazy sequence of activities in a timeline, which can be paginated like
+    a queryset. Activities deleted but not yet removed from the timeline are
+    skipped.
+
+    Once the timeline is full, older activities may have been trimmed, so
+    that counting and slicing past the materialised window are done in the
+    database instead.
+    """
+
+    def __init__(self, timeline, user, queryset):
+        self._timeline = timeline
+        self._user = user
+        self._queryset = queryset
+        self._size = None
+
+    @property
+    def size(self):
+        """
+        The number of activities materialised in the timeline.
+        """
+        if self._size is None:
+            self._size = self._timeline.count(self._user)
+
+        return self._size
+
+    @property
+    def truncated(self):
+        return self.size >= self._timeline.max_length
+
+    @property
+    def fallback(self):
+        """
+        The activities in the timeline queried from the database.
+        """
+        from biohub.forum.models import Activity
+
+        return self._queryset\
+            .filter(pk__in=Activity.objects.timeline_of(self._user).values('pk'))\
+            .order_by('-acttime', '-id')
+
+    def count(self):
+        if self.truncated:
+            return self.fallback.count()
+
+        return self.size
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+
+        assert index.step is None and (index.start or 0) >= 0 and index.stop is not None, \
+            'Only slices with non-negative bounds are supported.'
+
+        if index.stop > self._timeline.max_length and self.truncated:
+            return list(self.fallback[index])
+
+        ids = self._timeline.ids(self._user, index.start or 0, index.stop)
+        activities = self._queryset.in_bulk(ids)
+
+        return [activities[id] for id in ids if id in activities]
+
+
+timeline = Timeline()
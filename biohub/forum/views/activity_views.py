@@ -2,6 +2,7 @@ from django.db import models
 from rest_framework import mixins, decorators, viewsets
 
 from biohub.forum.models import Activity
+from biohub.forum.timeline import timeline as timeline_store
 from biohub.biobrick.models import BiobrickMeta
 from biohub.forum.serializers.activity_serializers import ActivitySerializer
 from biohub.utils.rest import pagination, permissions
@@ -10,31 +11,15 @@ from biohub.utils.rest import pagination, permissions
 class ActivityViewSet(viewsets.GenericViewSet,
                       mixins.ListModelMixin):
     serializer_class = ActivitySerializer
-    pagination_class = pagination.factory('PageNumberPagination', page_size=10)
+    pagination_class = pagination.factory(
+        'KeysetPagination', page_size=10, ordering=('-acttime', '-id'))
 
     def get_queryset(self):
 
         queryset = Activity.objects.all()
 
         if self.action == 'timeline':
-            user = self.request.user
-            queryset = queryset.filter(
-                models.Q(
-                    user__in=models.Subquery(
-                        user.following.through.objects.filter(
-                            to_user_id=user.id
-                        ).values('from_user_id')
-                    )
-                ) | (
-                    models.Q(
-                        brick_name__in=models.Subquery(
-                            user.bricks_watching.through.objects.filter(
-                                user=user.id
-                            ).values('brick')
-                        )
-                    ) & ~models.Q(user=user.id)
-                )
-            )
+            queryset = Activity.objects.timeline_of(self.request.user)
 
         user = self.request.query_params.get('user', None)
         type = self.request.query_params.get('type', None)
@@ -44,7 +29,10 @@ class ActivityViewSet(viewsets.GenericViewSet,
         if type is not None:
             queryset = queryset.filter(type__in=type.split(','))
 
-        queryset = queryset.annotate(
+        return self.annotate_score(queryset).order_by('-acttime')
+
+    def annotate_score(self, queryset):
+        return queryset.annotate(
             score=models.Case(
                 models.When(
                     type='Watch',
@@ -58,8 +46,18 @@ class ActivityViewSet(viewsets.GenericViewSet,
             )
         )
 
-        return queryset.order_by('-acttime')
-
     @decorators.list_route(methods=['GET'], permission_classes=[permissions.IsAuthenticated])
     def timeline(self, request, *args, **kwargs):
-        return self.list(request, *args, **kwargs)
+        params = request.query_params
+
+        # Filtered or keyset paginated timelines are read from the database
+        if not timeline_store.enabled or \
+                {'user', 'type', self.paginator.cursor_query_param} & set(params):
+            return self.list(request, *args, **kwargs)
+
+        activities = timeline_store.query(
+            request.user, self.annotate_score(Activity.objects.all()))
+        page = self.paginate_queryset(activities)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
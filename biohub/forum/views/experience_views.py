@@ -21,7 +21,7 @@ logger = logging.getLogger('biohub.forum.views.experience_views')
 class BaseExperienceViewSet(object):
 
     queryset = Experience.objects.all()
-    pagination_class = pagination.factory('PageNumberPagination')
+    pagination_class = pagination.factory('KeysetPagination', ordering=('-pub_time', '-id'))
     permission_classes = [
         permissions.C(permissions.IsAuthenticatedOrReadOnly) &
         permissions.check_owner('author', ('PATCH', 'PUT', 'DELETE'))
@@ -30,6 +30,16 @@ class BaseExperienceViewSet(object):
     def get_serializer_class(self):
         return DetailExperienceSerializer if self.action == 'retrieve' else ShortExperienceSerializer
 
+    def setup_eager_loading(self, queryset):
+        """
+        Fetches related objects needed by the serializer along with
+        `queryset`, for actions rendering experiences.
+        """
+        if self.action not in ('list', 'retrieve', 'voted_experiences'):
+            return queryset
+
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
 
 class ExperienceViewSet(
         BrickLookupMixin,
@@ -56,8 +66,7 @@ class ExperienceViewSet(
 
         author = self.request.query_params.get('author', None)
 
-        queryset = Experience.objects.with_posts_num()\
-            .with_voted_flag(self.request.user)
+        queryset = Experience.objects.with_voted_flag(self.request.user)
 
         if author is not None:
             queryset = queryset.filter(
@@ -75,7 +84,7 @@ class ExperienceViewSet(
         # if self.action == 'text':
         #     queryset = queryset.only('id', 'content_id', 'author_id').prefetch_related('content__text')
 
-        return queryset.order_by('-pub_time')
+        return self.setup_eager_loading(queryset).order_by('-pub_time')
 
     @decorators.detail_route(methods=['GET'])
     def voted_users(self, request, *args, **kwargs):
@@ -144,13 +153,15 @@ class UserExperienceViewSet(mixins.ListModelMixin, BaseExperienceViewSet, BaseUs
 
     def get_queryset(self):
         try:
-            return getattr(
+            queryset = getattr(
                 self.get_user_object(),
                 self.allowed_actions[self.action]
-            ).order_by('-pub_time',)
+            )
         except KeyError:
             raise NotFound
 
+        return self.setup_eager_loading(queryset.all()).order_by('-pub_time',)
+
     # Magical: Dynamically binds functions onto the class
     for view_name in allowed_actions:
         locals()[view_name] = decorators.list_route(methods=['GET'])(
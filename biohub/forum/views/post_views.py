@@ -34,7 +34,7 @@ class PostViewSet(viewsets.ModelViewSet):
         if 'experience_id' in self.kwargs:
             queryset = queryset.filter(experience__id=self.kwargs['experience_id'])
 
-        return queryset
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
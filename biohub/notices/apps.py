@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class NoticesConfig(AppConfig):
     name = 'biohub.notices'
+
+    def ready(self):
+        from biohub.notices import signals  # noqa
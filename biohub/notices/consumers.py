@@ -0,0 +1,5 @@
+from biohub.notices.pusher import stats_pusher
+
+
+def flush_stats_consumer(message):
+    return stats_pusher.flush_later(message['deadline'])
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from biohub.notices.models import NoticeCounter
+
+
+class Command(BaseCommand):
+
+    help = 'Recounts notice counters of users to repair drift.'
+
+    def handle(self, **options):
+        counter = NoticeCounter.objects.reconcile()
+
+        self.stdout.write(
+            '{} counter(s) fixed.'.format(counter),
+            self.style.SUCCESS
+        )
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_notices(apps, schema_editor):
+    Notice = apps.get_model('notices', 'Notice')
+    NoticeCounter = apps.get_model('notices', 'NoticeCounter')
+
+    rows = Notice.objects.order_by().values('user', 'category').annotate(
+        count=models.Count('id'),
+        read=models.Sum(models.Case(
+            models.When(has_read=True, then=1),
+            default=0,
+            output_field=models.IntegerField())))
+
+    NoticeCounter.objects.bulk_create(
+        NoticeCounter(
+            user_id=row['user'],
+            category=row['category'],
+            total=row['count'],
+            unread=row['count'] - row['read'])
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notices', '0002_auto_20171001_2105'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticeCounter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=200)),
+                ('total', models.IntegerField(default=0)),
+                ('unread', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notice_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='noticecounter',
+            unique_together=set([('user', 'category')]),
+        ),
+        migrations.RunPython(count_notices, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,24 @@
+from collections import Counter, defaultdict
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.contenttypes.fields import GenericForeignKey
 
 
+def _count_rows(rows):
+    """
+    Given (user_id, category, has_read) tuples of notices, returns a dict
+    mapping (user_id, category) to (total, unread).
+    """
+    totals, unreads = Counter(), Counter()
+
+    for user_id, category, has_read in rows:
+        totals[user_id, category] += 1
+        unreads[user_id, category] += not has_read
+
+    return {key: (totals[key], unreads[key]) for key in totals}
+
+
 class NoticeQuerySet(models.QuerySet):
 
     def user_notices(self, user):
@@ -14,6 +30,55 @@ class NoticeQuerySet(models.QuerySet):
     def mark_read(self):
         return self.update(has_read=True)
 
+    def _lock_rows(self):
+        return self.select_for_update().values_list('user', 'category', 'has_read')
+
+    def update(self, **kwargs):
+        """
+        Keeps the unread counters in sync if `has_read` is changed.
+        """
+        if 'has_read' not in kwargs:
+            return super(NoticeQuerySet, self).update(**kwargs)
+
+        has_read = bool(kwargs['has_read'])
+        sign = -1 if has_read else 1
+
+        with transaction.atomic():
+            changing = _count_rows(self.filter(has_read=not has_read)._lock_rows())
+            rows = super(NoticeQuerySet, self).update(**kwargs)
+            NoticeCounter.objects.adjust({
+                key: (0, sign * total)
+                for key, (total, _) in changing.items()
+            })
+
+        return rows
+
+    def delete(self):
+        """
+        Keeps the counters in sync.
+        """
+        with transaction.atomic():
+            deleting = _count_rows(self._lock_rows())
+            result = super(NoticeQuerySet, self).delete()
+            NoticeCounter.objects.adjust({
+                key: (-total, -unread)
+                for key, (total, unread) in deleting.items()
+            })
+
+        return result
+
+    def bulk_create(self, objs, batch_size=None):
+        """
+        Keeps the counters in sync.
+        """
+        with transaction.atomic():
+            objs = super(NoticeQuerySet, self).bulk_create(objs, batch_size)
+            NoticeCounter.objects.adjust(_count_rows(
+                (obj.user_id, obj.category, obj.has_read) for obj in objs
+            ))
+
+        return objs
+
     def categories(self):
         return self.order_by('category')\
             .values_list('category', flat=True).distinct()
@@ -43,10 +108,13 @@ class NoticeQuerySet(models.QuerySet):
         return qs
 
     def broadcast_stats(self, users):
-        from biohub.core.websocket.tool import broadcast_user
+        """
+        Pushes unread counts to `users` shortly, coalescing pushes in a burst.
+        See `biohub.notices.pusher`.
+        """
+        from biohub.notices.pusher import stats_pusher
 
-        for stat in self.users_stats(users):
-            broadcast_user('notices', stat['user'], stat['unread'])
+        stats_pusher.push(users)
 
 
 class Notice(models.Model):
@@ -73,6 +141,199 @@ class Notice(models.Model):
     class Meta:
         ordering = ('-has_read', '-created')
 
+    def save(self, *args, **kwargs):
+        """
+        Counts the notice if it's new, or adjusts the counters if its
+        `has_read`, `user` or `category` changed.
+        """
+        counted_fields = {'has_read', 'user', 'user_id', 'category'}
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is not None and not counted_fields & set(update_fields):
+            return super(Notice, self).save(*args, **kwargs)
+
+        with transaction.atomic():
+            old = None
+            if not self._state.adding:
+                old = Notice.objects.filter(pk=self.pk).select_for_update()\
+                    .values_list('user', 'category', 'has_read').first()
+
+            super(Notice, self).save(*args, **kwargs)
+
+            changes = [((self.user_id, self.category, self.has_read), 1)]
+            if old is not None:
+                changes.append((old, -1))
+
+            deltas = defaultdict(lambda: (0, 0))
+            for (user_id, category, has_read), sign in changes:
+                total, unread = deltas[user_id, category]
+                deltas[user_id, category] = (total + sign, unread + sign * int(not has_read))
+
+            NoticeCounter.objects.adjust(deltas)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super(Notice, self).delete(*args, **kwargs)
+            NoticeCounter.objects.adjust({
+                (self.user_id, self.category): (-1, -int(not self.has_read))
+            })
+
+        return result
+
     def mark_read(self):
+        Notice.objects.filter(pk=self.pk).mark_read()
         self.has_read = True
-        self.save()
+
+
+class NoticeCounterQuerySet(models.QuerySet):
+
+    def adjust(self, deltas):
+        """
+        Applies `deltas`, a dict mapping (user_id, category) to (total,
+        unread) increments, to the counters. Should be called in the same
+        transaction as the changes of notices.
+
+        Counters sharing the same category and increments are adjusted
+        together, so that a batch of notices costs a constant number of
+        queries.
+        """
+        batches = defaultdict(list)
+
+        for (user_id, category), (total, unread) in deltas.items():
+            if total or unread:
+                batches[category, total, unread].append(user_id)
+
+        for (category, total, unread), user_ids in batches.items():
+            if len(user_ids) == 1:
+                self._adjust_one(user_ids[0], category, total, unread)
+            else:
+                self._adjust_many(user_ids, category, total, unread)
+
+    def _adjust_one(self, user_id, category, total, unread):
+        counters = self.filter(user_id=user_id, category=category)
+        changes = dict(
+            total=models.F('total') + total,
+            unread=models.F('unread') + unread
+        )
+
+        if counters.update(**changes):
+            return
+
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, category=category, total=total, unread=unread)
+        except IntegrityError:
+            # Created concurrently
+            counters.update(**changes)
+
+    def _adjust_many(self, user_ids, category, total, unread):
+        counters = self.filter(user_id__in=user_ids, category=category)
+        existing = set(counters.select_for_update().values_list('user', flat=True))
+
+        if existing:
+            counters.filter(user_id__in=existing).update(
+                total=models.F('total') + total,
+                unread=models.F('unread') + unread
+            )
+
+        missing = [user_id for user_id in user_ids if user_id not in existing]
+        if not missing:
+            return
+
+        try:
+            with transaction.atomic():
+                self.bulk_create(
+                    NoticeCounter(user_id=user_id, category=category, total=total, unread=unread)
+                    for user_id in missing
+                )
+        except IntegrityError:
+            # Some were created concurrently
+            for user_id in missing:
+                self._adjust_one(user_id, category, total, unread)
+
+    def stats(self, user):
+        """
+        Returns stats of notices of `user` by category, the same as
+        `NoticeQuerySet.stats`.
+        """
+        return self.filter(user=user, total__gt=0).order_by('category')\
+            .annotate(count=models.F('total'))\
+            .values('category', 'count', 'unread')
+
+    def unread_count(self, user):
+        """
+        Returns the number of unread notices of `user`.
+        """
+        return self.filter(user=user).aggregate(
+            unread=models.Sum('unread'))['unread'] or 0
+
+    def users_unread_counts(self, users):
+        """
+        Returns a dict mapping ids of `users` (who have notices) to their
+        numbers of unread notices.
+        """
+        return dict(
+            self.filter(user__in=users, total__gt=0).order_by('user').values('user')
+            .annotate(unread_sum=models.Sum('unread'))
+            .values_list('user', 'unread_sum')
+        )
+
+    def reconcile(self):
+        """
+        Recounts the counters from notices, to repair drift. Returns the
+        number of counters fixed.
+        """
+        counter = 0
+
+        with transaction.atomic():
+            actual = {
+                (row['user'], row['category']): (row['count'], row['count'] - row['read'])
+                for row in Notice.objects.order_by().values('user', 'category').annotate(
+                    count=models.Count('id'),
+                    read=models.Sum(models.Case(
+                        models.When(has_read=True, then=1),
+                        default=0,
+                        output_field=models.IntegerField())))
+            }
+
+            for item in self.select_for_update():
+                key = item.user_id, item.category
+                total, unread = actual.pop(key, (0, 0))
+
+                if (item.total, item.unread) == (total, unread):
+                    continue
+
+                counter += 1
+                if total:
+                    item.total, item.unread = total, unread
+                    item.save(update_fields=['total', 'unread'])
+                else:
+                    item.delete()
+
+            self.bulk_create(
+                NoticeCounter(user_id=user_id, category=category, total=total, unread=unread)
+                for (user_id, category), (total, unread) in actual.items()
+            )
+
+        return counter + len(actual)
+
+
+class NoticeCounter(models.Model):
+    """
+    Denormalized numbers of notices of each user in each category, which are
+    maintained along with changes of notices, and can be repaired by the
+    `reconcilenotices` command.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='notice_counters',
+        on_delete=models.CASCADE)
+    category = models.CharField(max_length=200)
+    total = models.IntegerField(default=0)
+    unread = models.IntegerField(default=0)
+
+    objects = NoticeCounterQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('user', 'category')
@@ -0,0 +1,168 @@
+"""
+Debounced pushing of notice stats.
+
+Sending a notice used to push the unread count of its receiver right away,
+with an aggregate query each. During a burst of activity, the same user may
+receive many notices in a short time, which results in a burst of identical
+queries and websocket frames.
+
+Instead, receivers are marked dirty in redis, and the first mark in a window
+sends a message to channel workers, one of which flushes once the window
+ends. The flush takes all dirty users (marked by any process), reads their
+unread counters with one query and sends one frame per user.
+
+The flush runs in channel workers, since web processes may have no threads
+to run a timer, or be recycled before the window ends. It's scheduled in the
+runtime of the worker (see `biohub.core.tasks.executors.runtime`) and runs in
+a thread of its own, so that it neither goes through the admission of tasks
+nor waits for task slots busy with long jobs.
+"""
+
+import time
+import asyncio
+import logging
+import concurrent.futures
+
+from django.db import connection
+
+from biohub.utils.detect import features
+from biohub.core.tasks.executors import runtime
+
+__all__ = ['StatsPusher', 'stats_pusher']
+
+logger = logging.getLogger('biohub.notices')
+
+
+def _get_user_id(user):
+    return getattr(user, 'pk', user)
+
+
+class StatsPusher(object):
+
+    def __init__(self, window=.2):
+        """
+        window: seconds to wait before a flush, during which marks are
+            coalesced.
+        """
+        self.window = window
+        self._storage = None
+        self._executor = None
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from biohub.utils.redis import Storage
+
+            self._storage = Storage('__biohub_notices_stats__')
+
+        return self._storage
+
+    @property
+    def deferred(self):
+        """
+        Stats are pushed immediately if there's no redis to coordinate, or in
+        tests.
+        """
+        return self.window > 0 and features.redis and not features.testing
+
+    def push(self, users):
+        """
+        Pushes stats to `users` (user instances or ids) within the window.
+        """
+        if not self.deferred:
+            return self._push(users)
+
+        if self.mark(users):
+            self._schedule_flush()
+
+    def mark(self, users):
+        """
+        Marks `users` dirty. Returns True if a flush should be scheduled by
+        the caller, i.e. there's no flush pending.
+        """
+        ids = [_get_user_id(user) for user in users]
+
+        if not ids:
+            return False
+
+        dirty_key = self.storage.make_key('dirty')
+        pending_key = self.storage.make_key('pending')
+
+        with self.storage.pipeline() as pipe:
+            pipe.sadd(dirty_key, *map(self.storage.encode, ids))
+            # The flag expires in case the process scheduling the flush dies
+            pipe.set(pending_key, 1, px=int(self.window * 10000), nx=True)
+            return bool(pipe.execute()[1])
+
+    def flush(self):
+        """
+        Pushes stats to all dirty users. Returns a dict mapping ids of the
+        users to their numbers of unread notices.
+        """
+        dirty_key = self.storage.make_key('dirty')
+
+        # Clear the flag first, so that users marked after the set is taken
+        # will schedule a new flush
+        self.storage.delete('pending')
+
+        with self.storage.pipeline() as pipe:
+            pipe.smembers(dirty_key)
+            pipe.delete(dirty_key)
+            ids = [self.storage.decode(id) for id in pipe.execute()[0]]
+
+        return self._push(ids)
+
+    def _schedule_flush(self):
+        from channels import Channel
+
+        try:
+            Channel('notices.flush').send({'deadline': time.time() + self.window})
+        except Exception:
+            logger.exception('Failed to schedule pushing notice stats.')
+            # Let the next mark schedule a flush again
+            self.storage.delete('pending')
+
+    def flush_later(self, deadline):
+        """
+        Flushes once `deadline` (a timestamp) is reached, without blocking
+        the caller. Returns a concurrent future of the result of `flush`.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        return runtime.submit(self._flush_at(deadline))
+
+    async def _flush_at(self, deadline):
+        await asyncio.sleep(max(0, deadline - time.time()))
+
+        return await runtime.loop.run_in_executor(self._executor, self._flush_in_thread)
+
+    def _flush_in_thread(self):
+        try:
+            return self.flush()
+        except Exception:
+            logger.exception('Failed to push notice stats.')
+            return {}
+        finally:
+            # Connections of the flushing thread are not managed by requests
+            connection.close()
+
+    def _push(self, users):
+        from biohub.core.websocket.tool import group_send
+        from biohub.core.websocket.presence import presence
+        from biohub.notices.models import NoticeCounter
+
+        # Stats of offline users will be fetched on connection
+        ids = presence.online(_get_user_id(user) for user in users)
+        if not ids:
+            return {}
+
+        stats = NoticeCounter.objects.users_unread_counts(ids)
+
+        for id, unread in stats.items():
+            group_send('notices', 'user_%s' % id, unread)
+
+        return stats
+
+
+stats_pusher = StatsPusher()
@@ -0,0 +1,14 @@
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from biohub.accounts.models import User
+from biohub.notices.models import Notice
+
+
+@receiver(pre_delete, sender=User)
+def remove_notices_of_actor(instance, **kwargs):
+    """
+    Deletes notices sent by `instance` to other users before they cascade,
+    which bypasses the counters.
+    """
+    Notice.objects.filter(actor=instance).exclude(user=instance).delete()
@@ -11,19 +11,36 @@ may be further transformed into `<a>` tag by javascript. The design provides
 you more flexibility.
 """
 
+import re
+from functools import lru_cache
+
 from django.template import engines
+from django.db.models import Case, When, Value, TextField
 from django.db.models.functions import Now
 from django.contrib.contenttypes.models import ContentType
 
 from .models import Notice
 
-__all__ = ['Dispatcher']
+__all__ = ['Dispatcher', 'get_notice_template']
+
+
+@lru_cache(maxsize=256)
+def get_notice_template(template):
+    """
+    Compiles and caches notice templates, which are a handful of strings used
+    over and over. Use `get_notice_template.cache_info()` for stats.
+    """
+    return engines['notices'].from_string(template)
+
+
+def _is_user_specific(template):
+    # Conservative: any mention of `user` counts
+    return re.search(r'\buser\b', template) is not None
 
 
 def render_notice_message(template, dispatcher, **context):
 
-    engine = engines['notices']
-    return engine.from_string(template).render(dict(
+    return get_notice_template(template).render(dict(
         category=dispatcher.category,
         **context))
 
@@ -41,10 +58,29 @@ class Dispatcher(object):
     def category(self):
         return self.__category
 
-    def _get_notice_instance(self, user, template, context, save=False):
+    def _get_target_fields(self, target):
+        """
+        Resolves the generic foreign key fields of `target`, so that it's done
+        once per batch. The content type comes from the cache of
+        `ContentType.objects`.
+        """
+        if target is None:
+            return dict(target_type=None, target_id=None)
+
+        return dict(
+            target_type=ContentType.objects.get_for_model(target),
+            target_id=target.pk
+        )
 
-        message = render_notice_message(
-            template, self, user=user, **context)
+    def _get_notice_instance(self, user, template, context, save=False,
+                             message=None, target_fields=None):
+
+        if message is None:
+            message = render_notice_message(
+                template, self, user=user, **context)
+
+        if target_fields is None:
+            target_fields = self._get_target_fields(context.get('target', None))
 
         constructor = Notice.objects.create if save else Notice
 
@@ -52,11 +88,24 @@ class Dispatcher(object):
             user=user,
             message=message,
             category=self.category,
-            target=context.get('target', None),
             target_slug=context.get('target_slug', ''),
-            actor=context.get('actor', None)
+            actor=context.get('actor', None),
+            **target_fields
         )
 
+    def _get_messages(self, users, template, context):
+        """
+        Renders messages for `users`, only once if the template doesn't depend
+        on the user.
+        """
+        if _is_user_specific(template):
+            return [
+                render_notice_message(template, self, user=user, **context)
+                for user in users
+            ]
+
+        return [render_notice_message(template, self, **context)] * len(users)
+
     def send(self, user, template, **context):
         """
         Send a notice to user.
@@ -68,13 +117,10 @@ class Dispatcher(object):
         Notice.objects.broadcast_stats([user])
         return notice
 
-    def send_or_update(self, user, template, **context):
+    def _get_filter_keywords(self, user, template, context):
         """
-        Update or send a notice.
-        The notices to update are located by `target`, `target_slug`, `actor`,
-        which are ALL required to be specified.
+        Returns lookups locating the notices to update for `send_or_update`.
         """
-
         filter_fields = set(context.get('filter_fields', {'target', 'target_slug', 'actor', 'user', 'category'}))
         assert filter_fields, '`filter_fields` should not be empty.'
 
@@ -92,26 +138,74 @@ class Dispatcher(object):
         }
 
         if 'target' in filter_fields and context['target'] is not None:
-            target = context['target']
-            ctype = ContentType.objects.get_for_model(target)
             keywords.pop('target')
-            keywords.update({
-                'target_type': ctype,
-                'target_id': target.pk
-            })
+            keywords.update(self._get_target_fields(context['target']))
 
-        try_find = Notice.objects.filter(**keywords)
+        return keywords
 
-        if try_find.count():
-            message = render_notice_message(
-                template, self, user=user, **context)
-            try_find.update(message=message, has_read=False, created=Now())
-            notice = None
-        else:
-            notice = self.send(user, template, **context)
+    def send_or_update(self, user, template, **context):
+        """
+        Update or send a notice.
+        The notices to update are located by `target`, `target_slug`, `actor`,
+        which are ALL required to be specified.
+        """
+
+        keywords = self._get_filter_keywords(user, template, context)
+        message = render_notice_message(template, self, user=user, **context)
+
+        if not Notice.objects.filter(**keywords).update(
+                message=message, has_read=False, created=Now()):
+            # Stats are pushed by `send`
+            return self.send(user, template, **context)
 
         Notice.objects.broadcast_stats([user])
-        return notice
+
+    def send_or_update_many(self, users, template, **context):
+        """
+        The bulk version of `send_or_update`, which updates the notices of
+        `users` with one statement and creates the missing ones with
+        `bulk_create`. `users` should be user instances, and `user` must be
+        one of `filter_fields`.
+
+        Returns the created notices.
+        """
+        users = list(users)
+        if not users:
+            return []
+
+        keywords = self._get_filter_keywords(None, template, context)
+        assert 'user' in keywords, '`user` should be one of `filter_fields`.'
+        keywords.pop('user')
+
+        user_ids = [user.pk for user in users]
+        messages = dict(zip(user_ids, self._get_messages(users, template, context)))
+        found = Notice.objects.filter(user__in=user_ids, **keywords)
+        existing = set(found.values_list('user', flat=True).distinct())
+
+        if existing:
+            if len(set(messages.values())) > 1:
+                message = Case(
+                    *(When(user=user_id, then=Value(messages[user_id]))
+                      for user_id in existing),
+                    output_field=TextField())
+            else:
+                message = messages[next(iter(existing))]
+
+            found.filter(user__in=existing).update(
+                message=message, has_read=False, created=Now())
+
+        target_fields = self._get_target_fields(context.get('target', None))
+        notices = Notice.objects.bulk_create(
+            self._get_notice_instance(
+                user, template, context,
+                message=messages[user_id],
+                target_fields=target_fields)
+            for user, user_id in zip(users, user_ids)
+            if user_id not in existing
+        )
+        Notice.objects.broadcast_stats(user_ids)
+
+        return notices
 
     def group_send(self, users, template, **context):
         """
@@ -120,19 +214,16 @@ class Dispatcher(object):
         Template context will be served the same as `send` do.
         """
 
-        results = []
+        users = list(users)
+        target_fields = self._get_target_fields(context.get('target', None))
 
-        for user in users:
-            results.append(
-                self._get_notice_instance(
-                    user,
-                    template,
-                    context,
-                    save=False
-                )
-            )
-
-        notices = Notice.objects.bulk_create(results)
+        notices = Notice.objects.bulk_create(
+            self._get_notice_instance(
+                user, template, context,
+                message=message,
+                target_fields=target_fields)
+            for user, message in zip(users, self._get_messages(users, template, context))
+        )
         Notice.objects.broadcast_stats(users)
 
         return notices
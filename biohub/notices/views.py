@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from biohub.utils.rest import pagination, permissions as p
 
 from .serializers import NoticeSerializer
-from .models import Notice
+from .models import Notice, NoticeCounter
 
 
 class NoticeViewSet(
@@ -12,7 +12,7 @@ class NoticeViewSet(
         viewsets.GenericViewSet):
 
     serializer_class = NoticeSerializer
-    pagination_class = pagination.factory('PageNumberPagination')
+    pagination_class = pagination.factory('KeysetPagination', ordering=('-created', '-id'))
     permission_classes = [p.C(p.IsAuthenticated) &
                           p.check_owner('user', ('GET',))]
     filter_fields = ('has_read', 'category')
@@ -44,4 +44,7 @@ class NoticeViewSet(
 
     @decorators.list_route(['GET'])
     def stats(self, *args, **kwargs):
-        return Response(self.get_queryset().stats())
+        if 'ids' in self.request.query_params:
+            return Response(self.get_queryset().stats())
+
+        return Response(NoticeCounter.objects.stats(self.request.user))
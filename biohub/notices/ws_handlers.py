@@ -1,12 +1,10 @@
 from biohub.core.websocket import register_connected, register_handler
 
-from .models import Notice
+from .models import NoticeCounter
 
 
 def echo_notices_stats(message):
-    message.reply(
-        Notice.objects.user_notices(message.user).unread().count()
-    )
+    message.reply(NoticeCounter.objects.unread_count(message.user))
 
 
 @register_handler('notices')
@@ -1,4 +1,7 @@
+import io
+import os
 import base64
+from uuid import uuid4
 from functools import wraps
 
 from django.http import HttpResponse
@@ -43,3 +46,61 @@ def get_ip_from_request(request):
     else:
         ip = request.META.get('REMOTE_ADDR', '')
     return ip
+
+
+class MultipartFileStream(object):
+    """
+    A file-like object producing a multipart/form-data body with a single
+    file field. The file is read chunk by chunk when the body is sent, so it
+    can be passed to `requests` as `data` without being loaded into memory.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, field_name, fd, file_name=None, content_type='application/octet-stream'):
+        self.boundary = uuid4().hex
+
+        if file_name is None:
+            file_name = os.path.basename(getattr(fd, 'name', '') or field_name)
+
+        head = (
+            '--{boundary}\r\n'
+            'Content-Disposition: form-data; name="{field}"; filename="{name}"\r\n'
+            'Content-Type: {type}\r\n\r\n'
+        ).format(
+            boundary=self.boundary,
+            field=field_name,
+            name=file_name.replace('"', '%22'),
+            type=content_type
+        ).encode()
+        tail = '\r\n--{}--\r\n'.format(self.boundary).encode()
+
+        fd.seek(0, os.SEEK_END)
+        size = fd.tell()
+        fd.seek(0)
+
+        self._length = len(head) + size + len(tail)
+        self._parts = [io.BytesIO(head), fd, io.BytesIO(tail)]
+
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary=%s' % self.boundary
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(self.chunk_size), b''))
+
+        while self._parts:
+            chunk = self._parts[0].read(size)
+            if chunk:
+                return chunk
+
+            self._parts.pop(0)
+
+        return b''
+
+    def __iter__(self):
+        return iter(lambda: self.read(self.chunk_size), b'')
@@ -1,6 +1,138 @@
+import json
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.core.exceptions import ValidationError
 from rest_framework import pagination, response
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+__all__ = ['factory', 'KeysetPagination']
+
+
+class KeysetPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination, which switches to keyset (cursor) pagination once
+    `cursor` is given in the query string (empty for the first page).
+
+    Keyset pages are located by values of `ordering` of the last item seen,
+    with a range query on (ideally indexed) ordering fields instead of OFFSET,
+    so that a deep page costs as much as the first one. The last field of
+    `ordering` should be unique, e.g. `('-created', '-id')`. Keyset pages only
+    link to the next page, and include the total count only if `count=1` is
+    given, since it requires a `COUNT(*)`.
+    """
+
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    keyset = False
+
+    def get_ordering(self):
+        ordering = self.ordering
+
+        if isinstance(ordering, str):
+            ordering = ordering.split(',')
+
+        return [field.strip() for field in ordering]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+
+        if not self.keyset:
+            return super(KeysetPagination, self).paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.display_page_controls = False
+        self.page_size = self.get_page_size(request)
+
+        if not self.page_size:
+            return None
+
+        ordering = self.get_ordering()
+        queryset = queryset.order_by(*ordering)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+
+        cursor = self.decode_cursor(request, queryset.model)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(queryset.model, ordering, cursor))
 
-__all__ = ['factory']
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        return self.page
+
+    def get_keyset_filter(self, model, ordering, cursor):
+        """
+        Returns a condition selecting items after `cursor`, i.e. for ordering
+        (a, b): `a after A OR (a = A AND b after B)`.
+        """
+        condition = Q()
+        equals = {}
+
+        for field, value in zip(ordering, cursor):
+            name = field.lstrip('-')
+            lookup = '%s__%s' % (name, 'lt' if field.startswith('-') else 'gt')
+            condition |= Q(**equals) & Q(**{lookup: value})
+            equals[name] = value
+
+        return condition
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if not encoded:
+            return None
+
+        ordering = self.get_ordering()
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            assert isinstance(values, list) and len(values) == len(ordering)
+
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(ordering, values)
+            ]
+        except (TypeError, ValueError, AssertionError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item):
+        values = []
+
+        for field in self.get_ordering():
+            value = getattr(item, field.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super(KeysetPagination, self).get_next_link()
+
+        if not self.has_next:
+            return None
+
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super(KeysetPagination, self).get_paginated_response(data)
+
+        fields = [('next', self.get_next_link()), ('results', data)]
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+
+        return response.Response(OrderedDict(fields))
 
 
 def factory(base_class_name, **options):
@@ -9,9 +141,15 @@ def factory(base_class_name, **options):
     specified by `base_class_name`, which will be used to locate a class in
     `rest_framework.pagination` module. Extra options will be applied as class
     members of the new pagination class.
+
+    Pagination classes of this module, i.e. `KeysetPagination`, are resolved
+    first.
     """
 
-    base_cls = getattr(pagination, base_class_name, None)
+    if base_class_name in __all__:
+        base_cls = globals()[base_class_name]
+    else:
+        base_cls = getattr(pagination, base_class_name, None)
 
     assert base_cls is not None, \
         'Cannot resolve %r into pagination class.' % base_class_name
@@ -73,8 +73,30 @@ class DynamicSerializerMixin(object):
         return result
 
 
+class EagerLoadingMixin(object):
+    """
+    A serializer mixin to declare related objects read during serialization,
+    so that views can fetch them along with the queryset, instead of issuing
+    queries for each item.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+
+        return queryset
+
+
 class ModelSerializer(
-        DynamicSerializerMixin, rest_serializers.ModelSerializer):
+        EagerLoadingMixin, DynamicSerializerMixin,
+        rest_serializers.ModelSerializer):
     pass
 
 
@@ -21,7 +21,11 @@ def make_req(user):
 
 class AbacusTestCase(_base.TaskTestCase):
 
-    pass
+    def setUp(self):
+        from biohub.abacus.cache import result_cache
+
+        super(AbacusTestCase, self).setUp()
+        result_cache.clear()
 
 
 class AbacusLiveTestCase(_base.ChannelLiveServerTestCase, AbacusTestCase):
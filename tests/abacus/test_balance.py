@@ -0,0 +1,121 @@
+import json
+import threading
+from collections import Counter
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from biohub.abacus.remote import ServerBalancer
+
+from ._base import AbacusTestCase
+
+
+class StubServer(object):
+    """
+    A stub ABACUS server which only reports its queue depth.
+    """
+
+    def __init__(self, depth=0, healthy=True):
+        self.depth = depth
+        self.healthy = healthy
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if not stub.healthy:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+
+                body = json.dumps(dict(queued=stub.depth, running=0)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%s/' % self.httpd.server_port
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class Test(AbacusTestCase):
+
+    def setUp(self):
+        super(Test, self).setUp()
+        self.stubs = [StubServer() for _ in range(4)]
+        self.balancer = ServerBalancer([stub.url for stub in self.stubs])
+        self.balancer.depth_timeout = 60
+
+    def tearDown(self):
+        for stub in self.stubs:
+            stub.close()
+
+        self.balancer._storage.delete_pattern('*')
+        super(Test, self).tearDown()
+
+    def test_balanced(self):
+        counter = Counter()
+
+        for _ in range(40):
+            server = self.balancer.choose()
+            self.balancer.acquire(server)
+            counter[server] += 1
+
+        self.assertEqual(set(counter), {stub.url for stub in self.stubs})
+        self.assertLessEqual(max(counter.values()) - min(counter.values()), 4)
+
+    def test_release(self):
+        server = self.balancer.choose()
+        self.balancer.acquire(server)
+        self.assertEqual(self.balancer.inflight(server), 1)
+
+        self.balancer.release(server, 10)
+        self.assertEqual(self.balancer.inflight(server), 0)
+
+        # Never below zero
+        self.balancer.release(server)
+        self.balancer.acquire(server)
+        self.assertEqual(self.balancer.inflight(server), 1)
+
+    def test_inflight_reconciled(self):
+        server = self.stubs[0].url
+        for _ in range(3):
+            self.balancer.acquire(server)
+
+        # Callbacks of two jobs were lost
+        self.stubs[0].depth = 1
+        self.balancer.depth(server)
+
+        self.assertEqual(self.balancer.inflight(server), 1)
+        self.assertGreater(
+            self.balancer._storage.pttl(self.balancer._key('inflight', server)), 0)
+        self.assertEqual(self.balancer.latency(server), 10)
+
+        self.balancer.release(server, 0)
+        self.assertLess(self.balancer.latency(server), 10)
+
+    def test_reported_depth(self):
+        self.stubs[0].depth = 100
+        self.balancer = ServerBalancer([stub.url for stub in self.stubs[:2]])
+
+        for _ in range(10):
+            self.assertEqual(self.balancer.choose(), self.stubs[1].url)
+
+    def test_eject(self):
+        bad = self.stubs[0]
+        bad.healthy = False
+        self.balancer = ServerBalancer([stub.url for stub in self.stubs[:2]])
+
+        for _ in range(self.balancer.max_errors):
+            self.balancer.record_error(bad.url)
+
+        self.assertTrue(self.balancer.is_ejected(bad.url))
+        for _ in range(10):
+            self.assertEqual(self.balancer.choose(), self.stubs[1].url)
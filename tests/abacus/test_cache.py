@@ -0,0 +1,179 @@
+import threading
+from unittest.mock import Mock
+
+from django.db import connection
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from biohub.accounts.models import User
+from biohub.abacus.cache import ResultCache
+from biohub.abacus.result import AbacusAsyncResult
+from biohub.abacus.handlers import get_handler_class
+
+from ._base import AbacusTestCase, AbacusLiveTestCase, get_example_descriptor
+
+
+class TestStore(AbacusTestCase):
+
+    def setUp(self):
+        super(TestStore, self).setUp()
+        self.cache = ResultCache(max_entries=2, max_size=10)
+        self.names = []
+
+    def tearDown(self):
+        for name in self.names:
+            default_storage.delete(name)
+
+        self.cache.clear()
+        super(TestStore, self).tearDown()
+
+    def make_output(self, size):
+        name = default_storage.save('abacus_output_test', ContentFile(b'x' * size))
+        self.names.append(name)
+        return default_storage.url(name), name
+
+    def test_fingerprint(self):
+        a = SimpleUploadedFile('a.pdb', b'ATOM')
+        b = SimpleUploadedFile('b.pdb', b'ATOM')
+        c = SimpleUploadedFile('c.pdb', b'HETATM')
+
+        self.assertEqual(self.cache.fingerprint(a), self.cache.fingerprint(b))
+        self.assertNotEqual(self.cache.fingerprint(a), self.cache.fingerprint(c))
+        self.assertEqual(a.read(), b'ATOM')
+
+    def test_lru_entries(self):
+        self.cache.store('a', 'output-a')
+        self.cache.store('b', 'output-b')
+        self.assertEqual(self.cache.get('a'), 'output-a')
+
+        self.cache.store('c', 'output-c')
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'output-a')
+        self.assertEqual(self.cache.get('c'), 'output-c')
+
+    def test_lru_size(self):
+        url_a, name_a = self.make_output(6)
+        url_b, name_b = self.make_output(6)
+
+        self.cache.store('a', url_a)
+        self.assertEqual(self.cache.size(), 6)
+
+        self.cache.store('b', url_b)
+        self.assertEqual(self.cache.size(), 6)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertFalse(default_storage.exists(name_a))
+        self.assertTrue(default_storage.exists(name_b))
+
+    def test_stale_output(self):
+        url, name = self.make_output(4)
+        self.cache.store('a', url)
+
+        # Removed by `clean_unused`
+        default_storage.delete(name)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_remote_output(self):
+        url, name = self.make_output(4)
+
+        self.cache.store('a', 'http://abacus.example.com' + url)
+        self.cache.store('b', 'output-b')
+        self.cache.store('c', 'output-c')
+
+        # Evicted without touching the local file of the same name
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_running(self):
+        result = AbacusAsyncResult('abacus-cache-test')
+        result.run()
+
+        self.cache.mark_running('a', result.task_id)
+        self.assertEqual(self.cache.running('a'), result.task_id)
+
+        result.resolve('output-a')
+        self.assertIsNone(self.cache.running('a'))
+
+    def test_claim(self):
+        self.assertEqual((True, None), self.cache.claim('a', 'abacus-claim-test'))
+        # The job is being started, and has no status yet
+        self.assertEqual((False, 'abacus-claim-test'), self.cache.claim('a', 'another'))
+
+        self.cache.release('a', 'abacus-claim-test')
+        self.assertEqual((True, None), self.cache.claim('a', 'another'))
+
+    def test_claim_unknown_id(self):
+        self.assertEqual((True, None), self.cache.claim('a'))
+        # Waits for the id of the job being started
+        self.assertEqual((False, None), self.cache.claim('a', 'another', wait=.2))
+
+        self.cache.mark_running('a', 'abacus-claim-test')
+        self.assertEqual((False, 'abacus-claim-test'), self.cache.claim('a', 'another'))
+
+    def test_stale_claim(self):
+        self.cache.claim('a', 'abacus-claim-test')
+        self.cache.claim_grace = 0
+
+        # Released since the job is gone
+        self.assertIsNone(self.cache.running('a'))
+        self.assertEqual((True, None), self.cache.claim('a', 'another'))
+
+
+class TestDedup(AbacusLiveTestCase):
+
+    def post(self, user):
+        self.client.force_authenticate(user)
+        with get_example_descriptor() as fp:
+            return self.client.post('/api/abacus/start/', {'file': fp}).data
+
+    def test_concurrent_dedup(self):
+        users = [User.objects.create_test_user('user%s' % i) for i in range(4)]
+        handler = get_handler_class()
+        barrier = threading.Barrier(len(users))
+        ids = []
+
+        def start(user):
+            with get_example_descriptor() as fp:
+                request = Mock(FILES={'file': SimpleUploadedFile('example.pdb', fp.read())}, user=user)
+
+            barrier.wait()
+            try:
+                ids.append(handler(request).start_task(user)['id'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=start, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(set(ids)))
+
+        result = AbacusAsyncResult(ids[0])
+        self.assertEqual(sorted(result.audience), sorted(user.pk for user in users))
+        # Fields are written before dispatching
+        self.assertIsNotNone(result.digest)
+        self.assertTrue(result.wait(20, 0.1))
+
+    def test_dedup(self):
+        me = User.objects.create_test_user('me')
+        you = User.objects.create_test_user('you')
+
+        first = self.post(me)
+        second = self.post(you)
+        self.assertEqual(first['id'], second['id'])
+
+        result = AbacusAsyncResult(first['id'])
+        self.assertEqual(result.audience, [me.pk, you.pk])
+        self.assertTrue(result.wait(20, 0.1))
+        self.assertEqual(result.audience, [me.pk])
+
+        third = self.post(you)
+        self.assertNotEqual(third['id'], first['id'])
+        self.assertEqual(self.client.get(third['query_url']).data, dict(
+            id=third['id'], status='SUCCESS', output=result.result))
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from biohub.accounts.models import User
+from biohub.abacus import consts
+from biohub.core.tasks.schedule import Interval, scheduler
+from biohub.abacus.result import AbacusAsyncResult, reconcile_remote_tasks
+from biohub.abacus.tasks import ReconcileRemoteTask
+
+from ._base import AbacusTestCase
+
+TASK_ID = 'f924886b-0f7e-49c1-b189-74bc30c60268'
+
+
+class Test(AbacusTestCase):
+
+    def setUp(self):
+        super(Test, self).setUp()
+        self.me = User.objects.create_test_user('me')
+        self.result = AbacusAsyncResult(TASK_ID)
+        self.result._set_ident(consts.REMOTE)
+        self.result._set_user(self.me.pk)
+        self.result._set_input_file_name('a.pdb')
+        self.result._set_signature('sig')
+        self.result.pend()
+        self.result.track_remote()
+
+    def callback(self, **params):
+        return self.client.get(
+            '/api/abacus/callback/',
+            dict(task_id=TASK_ID, s='sig', **params)
+        )
+
+    def test_progress(self):
+        with mock.patch('biohub.abacus.remote.query') as query:
+            self.assertEqual(self.callback(status='STARTED').status_code, 200)
+            self.assertEqual(AbacusAsyncResult(TASK_ID).status.value, 'RUNNING')
+
+            self.assertEqual(self.callback(output='http://a/b.pdb').status_code, 200)
+            self.assertEqual(AbacusAsyncResult(TASK_ID).status.value, 'SUCCESS')
+
+            # Late callbacks are ignored
+            self.assertEqual(self.callback(status='STARTED').status_code, 200)
+            self.assertEqual(AbacusAsyncResult(TASK_ID).status.value, 'SUCCESS')
+
+            self.assertFalse(query.called)
+
+    def test_bad_status(self):
+        self.assertEqual(self.callback(status='WHATEVER').status_code, 400)
+
+    def test_reconcile(self):
+        with mock.patch('biohub.abacus.remote.query') as query:
+            query.return_value = dict(status='SUCCESS', output='http://a/b.pdb')
+
+            self.assertEqual(reconcile_remote_tasks(60), 0)
+            self.assertFalse(query.called)
+
+            self.assertEqual(reconcile_remote_tasks(0), 1)
+            self.assertEqual(AbacusAsyncResult(TASK_ID).result, 'http://a/b.pdb')
+            self.assertEqual(reconcile_remote_tasks(0), 0)
+
+
+class ScheduleTest(SimpleTestCase):
+
+    def test_reconcile_scheduled(self):
+        schedules = dict(scheduler.schedules())
+
+        self.assertIsInstance(schedules.get(ReconcileRemoteTask), Interval)
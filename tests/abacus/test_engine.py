@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from biohub.abacus.conf import settings
+from biohub.abacus.engine import AbacusEngine
+
+from ._base import BASE_DIR
+
+
+class Test(SimpleTestCase):
+
+    def setUp(self):
+        self.engine = AbacusEngine(
+            settings.ABACUS_JAR_PATH,
+            settings.ABACUS_DATABASE_PATH,
+            max_workers=1
+        )
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.engine.shutdown()
+        shutil.rmtree(self.tempdir)
+
+    def make_paths(self, name):
+        input_path = os.path.join(self.tempdir, name + '.pdb')
+        shutil.copy(os.path.join(BASE_DIR, 'example.pdb'), input_path)
+
+        return input_path, os.path.join(self.tempdir, name + '.out.pdb')
+
+    def test_run(self):
+        input_path, output_path = self.make_paths('a')
+        job = self.engine.submit(input_path, output_path)
+
+        self.assertTrue(job.wait(20))
+        self.assertTrue(job.succeeded)
+
+        with open(input_path, 'rb') as i, open(output_path, 'rb') as o:
+            self.assertEqual(i.read(), o.read())
+
+    def test_bounded(self):
+        first = self.engine.submit(*self.make_paths('a'))
+        second = self.engine.submit(*self.make_paths('b'))
+
+        self.assertFalse(first.wait(.5))
+        self.assertEqual(self.engine.pending, 1)
+        self.assertTrue(second.wait(20))
+        self.assertTrue(first.succeeded and second.succeeded)
+
+    def test_cancel(self):
+        first = self.engine.submit(*self.make_paths('a'))
+        second = self.engine.submit(*self.make_paths('b'))
+
+        self.assertFalse(first.wait(.5))
+        first.cancel()
+
+        self.assertTrue(first.wait(5))
+        self.assertFalse(first.succeeded)
+        self.assertEqual(first.killed_reason, 'cancelled')
+
+        self.assertTrue(second.wait(20))
+        self.assertTrue(second.succeeded)
+
+    def test_cancel_pending(self):
+        first = self.engine.submit(*self.make_paths('a'))
+        second = self.engine.submit(*self.make_paths('b'))
+        second.cancel()
+
+        self.assertTrue(second.wait(20))
+        self.assertFalse(second.succeeded)
+        self.assertTrue(first.wait(20))
+        self.assertTrue(first.succeeded)
@@ -53,10 +53,10 @@ class TestRemote(ChannelTestCaseMixin, BaseTest):
         self.tearDown()
 
         resp = self.client.get(resp.data['query_url'])
-        self.assertEqual(resp.data['status'], 'PENDING')
+        self.assertIn(resp.data['status'], ('PENDING', 'RUNNING'))
 
         resp2 = self.client.get(resp2.data['query_url'])
-        self.assertEqual(resp2.data['status'], 'PENDING')
+        self.assertIn(resp2.data['status'], ('PENDING', 'RUNNING'))
 
         time.sleep(2)
 
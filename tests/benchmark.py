@@ -0,0 +1,34 @@
+"""
+Helpers for benchmarks, which are skipped unless BIOHUB_BENCHMARK is set in
+the environment, e.g.:
+
+    BIOHUB_BENCHMARK=1 ./biohub-cli.py test core/tasks/test_benchmark.py -cs
+"""
+
+import os
+import sys
+import time
+from unittest import skipIf
+
+benchmark = skipIf(
+    'BIOHUB_BENCHMARK' not in os.environ,
+    'Benchmarks run only if BIOHUB_BENCHMARK is set.'
+)
+
+
+def measure(func, number):
+    """
+    Calls `func` with no arguments, which should perform `number` operations.
+    Returns the number of operations per second.
+    """
+    start = time.perf_counter()
+    func()
+
+    return number / (time.perf_counter() - start)
+
+
+def report(title, unit='ops/sec', **rates):
+    sys.stdout.write('\n{}\n'.format(title))
+
+    for name, rate in rates.items():
+        sys.stdout.write('  {:<20}{:>12.1f} {}\n'.format(name, rate, unit))
@@ -27,3 +27,65 @@ class ErrorTask(Task):
 
     def run(self):
         raise KeyError('123')
+
+
+class PrimeCountTask(Task):
+    """
+    A CPU-bound task running in a separate process.
+    """
+
+    executor_type = 'process'
+
+    def run(self, n):
+        sieve = bytearray([1]) * (n + 1)
+        sieve[0:2] = b'\x00\x00'
+
+        for i in range(2, int(n ** .5) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = bytearray(len(sieve[i * i::i]))
+
+        return sum(sieve)
+
+
+class BusyProcessTask(Task):
+    """
+    A task never checking interruption, which can only be stopped by killing
+    its process.
+    """
+
+    executor_type = 'process'
+
+    def run(self, key):
+        import os
+
+        storage.set(key, os.getpid())
+
+        while True:
+            pass
+
+
+class ProgressTask(Task):
+
+    progress_interval = 0
+
+    def run(self, steps):
+        for i in range(steps):
+            self.emit(i)
+            self.report_progress((i + 1) / steps, 'step %s' % i)
+
+        return steps
+
+
+class VerboseProcessTask(Task):
+    """
+    A task writing more to stdout than a pipe can buffer.
+    """
+
+    executor_type = 'process'
+
+    def run(self, size):
+        import os
+
+        os.write(1, b'.' * size)
+
+        return size
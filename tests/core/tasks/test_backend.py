@@ -0,0 +1,88 @@
+import os
+
+from django.test import SimpleTestCase
+
+from biohub.core.tasks.backend import ResultBackend, FILE
+
+from ._base import TaskTestCase
+
+
+class Test(SimpleTestCase):
+
+    def setUp(self):
+        self.backend = ResultBackend(dict(
+            serializer='msgpack',
+            compress_threshold=64,
+            spill_threshold=1024
+        ))
+
+    def test_round_trip(self):
+        for value in [None, 1, 1.5, 'text', b'bytes', [1, 'a'], {'a': [1, {'b': None}]},
+                      (1, 2), {1: 'a'}, KeyError('key'), 2 ** 70]:
+            data = self.backend.dumps(value)
+            restored = self.backend.loads(data)
+
+            if isinstance(value, Exception):
+                self.assertIsInstance(restored, KeyError)
+            else:
+                self.assertEqual(restored, value)
+                self.assertIs(type(restored), type(value))
+
+    def test_msgpack(self):
+        self.assertEqual(self.backend.dumps({'a': 1})[:1], b'm')
+        self.assertEqual(self.backend.dumps((1, 2))[:1], b'p')
+
+    def test_compression(self):
+        value = ['x' * 10] * 20
+        data = self.backend.dumps(value)
+
+        self.assertEqual(data[:1], b'M')
+        self.assertEqual(self.backend.loads(data), value)
+
+    def test_spill(self):
+        value = os.urandom(4096)
+        data = self.backend.dumps(value)
+
+        self.assertEqual(data[:1], FILE)
+        self.assertGreater(self.backend.spilled_size(data), 4096)
+        self.assertEqual(self.backend.loads(data), value)
+
+        self.assertGreaterEqual(self.backend.clean(-1), 1)
+        self.assertIsNone(self.backend.loads(data))
+
+
+class StorageTest(TaskTestCase):
+
+    def test_large_result(self):
+        from biohub.core.tasks import AsyncResult
+        from biohub.core.tasks.backend import backend
+
+        value = os.urandom(backend.options['spill_threshold'] + 1)
+        result = AsyncResult('large')
+        result.resolve(value)
+
+        self.assertEqual(AsyncResult('large').result, value)
+
+        usage, spilled = result.memory_usage()
+        self.assertLess(usage, 4096)
+        self.assertGreater(spilled, len(value))
+
+    def test_clean(self):
+        from biohub.core.tasks import AsyncResult
+        from biohub.core.tasks.backend import backend
+
+        value = os.urandom(backend.options['spill_threshold'] + 1)
+        result = AsyncResult('spilled')
+        result.pend()
+        result._set_payload(value)
+
+        # Files of existing tasks are kept
+        backend.clean(-1)
+        self.assertEqual(AsyncResult('spilled').payload, value)
+
+        result._storage.delete(result._storage_key)
+        self.assertGreaterEqual(backend.clean(-1), 1)
+        self.assertFalse(any(
+            entry.name.startswith('spilled.')
+            for entry in os.scandir(backend.spill_directory)
+        ))
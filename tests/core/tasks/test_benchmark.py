@@ -0,0 +1,74 @@
+import asyncio
+import concurrent.futures
+
+from biohub.core.tasks import Task
+from biohub.core.tasks.payload import TaskPayload
+from biohub.core.tasks.executors import ThreadExecutor, runtime
+
+from tests.benchmark import benchmark, measure, report
+from ._base import TaskTestCase
+
+NUMBER = 500
+
+
+class NoopTask(Task):
+
+    task_name = 'benchmark.noop'
+
+    def run(self):
+        return None
+
+
+def make_executor(index):
+    payload = TaskPayload(NoopTask.task_name, 'noop-%s' % index, (), {}, {'timeout': 10})
+    return ThreadExecutor(NoopTask(payload))
+
+
+def legacy_execute(executor):
+    """
+    The way tasks were executed before: a new loop and a new pool per task.
+    """
+    loop = asyncio.new_event_loop()
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    loop.set_default_executor(pool)
+
+    async def perform():
+        future = loop.run_in_executor(None, executor.run)
+        result = await asyncio.wait_for(future, timeout=executor.timeout)
+        executor.async_result.resolve(result)
+
+    try:
+        loop.run_until_complete(perform())
+    finally:
+        loop.close()
+
+
+@benchmark
+class Test(TaskTestCase):
+
+    def test_noop_throughput(self):
+        legacy = measure(
+            lambda: [legacy_execute(make_executor(i)) for i in range(NUMBER)],
+            NUMBER
+        )
+
+        sequential = measure(
+            lambda: [make_executor(i).execute() for i in range(NUMBER, NUMBER * 2)],
+            NUMBER
+        )
+
+        def run_concurrently():
+            futures = [
+                runtime.submit(make_executor(i).execute_async())
+                for i in range(NUMBER * 2, NUMBER * 3)
+            ]
+            concurrent.futures.wait(futures)
+
+        concurrent_ = measure(run_concurrently, NUMBER)
+
+        report(
+            'No-op tasks executed:', unit='tasks/sec',
+            legacy=legacy, runtime=sequential, runtime_concurrent=concurrent_
+        )
+
+        self.assertGreater(concurrent_, legacy)
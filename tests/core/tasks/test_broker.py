@@ -0,0 +1,291 @@
+import threading
+
+from biohub.core.tasks.broker import Broker
+
+from ._base import TaskTestCase
+
+
+class RecordingBroker(Broker):
+    """
+    A broker recording dispatched tasks instead of sending them to workers.
+    """
+
+    def __init__(self, dispatched, max_tasks=2):
+        super(RecordingBroker, self).__init__('test', max_tasks=max_tasks)
+        self.dispatched = dispatched
+
+    def _dispatch_task(self, task_id):
+        self.dispatched.append(task_id)
+
+
+class Test(TaskTestCase):
+
+    def setUp(self):
+        super(Test, self).setUp()
+
+        self.dispatched = []
+        self.broker = self.make_broker()
+
+    def make_broker(self):
+        return RecordingBroker(self.dispatched)
+
+    def test_admission(self):
+        for i in range(5):
+            self.broker._enqueue_task(str(i))
+
+        self.assertEqual(self.dispatched, ['0', '1'])
+
+        metrics = self.broker.metrics()
+        self.assertEqual(metrics['queued'], 3)
+        self.assertEqual(metrics['running'], 2)
+        self.assertEqual(metrics['wait_time']['count'], 2)
+
+        self.broker._task_done(None, '0')
+        self.assertEqual(self.dispatched, ['0', '1', '2'])
+        self.assertEqual(self.broker.metrics()['running'], 2)
+
+    def test_concurrent_admission(self):
+        for i in range(20):
+            self.broker._pending_queue.enqueue(str(i))
+
+        brokers = [self.make_broker() for _ in range(8)]
+        threads = [threading.Thread(target=b._dequeue_task) for b in brokers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.dispatched), 2)
+        self.assertEqual(len(self.broker._running_set), 2)
+        self.assertEqual(len(self.broker._pending_queue), 18)
+
+
+class FairnessTest(TaskTestCase):
+
+    def setUp(self):
+        super(FairnessTest, self).setUp()
+
+        self.dispatched = []
+        self.broker = RecordingBroker(self.dispatched, max_tasks=1)
+
+    def drain(self):
+        """
+        Finishes running tasks one by one until the queue is empty.
+        """
+        while len(self.broker._running_set):
+            task_id = self.dispatched[-1]
+            self.broker._task_done(None, task_id)
+
+    def test_round_robin(self):
+        for i in range(50):
+            self.broker._enqueue_task('a%s' % i, owner=1)
+        self.broker._enqueue_task('b0', owner=2)
+        self.broker._enqueue_task('b1', owner=2)
+        self.broker._enqueue_task('c0', owner=3)
+
+        self.drain()
+
+        self.assertEqual(len(self.dispatched), 53)
+        self.assertEqual(self.dispatched[:6], ['a0', 'a1', 'b0', 'c0', 'a2', 'b1'])
+        self.assertEqual(self.dispatched[6:], ['a%s' % i for i in range(3, 50)])
+
+    def test_no_starvation(self):
+        for i in range(20):
+            self.broker._enqueue_task('a%s' % i, owner=1)
+
+        self.broker._task_done(None, self.dispatched[-1])
+        self.broker._enqueue_task('late', owner=2)
+        self.broker._task_done(None, self.dispatched[-1])
+        self.broker._task_done(None, self.dispatched[-1])
+
+        self.assertIn('late', self.dispatched[:4])
+
+    def test_priority(self):
+        self.broker._enqueue_task('running', owner=1)
+        self.broker._enqueue_task('batch', priority=-1, owner=1)
+        self.broker._enqueue_task('normal', owner=2)
+        self.broker._enqueue_task('urgent', priority=5, owner=1)
+        self.broker._enqueue_task('clamped', priority=100, owner=3)
+
+        self.drain()
+
+        self.assertEqual(
+            self.dispatched,
+            ['running', 'clamped', 'urgent', 'normal', 'batch'])
+
+    def test_aging(self):
+        self.broker._pending_queue.max_skips = 5
+        self.broker._enqueue_task('running', priority=9, owner=1)
+        self.broker._enqueue_task('low', priority=-9, owner=2)
+
+        # A steady stream of tasks of higher priority
+        for i in range(20):
+            self.broker._enqueue_task('high%s' % i, priority=9, owner=1)
+            self.broker._task_done(None, self.dispatched[-1])
+
+        self.assertEqual(self.dispatched.index('low'), 6)
+        self.assertEqual(len(self.broker._pending_queue), 1)
+
+    def test_remove(self):
+        self.broker._enqueue_task('running', owner=1)
+        self.broker._enqueue_task('cancelled', owner=1)
+        self.broker._enqueue_task('next', owner=1)
+
+        self.broker._invalidate_task('cancelled')
+        self.assertEqual(len(self.broker._pending_queue), 1)
+
+        self.drain()
+        self.assertEqual(self.dispatched, ['running', 'next'])
+
+
+class ReaperTest(TaskTestCase):
+
+    def setUp(self):
+        super(ReaperTest, self).setUp()
+
+        from biohub.core.tasks import Task
+
+        class RetriedTask(Task):
+            max_retries = 1
+
+            def run(self):
+                pass
+
+        class OnceTask(Task):
+
+            def run(self):
+                pass
+
+        self.retried_task = RetriedTask
+        self.once_task = OnceTask
+
+        self.dispatched = []
+        self.broker = RecordingBroker(self.dispatched, max_tasks=1)
+
+    def expire(self, task_id):
+        self.broker._leases.renew(task_id, -1)
+
+    def test_alive(self):
+        result = self.broker.apply_async(self.once_task)
+        self.broker._leases.renew(result.task_id, 30)
+
+        self.assertEqual(self.broker.reap(), 0)
+        self.assertIn(result.task_id, self.broker._running_set)
+
+    def test_grant_lease(self):
+        result = self.broker.apply_async(self.once_task)
+        self.broker._leases.remove(result.task_id)
+
+        self.assertEqual(self.broker.reap(), 0)
+        self.assertIn(result.task_id, self.broker._leases)
+
+    def test_retry(self):
+        result = self.broker.apply_async(self.retried_task, owner=1)
+        other = self.broker.apply_async(self.once_task, owner=2)
+        self.assertEqual(self.dispatched, [result.task_id])
+
+        self.expire(result.task_id)
+        self.assertEqual(self.broker.reap(), 1)
+        result.refresh()
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(self.dispatched, [result.task_id, other.task_id])
+        self.assertEqual(len(self.broker._pending_queue), 1)
+
+        self.broker._task_done(self.once_task, other.task_id)
+        self.assertEqual(self.dispatched[-1], result.task_id)
+
+        self.expire(result.task_id)
+        self.assertEqual(self.broker.reap(), 1)
+        self.assertEqual(result.status.value, 'ERROR')
+        self.assertNotIn(result.task_id, self.broker._running_set)
+
+    def test_lost(self):
+        result = self.broker.apply_async(self.once_task)
+
+        self.expire(result.task_id)
+        self.assertEqual(self.broker.reap(), 1)
+        self.assertEqual(result.status.value, 'ERROR')
+        self.assertEqual(len(self.broker._running_set), 0)
+
+    def test_claimed_once(self):
+        result = self.broker.apply_async(self.retried_task)
+        self.expire(result.task_id)
+
+        brokers = [RecordingBroker([], max_tasks=0) for _ in range(8)]
+        threads = [threading.Thread(target=b.reap) for b in brokers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result.refresh()
+        self.assertEqual(result.attempts, 1)
+
+
+class GroupTest(TaskTestCase):
+
+    def setUp(self):
+        super(GroupTest, self).setUp()
+
+        from biohub.core.tasks import Task
+
+        class AddTask(Task):
+
+            def run(self, a, b):
+                return a + b
+
+        class SumTask(Task):
+
+            def run(self, results):
+                return sum(results)
+
+        self.add_task = AddTask
+        self.sum_task = SumTask
+
+        self.dispatched = []
+        self.broker = RecordingBroker(self.dispatched, max_tasks=2)
+
+    def finish(self, async_result):
+        payload = async_result.payload
+        async_result.resolve(sum(payload[2]))
+        self.broker._task_done(self.add_task, async_result.task_id)
+
+    def test_apply_many(self):
+        results = self.broker.apply_many(self.add_task, [(i, i) for i in range(5)], owner=1)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.dispatched, [r.task_id for r in results[:2]])
+        self.assertEqual(len(self.broker._pending_queue), 3)
+        self.assertEqual(results[4].status.value, 'PENDING')
+        self.assertEqual(results[4].payload[2], (4, 4))
+        self.assertEqual(self.broker.metrics()['wait_time']['count'], 2)
+
+    def test_group(self):
+        group_result = self.broker.group(
+            self.add_task, [(i, i) for i in range(3)], callback=self.sum_task)
+        members = group_result.members
+
+        self.assertEqual(group_result.total, 3)
+        self.assertFalse(group_result.is_ready)
+
+        for member in members[:2]:
+            self.finish(member)
+        self.assertEqual(group_result.completed, 2)
+        self.assertIsNone(group_result.callback)
+
+        self.finish(members[2])
+        self.assertTrue(group_result.is_ready)
+        self.assertEqual(group_result.get(), [0, 2, 4])
+        self.assertEqual(
+            [status.value for status in group_result.statuses()],
+            ['SUCCESS'] * 3)
+
+        callback = group_result.callback
+        self.assertEqual(self.dispatched[-1], callback.task_id)
+        self.assertEqual(callback.payload[2], ([0, 2, 4],))
+
+    def test_empty_group(self):
+        group_result = self.broker.group(self.add_task, [], callback=self.sum_task)
+
+        self.assertTrue(group_result.is_ready)
+        self.assertEqual(group_result.callback.payload[2], ([],))
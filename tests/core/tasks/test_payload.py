@@ -1,3 +1,4 @@
+from biohub.core.tasks.backend import ResultBackend, MSGPACK
 from biohub.core.tasks.payload import TaskPayload
 from biohub.core.tasks.exceptions import TaskInstanceNotExists
 
@@ -23,6 +24,22 @@ class Test(TaskTestCase):
             )
         )
 
+    def test_msgpack(self):
+        backend = ResultBackend(dict(
+            serializer='msgpack',
+            compress_threshold=1024,
+            spill_threshold=4096
+        ))
+        raw = ('Task', 'Task-msgpack', (1, 'a'), dict(a=1), dict(priority=0, timeout=180))
+
+        data = backend.dumps(TaskPayload(*raw).packed_data)
+
+        self.assertEqual(data[:1], MSGPACK)
+        self.assertSequenceEqual(
+            ('Task', 'Task-msgpack', [1, 'a'], dict(a=1), dict(priority=0, timeout=180)),
+            payload_to_tuple(TaskPayload.from_packed_data(backend.loads(data)))
+        )
+
     def test_store_and_get(self):
         TaskPayload(*raw_data).store()
 
@@ -0,0 +1,71 @@
+from biohub.core.tasks import Task
+from biohub.core.tasks.payload import TaskPayload
+
+from ._base import TaskTestCase
+
+
+class CountTask(Task):
+
+    task_name = 'test.progress'
+
+    def run(self):
+        pass
+
+
+class Test(TaskTestCase):
+
+    def make_task(self, task_id='progress', **options):
+        return CountTask(TaskPayload(CountTask.task_name, task_id, (), {}, options))
+
+    def test_throttle(self):
+        task = self.make_task()
+
+        self.assertIsNotNone(task.report_progress(.1, 'start'))
+        self.assertIsNone(task.report_progress(.2))
+        self.assertIsNotNone(task.report_progress(1, 'done'))
+
+        progress = task.async_result(task.task_id).progress
+        self.assertEqual(progress['fraction'], 1)
+        self.assertEqual(progress['message'], 'done')
+
+    def test_events(self):
+        task = self.make_task()
+
+        for i in range(3):
+            task.emit({'index': i})
+
+        events = task.events.events()
+        self.assertEqual([e['data'] for e in events], [{'index': i} for i in range(3)])
+        self.assertEqual(
+            [e['data'] for e in task.events.events(after=events[0]['id'])],
+            [{'index': 1}, {'index': 2}])
+
+    def test_capped(self):
+        task = self.make_task()
+        task.events.max_length = 5
+
+        for i in range(10):
+            task.emit(i)
+
+        self.assertEqual([e['data'] for e in task.events.events()], list(range(5, 10)))
+
+    def test_progress_not_trimmed(self):
+        task = self.make_task()
+        task.events.max_length = 5
+
+        task.report_progress(.5, 'half')
+        for i in range(10):
+            task.emit(i)
+
+        self.assertEqual(task.async_result(task.task_id).progress['message'], 'half')
+
+    def test_expiry(self):
+        from biohub.core.conf import settings as biohub_settings
+        from biohub.core.tasks.storage import storage
+
+        timeout = biohub_settings.BIOHUB_TASK_MAX_TIMEOUT * 10
+        task = self.make_task(timeout=timeout)
+        task.report_progress(.5)
+
+        for key in ('progress_events', 'progress_progress'):
+            self.assertGreater(storage.pttl(key), timeout * 1000)
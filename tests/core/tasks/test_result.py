@@ -0,0 +1,46 @@
+from biohub.core.tasks import AsyncResult, TaskStatus
+
+from ._base import TaskTestCase
+
+
+class Test(TaskTestCase):
+
+    def test_snapshot(self):
+        result = AsyncResult('snapshot')
+        result.pend()
+        result._set_payload(('task', 'snapshot', (), {}, {}))
+
+        snapshot = AsyncResult('snapshot').snapshot
+        self.assertEqual(snapshot['status'], TaskStatus.PENDING)
+        self.assertEqual(snapshot['payload'], ('task', 'snapshot', (), {}, {}))
+
+        result._del_payload()
+        self.assertNotIn('payload', result.snapshot)
+        self.assertIsNone(AsyncResult('snapshot').payload)
+
+    def test_resolve(self):
+        result = AsyncResult('resolve')
+        result.run()
+        observer = AsyncResult('resolve')
+        self.assertEqual(observer.status, TaskStatus.RUNNING)
+
+        result.resolve({'answer': 42})
+        self.assertEqual(observer.status, TaskStatus.SUCCESS)
+        self.assertEqual(observer.result, {'answer': 42})
+        self.assertGreater(result._storage.pttl(result._storage_key), 0)
+
+        with self.assertRaises(ValueError):
+            result.error(None)
+
+    def test_error(self):
+        result = AsyncResult('error')
+        result.error(KeyError('key'))
+
+        observer = AsyncResult('error')
+        self.assertEqual(observer.status, TaskStatus.ERROR)
+        self.assertIsInstance(observer.result, KeyError)
+
+    def test_gone(self):
+        result = AsyncResult('gone')
+        self.assertEqual(result.status, TaskStatus.GONE)
+        self.assertEqual(result.snapshot, {})
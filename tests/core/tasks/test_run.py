@@ -89,3 +89,46 @@ class Test(TaskLiveTestCase):
 
         self.assertEqual(task.status.value, 'ERROR')
         self.assertIsInstance(task.result, KeyError)
+
+    def test_process(self):
+        from tests.core.tasks.myplugin.tasks import PrimeCountTask
+
+        tasks = [PrimeCountTask.apply_async(10 ** 6) for _ in range(3)]
+
+        for task in tasks:
+            self.wait_done(task, 100, 0.1, lambda v: self.assertEqual(v, 78498))
+
+    def test_process_output(self):
+        from tests.core.tasks.myplugin.tasks import VerboseProcessTask
+
+        task = VerboseProcessTask.apply_async(1 << 17)
+        self.wait_done(task, 100, 0.1, lambda v: self.assertEqual(v, 1 << 17))
+
+    def test_process_timeout(self):
+        import psutil
+        from tests.core.tasks.myplugin.tasks import BusyProcessTask
+        from biohub.core.tasks import apply_async
+
+        key = 'test_pid'
+
+        task = apply_async(BusyProcessTask, args=(key, ), timeout=2)
+
+        pids = []
+        self.wait_key(key, 20, 0.5, pids.append)
+        self.assertTrue(psutil.pid_exists(pids[0]))
+
+        self.assertTrue(task.wait(10, 0.5))
+        self.assertEqual(task.status.value, 'TIMEOUT')
+
+        time.sleep(.5)
+        self.assertFalse(psutil.pid_exists(pids[0]))
+
+    def test_progress(self):
+        from tests.core.tasks.myplugin.tasks import ProgressTask
+
+        task = ProgressTask.apply_async(4)
+        self.wait_done(task, 20, 0.1, lambda v: self.assertEqual(v, 4))
+
+        events = task.events.events()
+        self.assertEqual([e['data'] for e in events if e['type'] == 'partial'], [0, 1, 2, 3])
+        self.assertEqual(task.progress['fraction'], 1)
@@ -0,0 +1,100 @@
+import os
+import datetime
+
+from django.test import SimpleTestCase, override_settings
+
+from biohub.core.tasks import Task
+from biohub.core.tasks.schedule import Interval, Crontab, Scheduler
+
+from ._base import TaskTestCase
+from .test_broker import RecordingBroker
+
+
+def timestamp(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+
+@override_settings(TIME_ZONE='UTC')
+class ScheduleTest(SimpleTestCase):
+
+    def assertNextRun(self, spec, after, expected):
+        self.assertEqual(Crontab(spec).next_run(timestamp(*after)), timestamp(*expected))
+
+    def test_interval(self):
+        self.assertEqual(Interval(minutes=1, seconds=30).next_run(100), 190)
+
+        with self.assertRaises(ValueError):
+            Interval()
+
+    def test_crontab(self):
+        self.assertNextRun('*/30 * * * *', (2017, 10, 19, 10, 15, 20), (2017, 10, 19, 10, 30))
+        self.assertNextRun('*/30 * * * *', (2017, 10, 19, 10, 30), (2017, 10, 19, 11, 0))
+        self.assertNextRun('0 4 * * *', (2017, 10, 19, 10, 15), (2017, 10, 20, 4, 0))
+        self.assertNextRun('0 0 29 2 *', (2017, 10, 19), (2020, 2, 29))
+        # Friday to Monday
+        self.assertNextRun('0 9 * * 1-5', (2017, 10, 20, 10), (2017, 10, 23, 9, 0))
+        # Either the day of month or the day of week matches
+        self.assertNextRun('0 9 13 * 5', (2017, 10, 16), (2017, 10, 20, 9, 0))
+
+    def test_bad_crontab(self):
+        for spec in ('* * *', '60 * * * *', '*/0 * * * *', 'a * * * *', '5-1 * * * *'):
+            with self.assertRaises(ValueError):
+                Crontab(spec)
+
+
+class SchedulerTest(TaskTestCase):
+
+    def setUp(self):
+        super(SchedulerTest, self).setUp()
+
+        class MinutelyTask(Task):
+            schedule = Interval(minutes=1)
+
+            def run(self):
+                pass
+
+        self.task_class = MinutelyTask
+        self.dispatched = []
+        self.broker = RecordingBroker(self.dispatched)
+        self.scheduler = self.make_scheduler()
+
+    def make_scheduler(self):
+        return Scheduler('test_scheduler', broker=self.broker)
+
+    def finish(self, async_result):
+        self.broker._task_done(self.task_class, async_result.task_id)
+        async_result.resolve(None)
+
+    def test_fire(self):
+        self.assertEqual(self.scheduler.tick(now=1000), [])
+        self.assertEqual(self.scheduler.next_runs()[self.task_class.task_name], 1060)
+
+        self.assertEqual(self.scheduler.tick(now=1030), [])
+
+        fired = self.scheduler.tick(now=1060)
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(self.dispatched, [fired[0].task_id])
+        self.assertEqual(self.scheduler.next_runs()[self.task_class.task_name], 1120)
+
+    def test_skip_unfinished(self):
+        self.scheduler.tick(now=1000)
+        fired = self.scheduler.tick(now=1060)
+
+        self.assertEqual(self.scheduler.tick(now=1120), [])
+
+        self.finish(fired[0])
+        self.assertEqual(len(self.scheduler.tick(now=1180)), 1)
+
+    def test_leader(self):
+        other = self.make_scheduler()
+        # Pretend to be another process
+        other._pid, other._ident = os.getpid(), 'another'
+
+        self.scheduler.tick(now=1000)
+        self.assertEqual(other.tick(now=1060), [])
+        self.assertEqual(len(self.scheduler.tick(now=1060)), 1)
+
+        self.scheduler.resign()
+        self.assertTrue(other.elect())
+        self.assertFalse(self.scheduler.elect())
+        self.assertEqual(self.scheduler.tick(now=1200), [])
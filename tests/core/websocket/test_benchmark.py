@@ -0,0 +1,60 @@
+import json
+from copy import deepcopy
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from channels import Group, DEFAULT_CHANNEL_LAYER, channel_layers
+
+from biohub.utils.detect import features
+from biohub.core.websocket.tool import broadcast_users
+from biohub.core.websocket.presence import presence
+
+from tests.benchmark import benchmark, measure, report
+
+NUMBER = 1000
+
+
+def legacy_broadcast_users(handler_name, users, data):
+    """
+    The way users were broadcast to before: one encoding and one group send
+    per user.
+    """
+    for user in users:
+        Group('user_%s' % user).send({
+            'text': json.dumps({'handler': handler_name, 'data': deepcopy(data)})
+        })
+
+
+@benchmark
+@skipIf(not features.redis, 'Broadcast benchmarks require redis.')
+class Test(SimpleTestCase):
+
+    def setUp(self):
+        self.users = list(range(1, NUMBER + 1))
+
+        for user in self.users:
+            Group('user_%s' % user).add('websocket.send!benchmark%s' % user)
+            presence.connect(user, 'websocket.send!benchmark%s' % user)
+
+    def tearDown(self):
+        for user in self.users:
+            Group('user_%s' % user).discard('websocket.send!benchmark%s' % user)
+            presence.disconnect(user, 'websocket.send!benchmark%s' % user)
+
+        channel_layers[DEFAULT_CHANNEL_LAYER].flush()
+
+    def test_broadcast_users(self):
+        data = {
+            'message': 'A notice from someone you are following. ' * 5,
+            'targets': list(range(20))
+        }
+
+        legacy = measure(lambda: legacy_broadcast_users('benchmark', self.users, data), NUMBER)
+        bulk = measure(lambda: broadcast_users('benchmark', self.users, data), NUMBER)
+
+        report(
+            'Broadcast to {} users'.format(NUMBER),
+            unit='messages/sec',
+            legacy=legacy,
+            bulk=bulk
+        )
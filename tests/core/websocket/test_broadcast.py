@@ -1,3 +1,6 @@
+from asgi_redis import RedisChannelLayer
+
+from biohub.core.websocket import tool
 from biohub.core.websocket.tool import broadcast, broadcast_user, \
     broadcast_users
 
@@ -31,3 +34,21 @@ class Test(WSTestCase):
 
         self.assertEqual(client1.receive()['data'], data)
         self.assertEqual(client2.receive()['data'], data)
+
+    def test_broadcast_users_deduplicated(self):
+        data = dict(msg='test')
+        broadcast_users('test', [self.user1, self.user1.id, str(self.user1.id)], data)
+
+        self.assertEqual(data, self.client1.receive()['data'])
+        self.assertIsNone(self.client1.receive())
+
+    def test_redis_layer_internals(self):
+        # Fails loudly if an upgrade of asgi_redis removes the internals which
+        # `group_send_many` relies on
+        layer = RedisChannelLayer()
+        missing = [
+            name for name in tool.REDIS_LAYER_INTERNALS
+            if not hasattr(layer, name)
+        ]
+
+        self.assertEqual([], missing)
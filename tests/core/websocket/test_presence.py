@@ -0,0 +1,52 @@
+from unittest import skipIf
+
+from biohub.utils.detect import features
+from biohub.core.websocket.presence import Presence, presence
+from biohub.core.websocket.tool import broadcast_user, broadcast_users
+from biohub.accounts.models import User
+
+from ._base import WSTestCase
+
+
+@skipIf(not features.redis, 'Presence tests require redis.')
+class Test(WSTestCase):
+
+    def setUp(self):
+        presence.clear()
+
+        super(Test, self).setUp()
+
+        self.user3 = User.objects.create_test_user('user3')
+
+    def test_connect(self):
+        self.assertEqual(presence.count(self.user1), 1)
+        self.assertTrue(presence.is_online(self.user2.id))
+        self.assertFalse(presence.is_online(self.user3))
+
+        another = self.new_client(self.user1)
+        another.connect()
+        self.assertEqual(presence.count(self.user1), 2)
+
+        another.disconnect()
+        self.client1.disconnect()
+        self.assertEqual(presence.count(self.user1), 0)
+
+    def test_online(self):
+        self.assertEqual(
+            presence.online([self.user1, self.user3.id, self.user2]),
+            [self.user1, self.user2])
+
+    def test_expiry(self):
+        registry = Presence(timeout=-1)
+        registry.connect(self.user3, 'websocket.send!expired')
+
+        self.assertFalse(presence.is_online(self.user3))
+
+    def test_skip_offline(self):
+        self.client1.disconnect()
+
+        broadcast_user('test', self.user1, dict(msg='test'))
+        broadcast_users('test', [self.user1, self.user2], dict(msg='test'))
+
+        self.assertIsNone(self.client1.receive())
+        self.assertEqual(self.client2.receive()['data'], dict(msg='test'))
@@ -4,12 +4,15 @@ from unittest import SkipTest  # noqa
 from biohub.accounts.models import User
 from biohub.notices.models import Notice
 from biohub.forum.models import Activity, Experience, Post
+from biohub.forum.timeline import timeline
 from biohub.biobrick.models import Biobrick
 
 
 class ActivityTest(APITestCase):
 
     def setUp(self):
+        timeline.clear()
+
         self.user = User.objects.create_test_user(username='abc')
         self.user.set_password('123456000+')
         self.another_user = User.objects.create_test_user(username='another')
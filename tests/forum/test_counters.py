@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from biohub.accounts.models import User, UserCounter
+from biohub.forum.models import Post, Experience
+from biohub.biobrick.models import Biobrick
+
+
+class Test(APITestCase):
+
+    def setUp(self):
+        self.me = User.objects.create_test_user('me')
+        self.you = User.objects.create_test_user('you')
+        self.brick = Biobrick.objects.get(part_name='BBa_B0032')
+        self.meta = self.brick.ensure_meta_exists(fetch=True)
+        self.experience = Experience.objects.create(brick=self.meta, author=self.me)
+
+    def assertStats(self, user, **expected):
+        stats = UserCounter.objects.stats(user)
+
+        for name, value in expected.items():
+            self.assertEqual(value, stats[name], name)
+
+    def test_posts_num(self):
+        posts = [
+            Post.objects.create(author=self.you, content='post', experience=self.experience)
+            for _ in range(3)
+        ]
+        posts[0].delete()
+
+        self.experience.refresh_from_db()
+        self.assertEqual(2, self.experience.posts_num)
+
+    def test_posts_num_not_overwritten(self):
+        stale = Experience.objects.get(pk=self.experience.pk)
+        Post.objects.create(author=self.you, content='post', experience=self.experience)
+
+        stale.title = 'edited'
+        stale.save()
+
+        self.experience.refresh_from_db()
+        self.assertEqual('edited', self.experience.title)
+        self.assertEqual(1, self.experience.posts_num)
+
+    def test_follow(self):
+        self.me.follow(self.you)
+        self.me.follow(self.you)
+        self.assertStats(self.me, following=1, followers=0)
+        self.assertStats(self.you, following=0, followers=1)
+
+        self.me.unfollow(self.you)
+        self.me.unfollow(self.you)
+        self.assertStats(self.me, following=0)
+        self.assertStats(self.you, followers=0)
+
+    def test_follow_of_deleted_user(self):
+        them = User.objects.create_test_user('them')
+        self.me.follow(self.you)
+        self.you.follow(self.me)
+        them.follow(self.you)
+
+        self.you.delete()
+        self.assertStats(self.me, following=0, followers=0)
+        self.assertStats(them, following=0)
+
+    def test_stars_and_experiences(self):
+        self.assertStats(self.me, experiences=1, stars=0)
+
+        self.brick.star(self.me)
+        self.assertStats(self.me, stars=1)
+        self.brick.unstar(self.me)
+        self.brick.unstar(self.me)
+        self.assertStats(self.me, stars=0)
+
+        self.experience.delete()
+        self.assertStats(self.me, experiences=0)
+
+    def test_stat_api(self):
+        self.you.follow(self.me)
+        self.brick.star(self.me)
+
+        self.client.force_authenticate(self.me)
+
+        # user, counters
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/users/%s/stat/' % self.me.id).data
+
+        self.assertEqual({
+            'follower_count': 1,
+            'following_count': 0,
+            'star_count': 1,
+            'experience_count': 1
+        }, data)
+
+    def test_recount(self):
+        Post.objects.create(author=self.you, content='post', experience=self.experience)
+        self.me.follow(self.you)
+
+        Experience.objects.update(posts_num=5)
+        UserCounter.objects.filter(user=self.me).update(experiences=0, following=3)
+        UserCounter.objects.filter(user=self.you).delete()
+
+        call_command('recount', stdout=StringIO())
+
+        self.experience.refresh_from_db()
+        self.assertEqual(1, self.experience.posts_num)
+        self.assertStats(self.me, experiences=1, following=1)
+        self.assertStats(self.you, followers=1)
@@ -0,0 +1,60 @@
+from rest_framework.test import APITestCase
+
+from biohub.accounts.models import User
+from biohub.forum.models import Post, Experience, Article
+from biohub.biobrick.models import Biobrick
+from biohub.core.files.models import File
+
+
+class Test(APITestCase):
+    """
+    Serializing a page should take a fixed number of queries, no matter how
+    many items it has.
+    """
+
+    def setUp(self):
+        self.brick = Biobrick.objects.get(part_name='BBa_B0032')
+        self.meta = self.brick.ensure_meta_exists(fetch=True)
+        self.users = [User.objects.create_test_user('user%s' % i) for i in range(4)]
+
+    def create_experiences(self, number):
+        for i in range(number):
+            article = Article.objects.create(text='text %s' % i)
+            article.files.add(
+                File.objects.create(file='file%s.txt' % i, mime_type='text/plain'))
+
+            experience = Experience.objects.create(
+                title='title %s' % i, author=self.users[i % 4],
+                brick=self.meta, content=article)
+            Post.objects.create(
+                author=self.users[(i + 1) % 4], content='post %s' % i,
+                experience=experience)
+
+    def test_experiences(self):
+        self.create_experiences(20)
+
+        # count, page, files
+        with self.assertNumQueries(3):
+            data = self.client.get('/api/forum/experiences/').data
+
+        self.assertEqual(20, len(data['results']))
+        self.assertEqual(1, len(data['results'][0]['content']['files']))
+        self.assertIn('username', data['results'][0]['author'])
+
+        # page, files
+        with self.assertNumQueries(2):
+            self.client.get('/api/forum/experiences/?cursor=')
+
+        # experience, files
+        with self.assertNumQueries(2):
+            self.client.get('/api/forum/experiences/%s/' % data['results'][0]['id'])
+
+    def test_posts(self):
+        self.create_experiences(10)
+
+        # count, page
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/forum/posts/').data
+
+        self.assertEqual(10, len(data['results']))
+        self.assertIn('username', data['results'][0]['experience']['author'])
@@ -0,0 +1,150 @@
+from unittest import mock, skipIf
+
+from rest_framework.test import APITestCase
+
+from biohub.utils.detect import features
+from biohub.accounts.models import User
+from biohub.forum.models import Activity, Experience
+from biohub.forum.timeline import timeline
+from biohub.biobrick.models import Biobrick
+
+
+@skipIf(not features.redis, 'Timeline tests require redis.')
+class Test(APITestCase):
+
+    def setUp(self):
+        timeline.clear()
+
+        self.me = User.objects.create_test_user('me')
+        self.you = User.objects.create_test_user('you')
+        self.brick = Biobrick.objects.get(part_name='BBa_B0032')
+        self.meta = self.brick.ensure_meta_exists(fetch=True)
+
+    def tearDown(self):
+        timeline.clear()
+
+    def raw_ids(self, user):
+        return [
+            int(id) for id in
+            timeline.storage.zrevrange('user_%s' % user.id, 0, -1)
+        ]
+
+    def test_fan_out(self):
+        self.me.follow(self.you)
+        self.brick.watch(self.me)
+
+        experience = Experience.objects.create(brick=self.meta, author=self.you)
+        activity = Activity.objects.get(type='Experience', user=self.you)
+
+        # Pushed to the follower, but not to the actor
+        self.assertEqual([activity.id], self.raw_ids(self.me))
+        self.assertEqual([], self.raw_ids(self.you))
+
+        experience.delete()
+        self.assertEqual([], self.raw_ids(self.me))
+
+    def test_watchers(self):
+        self.brick.watch(self.me)
+        self.brick.watch(self.you)
+
+        activity = Activity.objects.get(type='Watch', user=self.you)
+        self.assertEqual([activity.id], self.raw_ids(self.me))
+
+        self.brick.unwatch(self.you)
+        self.assertEqual([], self.raw_ids(self.me))
+
+    def test_build(self):
+        Experience.objects.create(brick=self.meta, author=self.you)
+        self.brick.watch(self.you)
+        self.me.follow(self.you)
+
+        expected = list(
+            Activity.objects.timeline_of(self.me)
+            .order_by('-acttime').values_list('id', flat=True))
+
+        self.assertEqual(2, timeline.count(self.me))
+        self.assertEqual(expected, timeline.ids(self.me, 0, 10))
+
+        # Dropped on changes of relations
+        self.me.unfollow(self.you)
+        self.assertEqual(0, timeline.count(self.me))
+
+    def test_clear_followers(self):
+        them = User.objects.create_test_user('them')
+        self.me.follow(self.you)
+        them.follow(self.you)
+        Experience.objects.create(brick=self.meta, author=self.you)
+
+        self.assertEqual(1, timeline.count(self.me))
+        self.assertEqual(1, timeline.count(them))
+
+        self.you.followers.clear()
+        self.assertEqual(0, timeline.count(self.me))
+        self.assertEqual(0, timeline.count(them))
+
+    def test_stale_build(self):
+        self.me.follow(self.you)
+        Experience.objects.create(brick=self.meta, author=self.you)
+
+        original = Activity.objects.timeline_of
+
+        def timeline_of(user):
+            # Relations change while the timeline is being built
+            timeline.drop(user)
+            return original(user)
+
+        with mock.patch.object(Activity.objects, 'timeline_of', timeline_of):
+            self.assertFalse(timeline.build(self.me))
+
+        self.assertFalse(timeline.storage.exists('built_%s' % self.me.id))
+        self.assertEqual(1, timeline.count(self.me))
+
+    def test_trim(self):
+        old, timeline.max_length = timeline.max_length, 2
+
+        try:
+            self.me.follow(self.you)
+            for _ in range(3):
+                Experience.objects.create(brick=self.meta, author=self.you)
+
+            self.assertEqual(2, len(self.raw_ids(self.me)))
+        finally:
+            timeline.max_length = old
+
+    def test_api(self):
+        self.me.follow(self.you)
+        for _ in range(12):
+            Experience.objects.create(brick=self.meta, author=self.you)
+        self.brick.watch(self.you)
+
+        self.client.force_authenticate(self.me)
+        data = self.client.get('/api/forum/activities/timeline/').data
+        # Filtered timelines are read from the database
+        legacy = self.client.get('/api/forum/activities/timeline/?type=Experience,Watch').data
+
+        self.assertEqual(13, data['count'])
+        self.assertEqual(legacy['results'], data['results'])
+        self.assertEqual('Watch', data['results'][0]['type'])
+
+        data = self.client.get('/api/forum/activities/timeline/?page=2').data
+        self.assertEqual(3, len(data['results']))
+
+    def test_fallback(self):
+        old, timeline.max_length = timeline.max_length, 4
+
+        try:
+            self.me.follow(self.you)
+            for _ in range(6):
+                Experience.objects.create(brick=self.meta, author=self.you)
+
+            expected = list(
+                Activity.objects.timeline_of(self.me)
+                .order_by('-acttime', '-id').values_list('id', flat=True))
+            activities = timeline.query(self.me, Activity.objects.all())
+
+            self.assertEqual(4, len(self.raw_ids(self.me)))
+            self.assertEqual(6, activities.count())
+            self.assertEqual(expected[:4], [a.id for a in activities[0:4]])
+            self.assertEqual(expected[3:6], [a.id for a in activities[3:6]])
+        finally:
+            timeline.max_length = old
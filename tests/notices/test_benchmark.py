@@ -0,0 +1,88 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.template import engines
+from django.contrib.contenttypes.models import ContentType
+
+from biohub.notices import tool
+from biohub.accounts.models import User
+
+from tests.benchmark import benchmark, measure, report
+
+NUMBER = 2000
+
+TEMPLATE = (
+    '{{experience.author.username|url:experience.author}} '
+    'published a new experience {{experience.title|url:experience}} '
+    'at brick {{brick.part_name|url:brick}}.'
+)
+
+
+class Stub(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def get_router_arguments(self):
+        return 'stub', self.id
+
+
+@benchmark
+class Test(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_test_user('benchmark')
+        self.dispatcher = tool.Dispatcher('Forum')
+        self.context = dict(
+            experience=Stub(id=1, title='Title', author=self.user),
+            brick=Stub(id=1, part_name='BBa_B0032'),
+            user=self.user
+        )
+
+    def test_render(self):
+
+        def legacy():
+            # Parses the template on every notice, as it was before
+            for _ in range(NUMBER):
+                engines['notices'].from_string(TEMPLATE).render(dict(
+                    category=self.dispatcher.category, **self.context))
+
+        def cached():
+            for _ in range(NUMBER):
+                tool.render_notice_message(TEMPLATE, self.dispatcher, **self.context)
+
+        legacy_rate = measure(legacy, NUMBER)
+        tool.get_notice_template.cache_clear()
+        cached_rate = measure(cached, NUMBER)
+
+        report(
+            'Rendering %s notices' % NUMBER,
+            unit='notices/sec',
+            legacy=legacy_rate,
+            cached=cached_rate
+        )
+
+        # Parsed only once
+        self.assertEqual(tool.get_notice_template.cache_info().misses, 1)
+        self.assertGreater(cached_rate, legacy_rate)
+
+    def test_group_send(self):
+        users = [User.objects.create_test_user('user%s' % i) for i in range(110)]
+        # Warm up the cache of content types
+        ContentType.objects.get_for_model(User)
+        queries, rates = {}, {}
+
+        for number, group in ((10, users[:10]), (100, users[10:])):
+            with CaptureQueriesContext(connection) as context:
+                rates['%s users' % number] = measure(
+                    lambda: self.dispatcher.group_send(
+                        group, TEMPLATE, target=self.user,
+                        experience=self.context['experience'], brick=self.context['brick']),
+                    number)
+
+            queries[number] = len(context)
+
+        report('Sending a notice to a group', unit='notices/sec', **rates)
+
+        # Constant queries no matter how many users
+        self.assertEqual(queries[10], queries[100])
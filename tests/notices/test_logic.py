@@ -2,7 +2,7 @@ from rest_framework.test import APITestCase
 
 from biohub.notices import tool
 from biohub.accounts.models import User
-from biohub.notices.models import Notice
+from biohub.notices.models import Notice, NoticeCounter
 
 
 class NoticeTestCase(APITestCase):
@@ -118,3 +118,90 @@ class TestCRUD(NoticeTestCase):
 
         resp = self._get(user1, '?ids=%s' % ','.join(map(str, ns)))
         self.assertEqual(2, len(resp.data.get('results', [])))
+
+
+class TestCounter(NoticeTestCase):
+
+    def assertCounters(self, user, expected):
+        self.assertSequenceEqual(
+            NoticeCounter.objects.stats(user),
+            Notice.objects.user_notices(user).stats())
+        self.assertEqual(NoticeCounter.objects.unread_count(user), expected)
+
+    def test_create(self):
+        user = self.users[0]
+        self.assertCounters(user, 2)
+
+        tool.Dispatcher('a').send(user, '')
+        self.assertCounters(user, 3)
+
+    def test_mark_read(self):
+        user = self.users[0]
+
+        Notice.objects.user_notices(user).filter(category='a')[0].mark_read()
+        self.assertCounters(user, 1)
+
+        Notice.objects.user_notices(user).mark_read()
+        Notice.objects.user_notices(user).mark_read()
+        self.assertCounters(user, 0)
+
+        self.assertEqual(
+            NoticeCounter.objects.users_unread_counts(self.users[:2]),
+            {self.users[0].id: 0, self.users[1].id: 2})
+
+    def test_unread_again(self):
+        user = self.users[0]
+        Notice.objects.user_notices(user).mark_read()
+
+        Notice.objects.user_notices(user).update(has_read=False, message='again')
+        self.assertCounters(user, 2)
+
+    def test_delete(self):
+        user = self.users[0]
+
+        Notice.objects.user_notices(user).filter(category='a').delete()
+        self.assertCounters(user, 1)
+
+        Notice.objects.user_notices(user)[0].delete()
+        self.assertCounters(user, 0)
+        self.assertSequenceEqual(NoticeCounter.objects.stats(user), [])
+
+    def test_save(self):
+        user = self.users[0]
+        notice = Notice.objects.user_notices(user).filter(category='a')[0]
+
+        notice.has_read = True
+        notice.save()
+        self.assertCounters(user, 1)
+
+        # Unchanged
+        notice.save()
+        notice.message = 'read'
+        notice.save(update_fields=['message'])
+        self.assertCounters(user, 1)
+
+        notice.category = 'b'
+        notice.has_read = False
+        notice.save()
+        self.assertCounters(user, 2)
+
+    def test_cascade(self):
+        user, actor = self.users[:2]
+        tool.Dispatcher('a').send(user, '', actor=actor)
+        tool.Dispatcher('a').send(actor, '', actor=actor)
+        self.assertCounters(user, 3)
+
+        actor_id = actor.pk
+        actor.delete()
+        self.assertCounters(user, 2)
+        self.assertFalse(NoticeCounter.objects.filter(user_id=actor_id).exists())
+
+    def test_reconcile(self):
+        user = self.users[0]
+        NoticeCounter.objects.filter(user=user, category='a').update(unread=5)
+        NoticeCounter.objects.filter(user=user, category='b').delete()
+        NoticeCounter.objects.create(user=user, category='c', total=1)
+
+        self.assertEqual(NoticeCounter.objects.reconcile(), 3)
+        self.assertCounters(user, 2)
+        self.assertEqual(NoticeCounter.objects.reconcile(), 0)
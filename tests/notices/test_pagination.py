@@ -0,0 +1,51 @@
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from biohub.notices.tool import Dispatcher
+from biohub.notices.models import Notice
+from biohub.accounts.models import User
+
+
+class Test(APITestCase):
+
+    def setUp(self):
+        self.me = User.objects.create_test_user('me')
+        self.client.force_authenticate(self.me)
+
+        dispatcher = Dispatcher('test')
+        for i in range(45):
+            dispatcher.send(self.me, str(i))
+
+        # Ties are broken by ids
+        Notice.objects.filter(id__in=Notice.objects.values_list('id', flat=True)[:10])\
+            .update(created=timezone.now())
+
+        self.expected = list(
+            Notice.objects.order_by('-created', '-id').values_list('id', flat=True))
+
+    def walk(self, url):
+        ids = []
+
+        while url is not None:
+            data = self.client.get(url).data
+            self.assertNotIn('count', data)
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+
+        return ids
+
+    def test_keyset(self):
+        self.assertEqual(self.expected, self.walk('/api/notices/?cursor='))
+
+    def test_count(self):
+        data = self.client.get('/api/notices/?cursor=&count=1').data
+        self.assertEqual(45, data['count'])
+        self.assertEqual(20, len(data['results']))
+
+    def test_page_number(self):
+        data = self.client.get('/api/notices/?page=3').data
+        self.assertEqual(45, data['count'])
+        self.assertEqual(self.expected[40:], [item['id'] for item in data['results']])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(404, self.client.get('/api/notices/?cursor=abc').status_code)
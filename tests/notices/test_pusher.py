@@ -0,0 +1,99 @@
+import threading
+from unittest import mock, skipIf
+
+from django.test import TransactionTestCase
+from channels.test.base import ChannelTestCaseMixin
+from rest_framework.test import APITestCase
+
+from biohub.utils.detect import features
+from biohub.notices import tool
+from biohub.notices.pusher import StatsPusher
+from biohub.accounts.models import User
+from biohub.core.websocket.presence import presence
+from biohub.core.tasks.broker import broker
+from biohub.core.tasks.executors import runtime
+from biohub.notices.consumers import flush_stats_consumer
+
+
+class PusherTestMixin(object):
+
+    def setUp(self):
+        super(PusherTestMixin, self).setUp()
+        presence.clear()
+
+        self.pusher = StatsPusher()
+        self.pusher.storage.delete_pattern('*')
+
+        self.users = [
+            User.objects.create_test_user('user_%s' % i)
+            for i in range(3)]
+        tool.Dispatcher('a').group_send(self.users, '')
+
+        for user in self.users[:2]:
+            presence.connect(user, 'websocket.send!%s' % user.pk)
+
+    def tearDown(self):
+        presence.clear()
+        super(PusherTestMixin, self).tearDown()
+
+
+@skipIf(not features.redis, 'Pusher tests require redis.')
+class Test(PusherTestMixin, APITestCase):
+
+    def test_coalesce(self):
+        self.assertTrue(self.pusher.mark([self.users[0]]))
+        self.assertFalse(self.pusher.mark([self.users[0], self.users[1].pk]))
+
+        with self.assertNumQueries(1):
+            stats = self.pusher.flush()
+
+        self.assertEqual(stats, {self.users[0].pk: 1, self.users[1].pk: 1})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pusher.flush(), {})
+
+        self.assertTrue(self.pusher.mark(self.users))
+
+    def test_skip_offline(self):
+        self.pusher.mark([self.users[2]])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pusher.flush(), {})
+
+
+@skipIf(not features.redis, 'Pusher tests require redis.')
+class DeferredTest(PusherTestMixin, ChannelTestCaseMixin, TransactionTestCase):
+
+    def test_schedule(self):
+        with mock.patch.object(StatsPusher, 'deferred', True):
+            self.pusher.push([self.users[0]])
+            self.pusher.push([self.users[1]])
+
+        message = self.get_next_message('notices.flush', require=True)
+        self.assertIsNone(self.get_next_message('notices.flush'))
+
+        # All slots of tasks are busy
+        busy = ['busy%s' % i for i in range(broker._max_tasks)]
+        for task_id in busy:
+            broker._running_set.add(task_id)
+        runtime.ensure_running()
+        release = threading.Event()
+        for _ in range(runtime.pool._max_workers):
+            runtime.pool.submit(release.wait)
+
+        try:
+            stats = flush_stats_consumer(message).result(timeout=5)
+        finally:
+            release.set()
+            for task_id in busy:
+                broker._running_set.remove(task_id)
+
+        self.assertEqual(stats, {self.users[0].pk: 1, self.users[1].pk: 1})
+
+    def test_schedule_failure(self):
+        with mock.patch.object(StatsPusher, 'deferred', True), \
+                mock.patch('channels.Channel.send', side_effect=ConnectionError()):
+            self.pusher.push([self.users[0]])
+
+        # The flag is reset, so that stats won't be suppressed
+        self.assertTrue(self.pusher.mark([self.users[0]]))
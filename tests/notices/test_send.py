@@ -1,6 +1,10 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.contenttypes.models import ContentType
 from rest_framework.test import APITestCase
 
 from biohub.notices import tool
+from biohub.notices.models import Notice, NoticeCounter
 from biohub.accounts.models import User
 
 
@@ -11,6 +15,12 @@ class Test(APITestCase):
         self.you = User.objects.create_test_user('you')
         self.dispatcher = tool.Dispatcher('test')
 
+    def count_queries(self, func, *args, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            func(*args, **kwargs)
+
+        return len(context)
+
     def test_basic_send(self):
         notice = self.dispatcher.send(
             self.me,
@@ -32,3 +42,65 @@ class Test(APITestCase):
             '{{user.username}}')
 
         self.assertListEqual(['me', 'you'], [x.message for x in notices])
+
+    def test_group_send_shared_message(self):
+        notices = self.dispatcher.group_send(
+            [self.me, self.you],
+            '{{category}} {{name}}',
+            name='biohub')
+
+        self.assertListEqual(['test biohub'] * 2, [x.message for x in notices])
+        self.assertListEqual([self.me, self.you], [x.user for x in notices])
+
+    def test_template_cache(self):
+        tool.get_notice_template.cache_clear()
+
+        for _ in range(3):
+            self.dispatcher.send(self.me, 'Cached {{user.username}}')
+
+        info = tool.get_notice_template.cache_info()
+        self.assertEqual(1, info.misses)
+        self.assertEqual(2, info.hits)
+
+    def test_send_or_update_many(self):
+        them = [User.objects.create_test_user('user%s' % i) for i in range(3)]
+        users = [self.me, self.you] + them
+        options = dict(
+            target=self.you,
+            target_slug='test',
+            actor=self.you,
+            filter_fields=('actor', 'target_slug', 'user', 'category'))
+
+        self.dispatcher.send_or_update(self.me, 'first', **options)
+        Notice.objects.user_notices(self.me).mark_read()
+
+        created = self.dispatcher.send_or_update_many(
+            users, '{{user.username}} {{actor.username}}', **options)
+
+        self.assertEqual(len(them) + 1, len(created))
+        for user in users:
+            notice = Notice.objects.get(user=user)
+            self.assertEqual('%s you' % user.username, notice.message)
+            self.assertFalse(notice.has_read)
+            self.assertEqual(self.you, notice.target)
+            self.assertEqual(1, NoticeCounter.objects.unread_count(user))
+
+        # Constant queries no matter how many users
+        self.assertEqual(
+            self.count_queries(self.dispatcher.send_or_update_many, users[:2], 'a', **options),
+            self.count_queries(self.dispatcher.send_or_update_many, users, 'b', **options))
+
+        self.assertEqual({'b'}, set(Notice.objects.values_list('message', flat=True)))
+
+    def test_group_send_queries(self):
+        users = [User.objects.create_test_user('user%s' % i) for i in range(6)]
+        # Warm up the cache of content types
+        ContentType.objects.get_for_model(User)
+
+        self.assertEqual(
+            self.count_queries(self.dispatcher.group_send, users[:2], '{{user.username}}', target=self.me),
+            self.count_queries(self.dispatcher.group_send, users[2:], '{{user.username}}', target=self.me))
+
+        self.assertEqual(6, Notice.objects.filter(target_id=self.me.id).count())
+        for user in users:
+            self.assertEqual(1, NoticeCounter.objects.unread_count(user))